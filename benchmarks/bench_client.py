@@ -0,0 +1,131 @@
+"""
+End-to-end client benchmark for PyAvrio Scheduler
+
+Runs authentication, listing and bulk triggering against MockAvrioServer in a
+separate process and reports p50/p95/p99 latency, throughput and the peak RSS
+of the client. Use --json to keep results comparable across commits:
+
+    python benchmarks/bench_client.py --jobs 20000 --page-size 500 --latency 0.002
+"""
+import argparse
+import time
+from typing import Dict, List
+
+from harness import ServerProcess, print_results, summarize
+
+from pyavrio_scheduler import Authentication
+from pyavrio_scheduler.resilience import RetryPolicy
+from pyavrio_scheduler.transport import Transport
+
+TOPIC = "PYTHON_NOTEBOOK"
+
+
+def _timed(operation, iterations: int):
+    """Run an operation repeatedly, returning per-call latencies, errors and elapsed time."""
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        try:
+            operation()
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - call_started)
+    return latencies, errors, time.perf_counter() - started
+
+
+def bench_auth(url: str, iterations: int, transport: Transport) -> Dict:
+    """Benchmark password sign-in followed by the user details lookup."""
+    auth = Authentication(transport=transport)
+    params = {"host": url, "method": "password", "username": "user@example.com", "password": "secret"}
+    latencies, errors, elapsed = _timed(lambda: auth.authenticate(params), iterations)
+    return summarize("auth", latencies, elapsed, errors)
+
+
+def bench_list_all(scheduler, iterations: int) -> Dict:
+    """Benchmark single-page listings."""
+    def operation():
+        if scheduler.list_all("python_notebook") is None:
+            raise RuntimeError("listing failed")
+
+    latencies, errors, elapsed = _timed(operation, iterations)
+    return summarize("list_all", latencies, elapsed, errors)
+
+
+def bench_iter_jobs(scheduler, iterations: int, page_size: int, stream: bool = False) -> Dict:
+    """Benchmark walking every page of a topic, reporting the time per full walk."""
+    jobs = 0
+
+    def operation():
+        nonlocal jobs
+        for _ in scheduler.iter_jobs("python_notebook", page_size=page_size, stream=stream):
+            jobs += 1
+
+    latencies, errors, elapsed = _timed(operation, iterations)
+    return summarize("iter_jobs_stream" if stream else "iter_jobs", latencies, elapsed, errors,
+                     jobs_per_s=round(jobs / elapsed, 1) if elapsed > 0 else 0.0)
+
+
+def bench_trigger_many(scheduler, jobs: List[Dict], workers: int) -> Dict:
+    """Benchmark bulk triggering, reporting the latency of every trigger."""
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for result in scheduler.trigger_many(jobs, max_workers=workers):
+        latencies.append(result.latency)
+        errors += not result.ok
+    return summarize("trigger_many", latencies, time.perf_counter() - started, errors)
+
+
+def run(args) -> List[Dict]:
+    """
+    Run every scenario against a fresh server process.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        list: One summary per scenario.
+    """
+    results = []
+    with ServerProcess(job_counts={TOPIC: args.jobs}, latency=args.latency,
+                       error_rate=args.error_rate, seed=args.seed) as server:
+        retry_policy = RetryPolicy(backoff_base=0.01) if args.retries else None
+        with Transport(pool_maxsize=args.workers, retry_policy=retry_policy) as transport:
+            results.append(bench_auth(server.url, args.iterations, transport))
+
+            session = Authentication(transport=transport).authenticate(
+                {"host": server.url, "method": "password", "username": "user@example.com", "password": "secret"})
+            scheduler = session.get_scheduler()
+            results.append(bench_list_all(scheduler, args.iterations))
+            results.append(bench_iter_jobs(scheduler, args.iterations, args.page_size))
+            results.append(bench_iter_jobs(scheduler, args.iterations, args.page_size, stream=True))
+
+            targets = [{"jobName": f"bench_job_{i}", "jobId": i, "topic": TOPIC} for i in range(args.triggers)]
+            results.append(bench_trigger_many(scheduler, targets, args.workers))
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=5000, help="Jobs served by the listing endpoint.")
+    parser.add_argument("--page-size", type=int, default=500, help="Page size used by iter_jobs.")
+    parser.add_argument("--triggers", type=int, default=1000, help="Jobs triggered by trigger_many.")
+    parser.add_argument("--workers", type=int, default=32, help="Trigger workers and pooled connections.")
+    parser.add_argument("--iterations", type=int, default=20, help="Repetitions of auth and listing calls.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Server-side delay per request in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--retries", action="store_true", help="Retry 503s with a RetryPolicy.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the server-side error injection.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> List[Dict]:
+    args = parse_args(argv)
+    results = run(args)
+    print_results(results, as_json=args.json)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+JSON codec and compression benchmark for PyAvrio Scheduler
+
+Measures the CPU time of decoding a list API page with every installed JSON
+codec, then the bytes on the wire and client CPU time of `list_all` against
+MockAvrioServer in a separate process, with and without compressed transfer:
+
+    python benchmarks/bench_codec.py --jobs 1000 --iterations 200
+"""
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from harness import ServerProcess, print_results, summarize
+
+from pyavrio_scheduler.codec import available_codecs, get_codec
+from pyavrio_scheduler.instrumentation import Instrumentation
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import make_jobs
+from pyavrio_scheduler.transport import Transport
+
+TOPIC = "PYTHON_NOTEBOOK"
+
+
+def bench_decode(body: bytes, codec_name: str, iterations: int) -> Dict:
+    """Benchmark decoding one page, reporting CPU time per decode."""
+    codec = get_codec(codec_name)
+    expected = json.loads(body)
+    if codec.loads(body) != expected:
+        raise AssertionError(f"{codec_name} decodes the page differently from json")
+
+    latencies = []
+    cpu_started, started = time.process_time(), time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        codec.loads(body)
+        latencies.append(time.perf_counter() - call_started)
+    cpu = time.process_time() - cpu_started
+    return summarize(f"decode_{codec_name}", latencies, time.perf_counter() - started,
+                     cpu_ms_per_call=round(cpu / iterations * 1000, 3), body_bytes=len(body))
+
+
+def bench_list_all(url: str, iterations: int, compression: bool, codec_name: str) -> Dict:
+    """Benchmark `list_all`, reporting response bytes on the wire and client CPU time per call."""
+    metrics = Instrumentation()
+    transport = Transport(compression=compression, codec=get_codec(codec_name), instrumentation=metrics)
+    with Session(url, SessionState(access_token="token", user_id=1), transport) as session:
+        scheduler = session.get_scheduler()
+        latencies, errors = [], 0
+        cpu_started, started = time.process_time(), time.perf_counter()
+        for _ in range(iterations):
+            call_started = time.perf_counter()
+            if scheduler.list_all("python_notebook") is None:
+                errors += 1
+            latencies.append(time.perf_counter() - call_started)
+        cpu = time.process_time() - cpu_started
+        elapsed = time.perf_counter() - started
+
+    received = sum(metrics.bytes_received.values())
+    name = f"list_all_{'gzip' if compression else 'identity'}_{codec_name}"
+    return summarize(name, latencies, elapsed, errors, cpu_ms_per_call=round(cpu / iterations * 1000, 3),
+                     wire_bytes_per_call=round(received / iterations))
+
+
+def run(args) -> List[Dict]:
+    """
+    Run the decode scenarios, then the listing scenarios against a fresh server process.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        list: One summary per scenario.
+    """
+    body = json.dumps({"content": make_jobs(args.jobs, TOPIC), "last": True}).encode("utf-8")
+    codecs = available_codecs()
+    results = [bench_decode(body, name, args.iterations) for name in codecs]
+
+    with ServerProcess(job_counts={TOPIC: args.jobs}, etags=False) as server:
+        for compression in (False, True):
+            for name in (codecs[0], "json") if codecs[0] != "json" else ("json",):
+                results.append(bench_list_all(server.url, args.iterations, compression, name))
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=1000, help="Jobs in the listed page.")
+    parser.add_argument("--iterations", type=int, default=100, help="Repetitions of every scenario.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> List[Dict]:
+    args = parse_args(argv)
+    results = run(args)
+    print_results(results, as_json=args.json)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Memory benchmark of job records for PyAvrio Scheduler
+
+Compares the memory retained by a decoded listing kept as dictionaries with the
+same listing converted to Job records, measured with tracemalloc:
+
+    python benchmarks/bench_memory.py --jobs 50000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Dict, List
+
+from harness import print_results
+
+from pyavrio_scheduler.jobs import Job
+from pyavrio_scheduler.testing import make_jobs
+
+TOPICS = ("PYTHON_NOTEBOOK", "SQL_NOTEBOOK", "DSDQ")
+
+
+def _listing(count: int) -> Dict[str, bytes]:
+    """Encode listings as the list API would send them, split evenly across topics."""
+    per_topic = count // len(TOPICS)
+    return {topic: json.dumps({"content": make_jobs(per_topic, topic, start=i * per_topic + 1)}).encode("utf-8")
+            for i, topic in enumerate(TOPICS)}
+
+
+def _measure(build) -> tuple:
+    """Return (retained bytes, seconds) of the object built by `build`."""
+    # Time an untraced build, since tracemalloc slows allocations down considerably
+    gc.collect()
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    del value
+
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del value
+    return retained, elapsed
+
+
+def run(count: int) -> List[Dict]:
+    bodies = _listing(count)
+
+    def as_dicts():
+        return [job for body in bodies.values() for job in json.loads(body)["content"]]
+
+    def as_records():
+        return [job for topic, body in bodies.items()
+                for job in Job.from_listing(json.loads(body)["content"], topic)]
+
+    results = []
+    for name, build in (("dict", as_dicts), ("Job", as_records)):
+        retained, elapsed = _measure(build)
+        results.append({
+            "representation": name,
+            "jobs": len(TOPICS) * (count // len(TOPICS)),
+            "retained_mb": round(retained / (1024.0 * 1024.0), 2),
+            "bytes_per_job": round(retained / max(1, count)),
+            "build_s": round(elapsed, 3),
+        })
+    return results
+
+
+def main(argv=None) -> List[Dict]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=30000, help="Jobs across all topics.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args(argv)
+    results = run(args.jobs)
+    print_results(results, as_json=args.json)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Shared helpers for the PyAvrio Scheduler benchmarks
+
+Starts the local stand-in server in a separate process, so that the peak RSS
+and CPU time reported for a scenario belong to the client only, and turns raw
+latencies into p50/p95/p99, throughput and memory figures.
+"""
+import json
+import math
+import multiprocessing
+import os
+import resource
+import sys
+from typing import Dict, List
+
+# Allow running the scripts from a source checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Get a percentile using the nearest-rank method.
+
+    Args:
+        sorted_values (list): Values sorted in ascending order.
+        q (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The percentile, or 0.0 for an empty list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_mb() -> float:
+    """Get the peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def summarize(name: str, latencies: List[float], elapsed: float, errors: int = 0, **extra) -> Dict:
+    """
+    Summarize one benchmark scenario.
+
+    Args:
+        name (str): The scenario name.
+        latencies (list): Seconds spent per operation.
+        elapsed (float): Wall-clock seconds of the whole scenario.
+        errors (int): Number of failed operations.
+        **extra: Additional figures to report.
+
+    Returns:
+        dict: count, errors, p50/p95/p99 in milliseconds, throughput and peak RSS.
+    """
+    ordered = sorted(latencies)
+    result = {
+        "scenario": name,
+        "count": len(ordered),
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "throughput_per_s": round(len(ordered) / elapsed, 1) if elapsed > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    result.update(extra)
+    return result
+
+
+def format_report(results: List[Dict]) -> str:
+    """Render scenario summaries as an aligned text table."""
+    columns = []
+    for result in results:
+        for column in result:
+            if column not in columns:
+                columns.append(column)
+    rows = [[str(result.get(column, "")) for column in columns] for result in results]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines.append("  ".join("-" * width for width in widths))
+    lines.extend("  ".join(value.ljust(width) for value, width in zip(row, widths)) for row in rows)
+    return "\n".join(lines)
+
+
+def print_results(results: List[Dict], as_json: bool = False):
+    """Print scenario summaries as a table or as JSON."""
+    print(json.dumps(results, indent=2) if as_json else format_report(results))
+
+
+def _serve(config: Dict, queue, stop_event):
+    from pyavrio_scheduler.testing import MockAvrioServer, make_jobs
+
+    jobs = {topic: make_jobs(count, topic) for topic, count in config.pop("job_counts", {}).items()}
+    server = MockAvrioServer(jobs=jobs, record_requests=False, **config).start()
+    queue.put(server.url)
+    stop_event.wait()
+    server.stop()
+
+
+class ServerProcess:
+    """
+    Runs MockAvrioServer in a child process.
+
+    Attributes:
+        url (str): The base URL of the server once started.
+    """
+
+    def __init__(self, job_counts: Dict[str, int] = None, **config):
+        """
+        Args:
+            job_counts (dict, optional): Number of generated jobs per topic.
+            **config: Keyword arguments of MockAvrioServer, e.g. latency or error_rate.
+        """
+        self.config = dict(config, job_counts=job_counts or {})
+        self.url = None
+        self._process = None
+        self._stop = None
+
+    def __enter__(self) -> "ServerProcess":
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        self._stop = context.Event()
+        self._process = context.Process(target=_serve, args=(self.config, queue, self._stop), daemon=True)
+        self._process.start()
+        self.url = queue.get(timeout=30)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.terminate()
@@ -1,11 +1,31 @@
 """
 PyAvrio Scheduler Library
-"""
 
-from .auth import Authentication
-from .state import UserState
-from .session import Session
-from .scheduler import Scheduler
+The public classes are imported on first access, so importing the package, or
+running the command line interface with `--help`, does not load `requests`.
+"""
 
 __version__ = "0.1.0"
-__all__ = ["Authentication", "Session", "Scheduler"]
\ No newline at end of file
+__all__ = ["Authentication", "Session", "Scheduler"]
+
+# Attribute name -> submodule defining it
+_LAZY_ATTRIBUTES = {
+    "Authentication": "auth",
+    "UserState": "state",
+    "Session": "session",
+    "Scheduler": "scheduler",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,333 @@
+"""
+Asyncio client for PyAvrio Scheduler
+
+AsyncAuthentication, AsyncSession and AsyncScheduler mirror the blocking
+Authentication -> Session -> Scheduler flow on top of a pooled `httpx.AsyncClient`,
+so thousands of list and trigger calls can be in flight on one event loop.
+
+This module needs the optional `httpx` dependency:
+
+    pip install pyavrio-scheduler[async]
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Iterable
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depends on the installed extras
+    httpx = None
+
+from .auth import Authentication, AuthenticationError, UserDetailsError
+from .endpoints import SchedulerEndpoints
+from .query import DEFAULT_PAGE_SIZE
+from .ratelimit import RateLimiter
+from .scheduler import LIST_TOPICS, Scheduler, SchedulerError, TriggerResult
+from .state import SessionState, UserState
+
+DEFAULT_MAX_CONNECTIONS = 100  # Connections kept open per client
+DEFAULT_MAX_CONCURRENCY = 1000  # Triggers in flight at once in trigger_many
+DEFAULT_TIMEOUT = 60.0  # Read timeout in seconds
+DEFAULT_CONNECT_TIMEOUT = 10.0  # Connect timeout in seconds
+
+
+def _create_client(max_connections: int = DEFAULT_MAX_CONNECTIONS, timeout: float = DEFAULT_TIMEOUT):
+    """Create a pooled `httpx.AsyncClient`, failing clearly when httpx is missing."""
+    if httpx is None:
+        raise ImportError("The asyncio client requires httpx. Install it with: pip install pyavrio-scheduler[async]")
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(timeout, connect=DEFAULT_CONNECT_TIMEOUT))
+
+
+class AsyncSession:
+    """
+    The AsyncSession class stores the user state, host and pooled async HTTP client.
+
+    Attributes:
+        _user_state (SessionState): The state of the current user.
+        _host (str): The host URL or server address for the session.
+        _client (httpx.AsyncClient): The pooled HTTP client used for every request of the session.
+    """
+
+    def __init__(self, host: str, user_state: SessionState, client=None):
+        """
+        Initialize the AsyncSession object.
+
+        Args:
+            host (str): The host URL or address for the session.
+            user_state (SessionState): The state holding user-specific data.
+            client (httpx.AsyncClient, optional): The pooled HTTP client to use. A new one is
+                created when not provided.
+        """
+        self._user_state = user_state
+        self._host = host
+        self._client = client if client is not None else _create_client()
+
+    def get_host(self) -> str:
+        """Get the host URL for the current session."""
+        return self._host
+
+    @property
+    def user_state(self) -> SessionState:
+        """Retrieve the current user's state information."""
+        return self._user_state
+
+    @property
+    def client(self):
+        """Retrieve the pooled `httpx.AsyncClient` of the session."""
+        return self._client
+
+    def get_scheduler(self) -> "AsyncScheduler":
+        """Retrieve an AsyncScheduler bound to the current session."""
+        return AsyncScheduler(self)
+
+    async def aclose(self):
+        """Close the pooled connections held by the session client."""
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+
+class AsyncAuthentication:
+    """
+    Asyncio counterpart of `Authentication`.
+    """
+
+    def __init__(self, client=None, shared_state: bool = False):
+        """
+        Initialize the AsyncAuthentication class.
+
+        Args:
+            client (httpx.AsyncClient, optional): The pooled HTTP client to use. It is handed
+                over to the returned AsyncSession. A new one is created when not provided.
+            shared_state (bool): Store the authentication state in the UserState singleton
+                instead of a SessionState owned by each session.
+        """
+        self.shared_state = shared_state
+        self.user_state = self._new_state()
+        self.client = client if client is not None else _create_client()
+        self.token_endpoint = SchedulerEndpoints.TOKEN_ENDPOINT
+        self.user_details_endpoint = SchedulerEndpoints.USER_DETAILS
+
+    async def authenticate(self, auth_params: Dict) -> AsyncSession:
+        """
+        Authenticate the user using either the password or access token method.
+
+        Args:
+            auth_params (dict): The same parameters accepted by `Authentication.authenticate`.
+
+        Returns:
+            AsyncSession: A session object containing the user's authentication state and host information.
+
+        Raises:
+            AuthenticationError: If required parameters are missing, invalid, or if authentication fails.
+        """
+        host, method, credentials = Authentication._parse_auth_params(auth_params)
+        user_state = self._new_state()
+
+        if method == 'password':
+            payload = {"email": credentials['username'], "password": credentials['password']}
+            try:
+                response = await self.client.post(host + self.token_endpoint, json=payload,
+                                                  headers={"Content-Type": "application/json"})
+                response.raise_for_status()
+                data = response.json()
+            except httpx.HTTPError as e:
+                raise AuthenticationError(f"Failed to obtain access token: {str(e)}")
+
+            user_state.username = credentials['username']
+            user_state.access_token = data.get("accessToken")
+        else:
+            user_state.access_token = credentials['access_token']
+
+        user_state.email = Authentication.extract_email_from_jwt(user_state.access_token)
+        await self.update_user_details(host, user_state.access_token, user_state)
+
+        self.user_state = user_state
+        return AsyncSession(host, user_state, self.client)
+
+    def _new_state(self) -> SessionState:
+        return UserState() if self.shared_state else SessionState()
+
+    async def update_user_details(self, host, access_token: str, user_state: SessionState = None):
+        """
+        Get user details using the access token and user email and store the user ID.
+
+        Args:
+            host (str): The host URL.
+            access_token (str): The access token to use for authentication.
+            user_state (SessionState, optional): The state to update. Defaults to the state
+                of the last authentication.
+
+        Returns:
+            The user ID.
+
+        Raises:
+            UserDetailsError: If the request fails or the response holds no user ID.
+        """
+        if user_state is None:
+            user_state = self.user_state
+        try:
+            headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
+            response = await self.client.post(host + self.user_details_endpoint,
+                                              json={"emailId": user_state.email}, headers=headers)
+            response.raise_for_status()
+            user_id = response.json().get('userId')
+        except (httpx.HTTPError, ValueError, AttributeError) as e:
+            raise UserDetailsError(f"Failed to fetch user details for {user_state.email}: {e}")
+        if user_id is None:
+            raise UserDetailsError(f"The user details of {user_state.email} hold no user ID.")
+        user_state.user_id = user_id
+        return user_id
+
+
+class AsyncScheduler:
+    """
+    Asyncio counterpart of `Scheduler`.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _headers(self) -> Dict:
+        return {
+            "Authorization": "Bearer " + self.session.user_state.access_token,
+            "Content-Type": "application/json",
+        }
+
+    async def _fetch_page(self, topic: str, page: int, size: int) -> Dict:
+        endpoint = self.session.get_host().rstrip("/") + SchedulerEndpoints.LIST_API
+        payload = Scheduler._list_payload(self.session.user_state.user_id, topic, page, size)
+
+        response = await self.session.client.post(endpoint, headers=self._headers(), json=payload)
+        response.raise_for_status()
+
+        return response.json()
+
+    async def list_all(self, selected_topic_name):
+        """Call list scheduler API and return results."""
+        try:
+            selected_topic_name = Scheduler._normalize_list_topic(selected_topic_name)
+
+            if selected_topic_name not in LIST_TOPICS:
+                print("Invalid topic selection. Please select from python_notebook, sql_notebook or data_quality.")
+                return None
+
+            data = await self._fetch_page(selected_topic_name, 0, DEFAULT_PAGE_SIZE)
+            return data.get("content", [])
+
+        except httpx.HTTPError as http_err:
+            print(f"Error while calling list scheduler API: {http_err}")
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}")
+
+        return None
+
+    async def iter_jobs(self, selected_topic_name, page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[Dict]:
+        """
+        Iterate over every job of a topic, walking all pages of the listing.
+
+        The next page is requested in a background task while the caller consumes
+        the current one.
+
+        Args:
+            selected_topic_name (str): python_notebook, sql_notebook or data_quality.
+            page_size (int): The number of jobs requested per page.
+
+        Yields:
+            dict: One job of the listing.
+
+        Raises:
+            SchedulerError: If the topic is invalid or a page cannot be fetched.
+        """
+        topic = Scheduler._normalize_list_topic(selected_topic_name)
+        if topic not in LIST_TOPICS:
+            raise SchedulerError("Invalid topic selection. Please select from python_notebook, sql_notebook or data_quality.")
+        if page_size <= 0:
+            raise SchedulerError("Page size must be a positive integer.")
+
+        pending = None
+        try:
+            page = 0
+            data = await self._get_page(topic, page, page_size)
+            while True:
+                content = data.get("content") or []
+                has_next = Scheduler._has_next_page(data, page, page_size, len(content))
+                if has_next:
+                    pending = asyncio.ensure_future(self._get_page(topic, page + 1, page_size))
+
+                for job in content:
+                    yield job
+                del content, data
+
+                if not has_next:
+                    return
+                page += 1
+                data, pending = await pending, None
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def _get_page(self, topic: str, page: int, size: int) -> Dict:
+        try:
+            return await self._fetch_page(topic, page, size)
+        except httpx.HTTPError as http_err:
+            raise SchedulerError(f"Failed to list page {page} of {topic}: {http_err}")
+
+    async def _trigger(self, scheduler_name, scheduler_id, job_type) -> Dict:
+        endpoint = self.session.get_host() + SchedulerEndpoints.TRIGGER_API
+        payload = Scheduler._trigger_payload(self.session.user_state.user_id, scheduler_name,
+                                             scheduler_id, job_type)
+
+        response = await self.session.client.post(endpoint, headers=self._headers(), json=payload)
+        response.raise_for_status()
+
+        return response.json()
+
+    async def trigger_scheduler(self, scheduler_name, scheduler_id, job_type):
+        """Trigger scheduler API."""
+        try:
+            return await self._trigger(scheduler_name, scheduler_id, job_type)
+        except httpx.HTTPError as req_err:
+            print(f"Error while triggering scheduler: {req_err}")
+            return None
+
+    async def trigger_many(self, jobs: Iterable, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                           rate_limit: float = None) -> AsyncIterator[TriggerResult]:
+        """
+        Trigger many jobs concurrently on the event loop.
+
+        Args:
+            jobs (iterable): Jobs to trigger, in any form accepted by `Scheduler.trigger_many`.
+            max_concurrency (int): Maximum number of triggers in flight at once.
+            rate_limit (float, optional): Maximum number of triggers started per second.
+
+        Yields:
+            TriggerResult: The outcome of one trigger, in completion order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limiter = RateLimiter(rate_limit, capacity=1) if rate_limit else None
+
+        async def run(job):
+            async with semaphore:
+                if limiter is not None:
+                    await limiter.acquire_async()
+                started = time.perf_counter()
+                try:
+                    name, job_id, topic = Scheduler._job_arguments(job)
+                    response = await self._trigger(name, job_id, topic)
+                    return TriggerResult(job, response, None, time.perf_counter() - started)
+                except Exception as e:
+                    return TriggerResult(job, None, e, time.perf_counter() - started)
+
+        tasks = [asyncio.ensure_future(run(job)) for job in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -1,24 +1,58 @@
 """
 Authentication module for PyAvrio Scheduler
 """
+import threading
+
 import requests
-import base64
-import json
 from .endpoints import SchedulerEndpoints
 from typing import Dict
-from .state import UserState
+from .state import SessionState, UserState
 from .session import Session
+from .tokens import DEFAULT_REFRESH_MARGIN, TokenFileCache, TokenManager, decode_jwt_payload
+from .transport import DEFAULT_BACKEND, create_transport
+from .userdetails import UserDetailsCache
 
 class AuthenticationError(Exception):
     """Custom exception for authentication errors"""
     pass
 
+class UserDetailsError(AuthenticationError):
+    """Custom exception for user details lookup errors"""
+    pass
+
 class Authentication:
-    def __init__(self):
+    def __init__(self, transport=None, token_cache=None,
+                 refresh_margin: float = DEFAULT_REFRESH_MARGIN, shared_state: bool = False,
+                 user_details: UserDetailsCache = None, prefetch_user_details: bool = False):
         """
         Initialize the Authentication class with default values.
+
+        Args:
+            transport (BaseTransport or str, optional): The HTTP transport to use, or the name
+                of the backend to create one with: "requests" (the default) or "http2". It is
+                handed over to the returned Session so that sign-in and scheduler calls share
+                connections.
+            token_cache (TokenFileCache or str, optional): On-disk token cache, or its path,
+                used by the password method to skip signing in while a cached token is valid.
+            refresh_margin (float): Seconds before expiry at which password sessions sign in again.
+            shared_state (bool): Store the authentication state in the process-global UserState
+                singleton, as earlier versions did. By default every authenticated Session gets
+                its own SessionState, so several users or hosts can be used side by side.
+            user_details (UserDetailsCache, optional): Memoizes the user ID of every signed-in
+                user. Pass one cache to several Authentication objects to share it. A new one
+                is created when not provided.
+            prefetch_user_details (bool): Look the user ID up on a background thread as soon as
+                the session is created, instead of on the first call that needs it.
         """
-        self.user_state = UserState()  # Store user authentication state
+        self.shared_state = shared_state
+        self.user_state = self._new_state()  # Store user authentication state
+        if transport is None or isinstance(transport, str):
+            transport = create_transport(transport or DEFAULT_BACKEND)
+        self.transport = transport
+        self.token_cache = TokenFileCache(token_cache) if isinstance(token_cache, str) else token_cache
+        self.refresh_margin = refresh_margin
+        self.user_details = user_details if user_details is not None else UserDetailsCache()
+        self.prefetch_user_details = prefetch_user_details
         self.token_endpoint = SchedulerEndpoints.TOKEN_ENDPOINT # Endpoint for obtaining a token
         self.user_details_endpoint = SchedulerEndpoints.USER_DETAILS  # Endpoint for fetching user details
 
@@ -42,6 +76,92 @@ class Authentication:
         Raises:
             AuthenticationError: If required parameters are missing, invalid, or if authentication fails.
         """
+        host, method, credentials = self._parse_auth_params(auth_params)
+
+        # Every session owns its state, unless the process-global singleton is shared
+        user_state = self._new_state()
+
+        token_manager = None
+        if method == 'password':
+            username, password = credentials['username'], credentials['password']
+
+            # Sign in through a token manager so the session signs in again before the token expires
+            cache_key = TokenFileCache.make_key(host, username) if self.token_cache is not None else None
+            token_manager = TokenManager(lambda: self._sign_in(host, username, password),
+                                         refresh_margin=self.refresh_margin,
+                                         cache=self.token_cache, cache_key=cache_key)
+
+            # Update user state with obtained access token
+            user_state.access_token = token_manager.get_token()
+            user_state.username = username
+        else:
+            # Update user state with provided access token
+            user_state.access_token = credentials['access_token']
+        
+        # Extract user email from the JWT token for additional validation
+        email = self.extract_email_from_jwt(user_state.access_token)
+        user_state.email = email
+
+        # Return a session object containing the authenticated user's state
+        self.user_state = user_state
+        session = Session(host, user_state, self.transport, token_manager)
+
+        # The user ID is only looked up when a call needs it, and memoized per host and email
+        user_state.set_user_id_loader(lambda: self.user_details.resolve(
+            host, email, lambda: self.fetch_user_id(host, session.get_access_token(), email)))
+        if self.prefetch_user_details:
+            threading.Thread(target=self._prefetch_user_id, args=(user_state,), daemon=True).start()
+        return session
+
+    @staticmethod
+    def _prefetch_user_id(user_state: SessionState):
+        """Resolve the user ID in the background. A failure is raised again by the next read."""
+        try:
+            user_state.user_id
+        except AuthenticationError:
+            pass
+    
+    def _new_state(self) -> SessionState:
+        """Create the state of a new session, or return the singleton when it is shared."""
+        return UserState() if self.shared_state else SessionState()
+
+    def _sign_in(self, host: str, username: str, password: str) -> str:
+        """
+        Sign in with a username and password.
+
+        Returns:
+            str: The new access token.
+
+        Raises:
+            AuthenticationError: If the sign-in request fails.
+        """
+        # Prepare payload and headers for API request
+        payload = {"email": username, "password": password}
+        headers = {"Content-Type": "application/json"}
+
+        try:
+            # Send API request to obtain the access token
+            response = self.transport.post(host + self.token_endpoint, json=payload, headers=headers)
+            response.raise_for_status()  # Raise an error if the response status is not 200
+            return self.transport.decode(response).get("accessToken")
+        except requests.exceptions.RequestException as e:
+            # Handle request failures
+            raise AuthenticationError(f"Failed to obtain access token: {str(e)}")
+
+    @staticmethod
+    def _parse_auth_params(auth_params: Dict):
+        """
+        Validate authentication parameters.
+
+        Args:
+            auth_params (dict): Dictionary containing authentication parameters.
+
+        Returns:
+            tuple: The host, the authentication method and a dictionary of its credentials.
+
+        Raises:
+            AuthenticationError: If required parameters are missing or the method is unsupported.
+        """
         # Extract host from authentication parameters
         host = auth_params.get('host')
         if not host:
@@ -51,81 +171,75 @@ class Authentication:
         method = auth_params.get('method')
         if not method:
             raise AuthenticationError("Authentication method must be specified.")
-        
+
         if method == 'password':
             # Extract username and password for password-based authentication
             username = auth_params.get('username')
             password = auth_params.get('password')
-            
             if not username or not password:
                 raise AuthenticationError("Username and password are required for password authentication.")
-                
-            # Prepare payload and headers for API request
-            payload = {"email": username, "password": password}
-            headers = {"Content-Type": "application/json"}
-            
-            try:
-                # Send API request to obtain the access token
-                response = requests.post(host + self.token_endpoint, json=payload, headers=headers)
-                response.raise_for_status()  # Raise an error if the response status is not 200
-                data = response.json()
-                
-                # Update user state with obtained access token
-                self.user_state.username = username
-                self.user_state.access_token = data.get("accessToken")
-            except requests.exceptions.RequestException as e:
-                # Handle request failures
-                raise AuthenticationError(f"Failed to obtain access token: {str(e)}")
-        
-        elif method == 'access_token':
+            return host, method, {'username': username, 'password': password}
+
+        if method == 'access_token':
             # Extract access token for token-based authentication
             access_token = auth_params.get('access_token')
             if not access_token:
                 raise AuthenticationError("Access token is required for token authentication.")
-                
-            # Update user state with provided access token
-            self.user_state.access_token = access_token
-        else:
-            # Raise an error for unsupported authentication methods
-            raise AuthenticationError(f"Unsupported authentication method: {method}")
-        
-        # Extract user email from the JWT token for additional validation
-        email = self.extract_email_from_jwt(self.user_state.access_token)
-        self.user_state.email = email
+            return host, method, {'access_token': access_token}
 
-        # Fetch and update user details using the user details endpoint
-        self.update_user_details(host, self.user_state.access_token)
+        # Raise an error for unsupported authentication methods
+        raise AuthenticationError(f"Unsupported authentication method: {method}")
 
-        # Return a session object containing the authenticated user's state
-        return Session(host, self.user_state)
-    
-    def update_user_details(self, host,  access_token: str):
+    def update_user_details(self, host,  access_token: str, user_state: SessionState = None):
         """
-        Get user details using the access token and user email.
+        Get user details using the access token and user email, and store the user ID.
 
         Args:
-            access_token: The access token to use for authentication
+            host (str): The host URL.
+            access_token (str): The access token to use for authentication.
+            user_state (SessionState, optional): The state to update. Defaults to the state
+                of the last authentication.
 
         Returns:
-            Dictionary containing user details if successful, None otherwise
+            The user ID.
+
+        Raises:
+            UserDetailsError: If the user details cannot be fetched.
         """
-        try:
-            headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
-            payload = {"emailId": self.user_state.email}
-            # Make a request to the user details endpoint
-            response = requests.post(host+self.user_details_endpoint, json=payload, headers=headers)
-            response.raise_for_status()
-           # Extract JSON data
-            response_data = response.json()
+        if user_state is None:
+            user_state = self.user_state
+        user_id = self.fetch_user_id(host, access_token, user_state.email)
+        self.user_details.store(host, user_state.email, user_id)
+        user_state.user_id = user_id
+        return user_id
 
-            # Safely extract 'userId' from the response dictionary
-            user_id = response_data.get('userId')
+    def fetch_user_id(self, host: str, access_token: str, email: str):
+        """
+        Fetch the ID of a user from the user details endpoint.
 
-            # Assign it to the user_state attribute
-            self.user_state.user_id = user_id
+        Args:
+            host (str): The host URL.
+            access_token (str): The access token to use for authentication.
+            email (str): The email address of the user.
 
-        except requests.exceptions.RequestException:
-            return None
+        Returns:
+            The user ID.
+
+        Raises:
+            UserDetailsError: If the request fails or the response holds no user ID.
+        """
+        headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
+        payload = {"emailId": email}
+        try:
+            # Make a request to the user details endpoint
+            response = self.transport.post(host + self.user_details_endpoint, json=payload, headers=headers)
+            response.raise_for_status()
+            user_id = self.transport.decode(response).get('userId')
+        except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+            raise UserDetailsError(f"Failed to fetch user details for {email}: {e}")
+        if user_id is None:
+            raise UserDetailsError(f"The user details of {email} hold no user ID.")
+        return user_id
 
     @staticmethod
     def extract_email_from_jwt(jwt_token):
@@ -139,22 +253,8 @@ class Authentication:
             str: The email address if present in the payload.
         """
         try:
-            # Split the JWT into its components
-            parts = jwt_token.split('.')
-            if len(parts) != 3:
-                raise ValueError("Invalid JWT token format.")
-            
-            # The payload is the second part
-            payload_base64 = parts[1]
-            
-            # Add padding if necessary
-            payload_base64 += '=' * ((4 - len(payload_base64) % 4) % 4)
-            
-            # Decode the Base64 payload
-            payload_json = base64.urlsafe_b64decode(payload_base64).decode('utf-8')
-            
-            # Parse the JSON payload
-            payload_data = json.loads(payload_json)
+            # Decode the payload of the JWT
+            payload_data = decode_jwt_payload(jwt_token)
             
             # Extract the email field
             email = payload_data.get('email')
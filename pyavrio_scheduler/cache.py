@@ -0,0 +1,207 @@
+"""
+Listing cache for PyAvrio Scheduler
+
+The ListingCache class keeps recent job listings in memory with a TTL and an
+LRU size limit. Expired entries keep the `ETag`/`Last-Modified` validators sent
+by the server so that the next request can be made conditional and an
+unchanged listing comes back as a cheap `304 Not Modified`.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+DEFAULT_TTL = 30.0  # Seconds a listing is served without contacting the server
+DEFAULT_MAX_ENTRIES = 256  # Listings kept before the least recently used is evicted
+
+
+class CacheEntry:
+    """
+    A cached listing and its validators.
+
+    Attributes:
+        value (list): The cached list of jobs.
+        etag (str): The `ETag` header of the response, if any.
+        last_modified (str): The `Last-Modified` header of the response, if any.
+        expires (float): Clock time after which the entry must be revalidated.
+    """
+    __slots__ = ("value", "etag", "last_modified", "expires")
+
+    def __init__(self, value, etag: Optional[str], last_modified: Optional[str], expires: float):
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+    def conditional_headers(self) -> Dict:
+        """Build the `If-None-Match`/`If-Modified-Since` headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ListingCache:
+    """
+    A thread-safe TTL and LRU cache of job listings.
+
+    Attributes:
+        ttl (float): Seconds an entry is fresh.
+        max_entries (int): Maximum number of entries kept.
+        hits (int): Lookups answered from a fresh entry.
+        misses (int): Lookups that found no entry or an expired one.
+        not_modified (int): Expired entries revalidated by a `304` response.
+        evictions (int): Entries dropped by the LRU limit.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES, clock=time.monotonic):
+        """
+        Initialize an empty cache.
+
+        Args:
+            ttl (float): Seconds an entry is served without contacting the server.
+            max_entries (int): Maximum number of listings kept.
+            clock (callable): Monotonic clock returning seconds.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer.")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(host: str, user_id, topic: str, filters: Dict = None) -> Tuple:
+        """
+        Build the cache key of a listing.
+
+        Args:
+            host (str): The Avrio host.
+            user_id: The ID of the user the listing belongs to.
+            topic (str): The normalized list topic.
+            filters (dict, optional): Any filter sent with the listing.
+
+        Returns:
+            tuple: A hashable key.
+        """
+        frozen = tuple(sorted((name, _freeze(value)) for name, value in (filters or {}).items()))
+        return host.rstrip("/"), user_id, topic, frozen
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[CacheEntry], bool]:
+        """
+        Look up a listing and record a hit or a miss.
+
+        Args:
+            key (tuple): A key built by `make_key`.
+
+        Returns:
+            tuple: The entry (or None) and whether it is still fresh.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if self._clock() < entry.expires:
+                self.hits += 1
+                return entry, True
+            self.misses += 1
+            return entry, False
+
+    def store(self, key: Hashable, value, etag: str = None, last_modified: str = None):
+        """
+        Store a freshly downloaded listing.
+
+        Args:
+            key (tuple): A key built by `make_key`.
+            value (list): The listing.
+            etag (str, optional): The `ETag` header of the response.
+            last_modified (str, optional): The `Last-Modified` header of the response.
+        """
+        with self._lock:
+            self._entries[key] = CacheEntry(value, etag, last_modified, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidate(self, key: Hashable, expected: CacheEntry = None) -> Optional[CacheEntry]:
+        """
+        Mark an expired entry as fresh again after a `304 Not Modified` response.
+
+        Args:
+            key (tuple): A key built by `make_key`.
+            expected (CacheEntry, optional): The entry whose validators were sent. It is only
+                refreshed if it is still the entry of the key.
+
+        Returns:
+            CacheEntry: The refreshed entry, or None if it was invalidated or replaced meanwhile.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (expected is not None and entry is not expected):
+                return None
+            entry.expires = self._clock() + self.ttl
+            self.not_modified += 1
+            return entry
+
+    def invalidate(self, host: str = None, user_id=None, topic: str = None) -> int:
+        """
+        Drop every entry matching the given host, user and topic.
+
+        Arguments left as None match any value.
+
+        Returns:
+            int: The number of entries dropped.
+        """
+        host = host.rstrip("/") if host is not None else None
+        with self._lock:
+            stale = [key for key in self._entries
+                     if (host is None or key[0] == host)
+                     and (user_id is None or key[1] == user_id)
+                     and (topic is None or key[2] == topic)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: hits, misses, not_modified, evictions and the current size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+
+def _freeze(value):
+    """Turn lists and dicts into hashable tuples."""
+    if isinstance(value, dict):
+        return tuple(sorted((name, _freeze(item)) for name, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(item) for item in value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
@@ -0,0 +1,263 @@
+"""
+Indexed job catalog for PyAvrio Scheduler
+
+The JobCatalog class keeps the jobs returned by the list API in memory and
+indexes them by ID, name, topic and status, so that a job can be resolved by
+name without another list call.
+"""
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .jobs import job_id, job_name, job_status
+
+
+class JobCatalog:
+    """
+    An in-memory index of listed jobs.
+
+    Jobs are keyed by (topic, job ID), where topic is the list topic such as
+    `PYTHON_NOTEBOOK`, `SQL_NOTEBOOK` or `DSDQ`.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty catalog.
+        """
+        self._jobs = {}  # (topic, id) -> job
+        self._by_id = {}  # id -> set of keys
+        self._by_name = {}  # name -> set of keys
+        self._by_topic = {}  # topic -> set of keys
+        self._by_status = {}  # status -> set of keys
+        self._sorted_names = []  # Sorted names for prefix lookups, rebuilt lazily
+        self._names_dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, key: Tuple) -> bool:
+        return key in self._jobs
+
+    @staticmethod
+    def _index(index: Dict, value, key: Tuple):
+        index.setdefault(value, set()).add(key)
+
+    @staticmethod
+    def _unindex(index: Dict, value, key: Tuple):
+        keys = index.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[value]
+
+    def add(self, topic: str, job: Dict) -> bool:
+        """
+        Add or replace a job.
+
+        Args:
+            topic (str): The list topic of the job.
+            job (dict): The job as returned by the list API.
+
+        Returns:
+            bool: True if the job was new or changed, False if it was already identical.
+        """
+        key = (topic, job_id(job))
+        with self._lock:
+            previous = self._jobs.get(key)
+            if previous == job:
+                return False
+            if previous is not None:
+                self._remove_key(key)
+            self._jobs[key] = job
+            self._index(self._by_id, key[1], key)
+            self._index(self._by_topic, topic, key)
+            self._index(self._by_status, job_status(job), key)
+            name = job_name(job)
+            if name not in self._by_name:
+                self._names_dirty = True
+            self._index(self._by_name, name, key)
+            return True
+
+    def remove(self, topic: str, scheduler_id) -> Optional[Dict]:
+        """
+        Remove a job.
+
+        Args:
+            topic (str): The list topic of the job.
+            scheduler_id: The ID of the job.
+
+        Returns:
+            dict: The removed job, or None if it was not in the catalog.
+        """
+        with self._lock:
+            return self._remove_key((topic, scheduler_id))
+
+    def _remove_key(self, key: Tuple) -> Optional[Dict]:
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return None
+        self._unindex(self._by_id, key[1], key)
+        self._unindex(self._by_topic, key[0], key)
+        self._unindex(self._by_status, job_status(job), key)
+        name = job_name(job)
+        self._unindex(self._by_name, name, key)
+        if name not in self._by_name:
+            self._names_dirty = True
+        return job
+
+    def update(self, topic: str, jobs: Iterable[Dict]) -> Dict:
+        """
+        Replace the jobs of a topic with a fresh listing, touching only what changed.
+
+        Args:
+            topic (str): The list topic of the listing.
+            jobs (iterable): The full listing of the topic.
+
+        Returns:
+            dict: The number of `added`, `changed` and `removed` jobs.
+        """
+        counts = {"added": 0, "changed": 0, "removed": 0}
+        with self._lock:
+            stale = set(self._by_topic.get(topic, ()))
+            for job in jobs:
+                key = (topic, job_id(job))
+                existed = key in self._jobs
+                stale.discard(key)
+                if self.add(topic, job):
+                    counts["changed" if existed else "added"] += 1
+            for key in stale:
+                self._remove_key(key)
+            counts["removed"] = len(stale)
+        return counts
+
+    def refresh(self, scheduler, topics: Iterable[str] = ("python_notebook", "sql_notebook", "data_quality"),
+                page_size: int = None) -> Dict:
+        """
+        Refresh the catalog from the list API.
+
+        Args:
+            scheduler (Scheduler): The scheduler used to list jobs.
+            topics (iterable): The topics to refresh.
+            page_size (int, optional): The number of jobs requested per page.
+
+        Returns:
+            dict: The number of `added`, `changed` and `removed` jobs per list topic.
+        """
+        result = {}
+        for topic in topics:
+            list_topic = scheduler._normalize_list_topic(topic)
+            kwargs = {"page_size": page_size} if page_size else {}
+            result[list_topic] = self.update(list_topic, scheduler.iter_jobs(list_topic, **kwargs))
+        return result
+
+    def get(self, scheduler_id, topic: str = None) -> Optional[Dict]:
+        """
+        Find a job by ID.
+
+        Args:
+            scheduler_id: The ID of the job.
+            topic (str, optional): The list topic, needed when IDs repeat across topics.
+
+        Returns:
+            dict: The job, or None if it is unknown.
+
+        Raises:
+            LookupError: If the ID is ambiguous across topics.
+        """
+        with self._lock:
+            if topic is not None:
+                return self._jobs.get((topic, scheduler_id))
+            return self._single(self._by_id.get(scheduler_id), f"ID {scheduler_id!r}")
+
+    def find_by_name(self, name: str, topic: str = None) -> Optional[Dict]:
+        """
+        Find a job by exact name.
+
+        Args:
+            name (str): The name of the job.
+            topic (str, optional): The list topic, needed when names repeat across topics.
+
+        Returns:
+            dict: The job, or None if it is unknown.
+
+        Raises:
+            LookupError: If several jobs share the name.
+        """
+        with self._lock:
+            keys = self._by_name.get(name)
+            if keys and topic is not None:
+                keys = {key for key in keys if key[0] == topic}
+            return self._single(keys, f"name {name!r}")
+
+    def resolve(self, name: str, topic: str = None) -> Tuple[str, Dict]:
+        """
+        Resolve a job name to its topic and job.
+
+        Args:
+            name (str): The name of the job.
+            topic (str, optional): The list topic, needed when names repeat across topics.
+
+        Returns:
+            tuple: The list topic and the job.
+
+        Raises:
+            LookupError: If the name is unknown or ambiguous.
+        """
+        with self._lock:
+            keys = self._by_name.get(name)
+            if keys and topic is not None:
+                keys = {key for key in keys if key[0] == topic}
+            if not keys:
+                raise LookupError(f"No job named {name!r} in the catalog.")
+            job = self._single(keys, f"name {name!r}")
+            return next(iter(keys))[0], job
+
+    def _single(self, keys, label: str) -> Optional[Dict]:
+        """Get the job of a single key. Needs the lock."""
+        if not keys:
+            return None
+        if len(keys) > 1:
+            raise LookupError(f"Several jobs match {label}: {sorted(map(str, keys))}")
+        return self._jobs[next(iter(keys))]
+
+    def with_prefix(self, prefix: str) -> List[Dict]:
+        """
+        Find every job whose name starts with a prefix.
+
+        Args:
+            prefix (str): The name prefix.
+
+        Returns:
+            list: The matching jobs ordered by name.
+        """
+        with self._lock:
+            if self._names_dirty:
+                self._sorted_names = sorted(name for name in self._by_name if isinstance(name, str))
+                self._names_dirty = False
+            names = self._sorted_names
+            start = bisect.bisect_left(names, prefix)
+            jobs = []
+            for name in names[start:]:
+                if not name.startswith(prefix):
+                    break
+                jobs.extend(self._jobs[key] for key in sorted(self._by_name[name], key=str))
+            return jobs
+
+    def by_topic(self, topic: str) -> List[Dict]:
+        """Get every job of a list topic."""
+        with self._lock:
+            return [self._jobs[key] for key in self._by_topic.get(topic, ())]
+
+    def by_status(self, status) -> List[Dict]:
+        """Get every job with the given status."""
+        with self._lock:
+            return [self._jobs[key] for key in self._by_status.get(status, ())]
+
+    def clear(self):
+        """Drop every job."""
+        with self._lock:
+            for index in (self._jobs, self._by_id, self._by_name, self._by_topic, self._by_status):
+                index.clear()
+            self._sorted_names = []
+            self._names_dirty = False
@@ -0,0 +1,314 @@
+"""
+Command line interface for PyAvrio Scheduler
+
+The `pyavrio-scheduler` command signs in, lists jobs as JSON Lines and triggers
+one job or a batch of jobs read from a file or standard input:
+
+    pyavrio-scheduler auth --host https://avrio.example.com --username user@example.com
+    pyavrio-scheduler list sql_notebook --status FAILED > failed.jsonl
+    pyavrio-scheduler bulk-trigger failed.jsonl --workers 8 --rate-limit 20
+
+Connection settings default to the PYAVRIO_HOST, PYAVRIO_USERNAME,
+PYAVRIO_PASSWORD, PYAVRIO_ACCESS_TOKEN, PYAVRIO_TOKEN_CACHE and PYAVRIO_TRANSPORT
+environment variables. `auth` stores the access token in the token cache, so later commands
+only need the host and username until it expires.
+
+Only the standard library is imported until a command runs, which keeps
+`--help` and cron invocations fast.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from typing import Dict, Iterator, List, TextIO
+
+DEFAULT_TOKEN_CACHE = "~/.cache/pyavrio-scheduler/tokens.json"  # Used unless PYAVRIO_TOKEN_CACHE is set
+
+EXIT_OK = 0
+EXIT_FAILURE = 1  # The command ran but an operation failed
+EXIT_USAGE = 2  # Invalid arguments or missing credentials, as reported by argparse
+
+
+class CommandError(Exception):
+    """Custom exception for command line errors"""
+    pass
+
+
+def _write_line(stream: TextIO, value):
+    stream.write(json.dumps(value, default=str, separators=(",", ":")))
+    stream.write("\n")
+
+
+def _token_cache(args):
+    """Open the token cache selected on the command line, or return None when disabled."""
+    if args.no_token_cache:
+        return None
+    from .tokens import TokenFileCache
+    return TokenFileCache(args.token_cache)
+
+
+def _cached_token(args, cache) -> str:
+    """Get the cached token of the host and username if it is still valid."""
+    if cache is None or not args.username:
+        return None
+    import time
+    from .tokens import DEFAULT_REFRESH_MARGIN, token_expiry
+    token = cache.load(cache.make_key(args.host, args.username))
+    if token is None:
+        return None
+    expires_at = token_expiry(token)
+    if expires_at is not None and time.time() >= expires_at - DEFAULT_REFRESH_MARGIN:
+        return None
+    return token
+
+
+def _authenticate(args, refresh: bool = False):
+    """
+    Open a session from the command line options.
+
+    An explicit access token wins. Otherwise a valid cached token is reused, and
+    the password is only needed to sign in when there is none.
+
+    Raises:
+        CommandError: If the host or the credentials are missing.
+    """
+    if not args.host:
+        raise CommandError("A host is required: pass --host or set PYAVRIO_HOST.")
+    from .auth import Authentication
+
+    cache = _token_cache(args)
+    if args.access_token:
+        params = {"method": "access_token", "access_token": args.access_token}
+    else:
+        token = None if refresh else _cached_token(args, cache)
+        if token is not None:
+            params = {"method": "access_token", "access_token": token}
+        elif args.username and args.password:
+            if refresh and cache is not None:
+                cache.delete(cache.make_key(args.host, args.username))
+            params = {"method": "password", "username": args.username, "password": args.password}
+        else:
+            raise CommandError("No valid cached token: pass --username and --password, "
+                               "or --access-token, or set the PYAVRIO_* variables.")
+    params["host"] = args.host
+    return Authentication(transport=args.transport, token_cache=cache).authenticate(params)
+
+
+def _chain(first: str, rest: Iterator[str]) -> Iterator[str]:
+    yield first
+    yield from rest
+
+
+def _job_id(value: str):
+    """Convert a numeric job ID given as text to an integer, as the list API returns them."""
+    return int(value) if value.isdigit() else value
+
+
+def _json_rows(lines: Iterator[str]) -> Iterator[Dict]:
+    for number, line in enumerate(lines, 1):
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise CommandError(f"Line {number} is not valid JSON: {e}")
+
+
+def _csv_rows(reader: csv.DictReader) -> Iterator[Dict]:
+    for row in reader:
+        row["jobId"] = _job_id(row.get("jobId") or "")
+        yield row
+
+
+def _read_jobs(stream: TextIO) -> Iterator[Dict]:
+    """
+    Read jobs to trigger as JSON Lines or as CSV with a header row.
+
+    Every job needs `jobName`, `jobId` and `topic`, the format written by the
+    `list` command. Blank lines are skipped.
+
+    Raises:
+        CommandError: If a line cannot be decoded or a field is missing.
+    """
+    lines = (line for line in stream if line.strip())
+    first = next(lines, None)
+    if first is None:
+        return
+    if first.lstrip().startswith("{"):
+        rows = _json_rows(_chain(first, lines))
+    else:
+        rows = _csv_rows(csv.DictReader(_chain(first, lines)))
+
+    for number, row in enumerate(rows, 1):
+        missing = [field for field in ("jobName", "jobId", "topic") if row.get(field) in (None, "")]
+        if missing:
+            raise CommandError(f"Job {number} is missing {', '.join(missing)}.")
+        yield row
+
+
+def cmd_auth(args, stdout: TextIO) -> int:
+    """Sign in and store the token in the cache."""
+    session = _authenticate(args, refresh=args.refresh)
+    from .tokens import token_expiry
+    state = session.user_state
+    _write_line(stdout, {"host": session.get_host(), "email": state.email, "userId": state.user_id,
+                         "expiresAt": token_expiry(state.access_token)})
+    session.close()
+    return EXIT_OK
+
+
+def cmd_list(args, stdout: TextIO) -> int:
+    """Write every job of the selected topics as one JSON object per line."""
+    from .scheduler import Scheduler
+
+    topics = "all" if any(topic.lower() == "all" for topic in args.topics) else args.topics
+    job_types = Scheduler._job_types(topics)
+    with _authenticate(args) as session:
+        scheduler = session.get_scheduler()
+        for job_type in job_types:
+            for job in scheduler.iter_jobs(job_type, page_size=args.page_size, stream=True,
+                                           search=args.search, sort_by=args.sort_by,
+                                           ascending=not args.descending, status=args.status,
+                                           frequency=args.frequency):
+                _write_line(stdout, job)
+    return EXIT_OK
+
+
+def cmd_trigger(args, stdout: TextIO) -> int:
+    """Trigger one job."""
+    with _authenticate(args) as session:
+        response = session.get_scheduler().trigger_scheduler(args.name, args.id, args.topic)
+    if response is None:
+        return EXIT_FAILURE
+    _write_line(stdout, response)
+    return EXIT_OK
+
+
+def cmd_bulk_trigger(args, stdout: TextIO) -> int:
+    """Trigger the jobs read from a file or standard input, writing one result per line."""
+    if args.file == "-":
+        jobs = list(_read_jobs(sys.stdin))
+    else:
+        with open(args.file, "r", encoding="utf-8", newline="") as f:
+            jobs = list(_read_jobs(f))
+
+    failed = 0
+    with _authenticate(args) as session:
+        scheduler = session.get_scheduler()
+        for result in scheduler.trigger_many(jobs, max_workers=args.workers, rate_limit=args.rate_limit):
+            job = result.job
+            line = {"jobName": job["jobName"], "jobId": job["jobId"], "topic": job["topic"], "ok": result.ok,
+                    "latencyMs": round(result.latency * 1000, 3)}
+            if result.ok:
+                line["response"] = result.response
+            else:
+                line["error"] = str(result.error)
+                failed += 1
+            _write_line(stdout, line)
+    return EXIT_FAILURE if failed else EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser of the `pyavrio-scheduler` command."""
+    from . import __version__
+
+    connection = argparse.ArgumentParser(add_help=False)
+    group = connection.add_argument_group("connection")
+    group.add_argument("--host", default=os.environ.get("PYAVRIO_HOST"),
+                       help="The Avrio host URL. Defaults to $PYAVRIO_HOST.")
+    group.add_argument("--username", default=os.environ.get("PYAVRIO_USERNAME"),
+                       help="The username used to sign in. Defaults to $PYAVRIO_USERNAME.")
+    group.add_argument("--password", default=os.environ.get("PYAVRIO_PASSWORD"),
+                       help="The password used to sign in. Defaults to $PYAVRIO_PASSWORD.")
+    group.add_argument("--access-token", default=os.environ.get("PYAVRIO_ACCESS_TOKEN"),
+                       help="Use this access token instead of signing in. Defaults to $PYAVRIO_ACCESS_TOKEN.")
+    group.add_argument("--token-cache", default=os.environ.get("PYAVRIO_TOKEN_CACHE", DEFAULT_TOKEN_CACHE),
+                       help=f"The token cache file. Defaults to $PYAVRIO_TOKEN_CACHE or {DEFAULT_TOKEN_CACHE}.")
+    group.add_argument("--no-token-cache", action="store_true", help="Neither read nor write the token cache.")
+    group.add_argument("--transport", choices=("requests", "http2"),
+                       default=os.environ.get("PYAVRIO_TRANSPORT", "requests"),
+                       help="The HTTP backend; http2 multiplexes requests over one connection and needs "
+                            "pyavrio-scheduler[http2]. Defaults to $PYAVRIO_TRANSPORT or requests.")
+
+    parser = argparse.ArgumentParser(prog="pyavrio-scheduler", description="List and trigger Avrio schedulers.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    auth = commands.add_parser("auth", parents=[connection], help="Sign in and cache the access token.")
+    auth.add_argument("--refresh", action="store_true", help="Sign in again even if a cached token is valid.")
+    auth.set_defaults(handler=cmd_auth)
+
+    listing = commands.add_parser("list", parents=[connection], help="List jobs as JSON Lines.")
+    listing.add_argument("topics", nargs="*", default=["all"], metavar="topic",
+                         help="python_notebook, sql_notebook, data_quality or all (the default).")
+    listing.add_argument("--search", help="Only list jobs matching this text.")
+    listing.add_argument("--sort-by", help="Sort the listing by this field.")
+    listing.add_argument("--descending", action="store_true", help="Sort in descending order.")
+    listing.add_argument("--status", action="append", help="Only list jobs with this status. Repeatable.")
+    listing.add_argument("--frequency", action="append",
+                         help="Only list jobs with this scheduled frequency. Repeatable.")
+    listing.add_argument("--page-size", type=_positive_int, default=None, help="Jobs requested per page.")
+    listing.set_defaults(handler=cmd_list)
+
+    trigger = commands.add_parser("trigger", parents=[connection], help="Trigger one job.")
+    trigger.add_argument("name", help="The name of the job.")
+    trigger.add_argument("--id", required=True, type=_job_id, help="The ID of the job.")
+    trigger.add_argument("--topic", required=True, help="python_notebook, sql_notebook or data_quality.")
+    trigger.set_defaults(handler=cmd_trigger)
+
+    bulk = commands.add_parser("bulk-trigger", parents=[connection],
+                               help="Trigger jobs read from JSON Lines or CSV.")
+    bulk.add_argument("file", nargs="?", default="-",
+                      help="JSON Lines or CSV with jobName, jobId and topic. Reads standard input by default.")
+    bulk.add_argument("--workers", type=_positive_int, default=None,
+                      help="Concurrent triggers. Defaults to the connection pool size.")
+    bulk.add_argument("--rate-limit", type=_positive_float, default=None, help="Maximum triggers started per second.")
+    bulk.set_defaults(handler=cmd_bulk_trigger)
+    return parser
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
+
+def _positive_float(value: str) -> float:
+    number = float(value)
+    if not (math.isfinite(number) and number > 0):
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number")
+    return number
+
+
+def main(argv: List[str] = None, stdout: TextIO = None) -> int:
+    """
+    Run the `pyavrio-scheduler` command.
+
+    Args:
+        argv (list, optional): The arguments, without the program name. Defaults to `sys.argv[1:]`.
+        stdout (file, optional): Where results are written. Defaults to `sys.stdout`.
+
+    Returns:
+        int: The exit status: 0 on success, 1 if an operation failed and 2 on usage errors.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    stdout = stdout if stdout is not None else sys.stdout
+    try:
+        return args.handler(args, stdout)
+    except CommandError as e:
+        parser.exit(EXIT_USAGE, f"{parser.prog}: error: {e}\n")
+    except BrokenPipeError:
+        # The reader went away, e.g. `pyavrio-scheduler list | head`
+        sys.stderr.close()
+        return EXIT_OK
+    except Exception as e:
+        # Scheduler, authentication and file errors are reported without a traceback
+        sys.stderr.write(f"{parser.prog}: {type(e).__name__}: {e}\n")
+        return EXIT_FAILURE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Request coalescing for PyAvrio Scheduler
+
+The SingleFlight class lets concurrent callers asking for the same thing share
+one call: the first caller for a key runs it, and every caller arriving while it
+is in flight waits for it and receives the same result, or the same exception.
+Nothing is kept once the call returns, so unlike a cache it never serves stale
+data.
+"""
+import threading
+from typing import Callable, Dict, Hashable
+
+
+class _Call:
+    """The outcome of one in-flight call."""
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    A thread-safe group of coalesced calls, keyed by any hashable value.
+
+    Attributes:
+        calls (int): Calls made through `do`.
+        executions (int): Calls that ran the function.
+        coalesced (int): Calls that waited for and shared an in-flight call.
+    """
+
+    def __init__(self):
+        """Initialize an empty group."""
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, function: Callable):
+        """
+        Run a function, or wait for the call already running for the same key.
+
+        Args:
+            key (hashable): Identifies identical calls.
+            function (callable): Called without arguments when no call for the key is in flight.
+
+        Returns:
+            The value returned by the function. Every coalesced caller gets the same object.
+
+        Raises:
+            Exception: Whatever the function raised, re-raised in every coalesced caller.
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._in_flight[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = function()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Get the number of calls currently running."""
+        with self._lock:
+            return len(self._in_flight)
+
+    def stats(self) -> Dict:
+        """
+        Get the coalescing counters.
+
+        Returns:
+            dict: calls, executions, coalesced and the number of calls in flight.
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+            }
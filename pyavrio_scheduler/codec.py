@@ -0,0 +1,160 @@
+"""
+JSON codecs for PyAvrio Scheduler
+
+Request bodies are encoded and response bodies decoded through a JsonCodec.
+`orjson` or `ujson` is used when installed, which decodes a large listing page
+several times faster than the standard library `json` module, the fallback.
+
+Fast codecs differ from `json` on a few inputs, such as integers beyond 64 bits
+or `NaN`. Whenever a fast codec rejects a document, it is handled by `json`
+instead, so every codec returns the same values and raises the same errors.
+Like `requests`, encoding refuses `NaN` and infinities, which are not JSON.
+"""
+import json
+import math
+from typing import Any, Callable, Dict, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    ujson = None
+
+CODEC_PREFERENCE = ("orjson", "ujson", "json")  # Codecs tried by `get_codec` when none is named
+
+_std_encode = json.JSONEncoder(separators=(",", ":"), allow_nan=False).encode
+
+
+def _std_dumps(value) -> bytes:
+    return _std_encode(value).encode("utf-8")
+
+
+def _std_loads(data: Union[bytes, str]):
+    return json.loads(data)
+
+
+class JsonCodec:
+    """
+    Encodes and decodes JSON documents.
+
+    Attributes:
+        name (str): The library doing the work: "orjson", "ujson" or "json".
+    """
+
+    def __init__(self, name: str, dumps: Callable[[Any], bytes], loads: Callable[[Union[bytes, str]], Any]):
+        """
+        Initialize a codec.
+
+        Args:
+            name (str): The name of the codec.
+            dumps (callable): Encodes a value to UTF-8 bytes.
+            loads (callable): Decodes UTF-8 bytes or text.
+        """
+        self.name = name
+        self._dumps = dumps
+        self._loads = loads
+
+    def dumps(self, value) -> bytes:
+        """
+        Encode a value as compact UTF-8 JSON.
+
+        Raises:
+            TypeError: If the value cannot be encoded.
+            ValueError: If the value holds NaN or an infinity.
+        """
+        if self._dumps is _std_dumps:
+            return _std_dumps(value)
+        try:
+            return self._dumps(value)
+        except (TypeError, ValueError, OverflowError):
+            return _std_dumps(value)
+
+    def loads(self, data: Union[bytes, str]):
+        """
+        Decode a JSON document.
+
+        Raises:
+            ValueError: If the document is not valid JSON.
+        """
+        if self._loads is _std_loads:
+            return _std_loads(data)
+        try:
+            return self._loads(data)
+        except (ValueError, OverflowError):
+            return _std_loads(data)
+
+    def __repr__(self) -> str:
+        return f"JsonCodec({self.name!r})"
+
+
+def _is_finite(value) -> bool:
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, dict):
+        return all(_is_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(_is_finite(item) for item in value)
+    return True
+
+
+# Maps every digit to "0" and every other byte to a space, to find long digit runs quickly
+_DIGITS = bytes(48 if 48 <= byte <= 57 else 32 for byte in range(256))
+_LONG_NUMBER = b"0" * 19  # Integers from 19 digits on may not fit in 64 bits
+
+
+def _orjson_loads(data: Union[bytes, str]):
+    # orjson turns integers beyond 64 bits into floats instead of failing
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    if _LONG_NUMBER in raw.translate(_DIGITS):
+        raise ValueError("Integer may exceed 64 bits.")
+    return orjson.loads(data)
+
+
+def _orjson_dumps(value) -> bytes:
+    # orjson writes NaN and infinities as null instead of refusing them
+    if not _is_finite(value):
+        raise ValueError("Out of range float values are not JSON compliant.")
+    return orjson.dumps(value)
+
+
+def _available() -> Dict[str, JsonCodec]:
+    codecs = {"json": JsonCodec("json", _std_dumps, _std_loads)}
+    if orjson is not None:
+        codecs["orjson"] = JsonCodec("orjson", _orjson_dumps, _orjson_loads)
+    if ujson is not None:
+        codecs["ujson"] = JsonCodec("ujson", lambda value: ujson.dumps(value, ensure_ascii=False).encode("utf-8"),
+                                    ujson.loads)
+    return codecs
+
+
+_CODECS = _available()
+
+
+def available_codecs() -> list:
+    """Get the names of the installed codecs, fastest first."""
+    return [name for name in CODEC_PREFERENCE if name in _CODECS]
+
+
+def get_codec(name: str = None) -> JsonCodec:
+    """
+    Get a codec by name, or the fastest one installed.
+
+    Args:
+        name (str, optional): "orjson", "ujson" or "json".
+
+    Returns:
+        JsonCodec: The codec.
+
+    Raises:
+        ValueError: If the named codec is unknown or not installed.
+    """
+    if name is None:
+        return _CODECS[available_codecs()[0]]
+    codec = _CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"JSON codec {name!r} is not available. Installed: {', '.join(available_codecs())}.")
+    return codec
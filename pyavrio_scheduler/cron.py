@@ -0,0 +1,530 @@
+"""
+Local cron dispatcher for PyAvrio Scheduler
+
+CronExpression parses standard five-field cron expressions (minute, hour, day
+of month, month, day of week), an optional leading seconds field, names such as
+`MON` or `JAN`, and the `@hourly`, `@daily`, `@weekly`, `@monthly` and `@yearly`
+macros. When both the day of month and the day of week are restricted, a day
+matching either one matches, as in Vixie cron.
+
+CronDispatcher triggers Avrio jobs on cron expressions from inside the process,
+instead of forking a process per firing from the system cron. One thread keeps
+the next fire time of every schedule in a min-heap and sleeps until the earliest
+one, so dispatching costs O(log n) per firing and each schedule holds one heap
+entry. Triggers are sent like `Scheduler.trigger_scheduler` sends them, over the shared
+session, from a small worker pool so a slow request never delays other firings.
+
+Firings missed while the process was paused or overloaded are handled by the
+misfire policy: a run later than `misfire_grace` seconds is skipped, and with
+`coalesce` several missed runs of a schedule fire once. A random `jitter`
+spreads schedules sharing an expression over a few seconds.
+"""
+import bisect
+import heapq
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from .ratelimit import RateLimiter
+
+DEFAULT_WORKERS = 8  # Triggers sent concurrently
+DEFAULT_MISFIRE_GRACE = 60.0  # Seconds a run may be late before it is skipped
+MAX_CATCH_UP = 100  # Missed runs of one schedule fired or counted at once, older ones are dropped
+MAX_WAIT = 1.0  # Seconds the dispatcher sleeps at most, so wall clock changes are noticed
+SEARCH_YEARS = 8  # Years searched for the next run before an expression is deemed impossible
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+MONTH_NAMES = {name: number for number, name in enumerate(
+    ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"), 1)}
+DAY_NAMES = {name: number for number, name in enumerate(("SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"))}
+
+_DEFAULT = object()  # Marks arguments defaulting to the dispatcher setting
+
+logger = logging.getLogger(__name__)
+
+
+class CronError(ValueError):
+    """Custom exception for invalid cron expressions"""
+    pass
+
+
+def _parse_field(text: str, low: int, high: int, names: dict = None) -> Tuple[int, ...]:
+    """Parse one field into the sorted values it matches."""
+    def number(value: str) -> int:
+        value = value.upper()
+        if names and value in names:
+            return names[value]
+        if not value.isdigit():
+            raise CronError(f"Invalid value {value!r} in cron field {text!r}.")
+        return int(value)
+
+    values = set()
+    for part in text.split(","):
+        step = None
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronError(f"Invalid step in cron field {text!r}.")
+            step = int(step_text)
+        if part in ("*", "?"):
+            start, end = low, high
+        elif "-" in part:
+            first, last = part.split("-", 1)
+            start, end = number(first), number(last)
+        else:
+            start = number(part)
+            end = high if step is not None else start  # "5/15" means "5-max/15"
+        if not low <= start <= end <= high:
+            raise CronError(f"Cron field {text!r} is outside {low}-{high}.")
+        values.update(range(start, end + 1, step or 1))
+    return tuple(sorted(values))
+
+
+class CronExpression:
+    """
+    A parsed cron expression, computing the next run after a given time.
+
+    Instances are immutable; `parse_cron` shares one instance per expression.
+
+    Attributes:
+        expression (str): The expression as given.
+        tz (tzinfo): The time zone the expression is evaluated in.
+    """
+    __slots__ = ("expression", "tz", "_seconds", "_minutes", "_hours", "_days", "_months", "_weekdays",
+                 "_day_or", "_has_seconds")
+
+    def __init__(self, expression: str, tz: tzinfo = timezone.utc):
+        """
+        Parse an expression.
+
+        Args:
+            expression (str): Five fields, or six with a leading seconds field, or a macro.
+            tz (tzinfo): The time zone of the expression. Defaults to UTC.
+
+        Raises:
+            CronError: If the expression is invalid.
+        """
+        self.expression = expression
+        self.tz = tz
+        fields = MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) not in (5, 6):
+            raise CronError(f"A cron expression has 5 or 6 fields, got {expression!r}.")
+        self._has_seconds = len(fields) == 6
+        if not self._has_seconds:
+            fields.insert(0, "0")
+        second, minute, hour, day, month, weekday = fields
+        self._seconds = _parse_field(second, 0, 59)
+        self._minutes = _parse_field(minute, 0, 59)
+        self._hours = _parse_field(hour, 0, 23)
+        self._days = frozenset(_parse_field(day, 1, 31))
+        self._months = _parse_field(month, 1, 12, MONTH_NAMES)
+        self._weekdays = frozenset(value % 7 for value in _parse_field(weekday, 0, 7, DAY_NAMES))  # 7 is Sunday
+        self._day_or = not day.startswith(("*", "?")) and not weekday.startswith(("*", "?"))
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_days = moment.day in self._days
+        in_weekdays = (moment.weekday() + 1) % 7 in self._weekdays  # Monday is 0 in Python, 1 in cron
+        return in_days or in_weekdays if self._day_or else in_days and in_weekdays
+
+    def next_after(self, timestamp: float) -> float:
+        """
+        Get the first run strictly after a time.
+
+        Args:
+            timestamp (float): A UNIX timestamp.
+
+        Returns:
+            float: The UNIX timestamp of the next run.
+
+        Raises:
+            CronError: If the expression never matches, such as "0 0 30 2 *".
+        """
+        unit = timedelta(seconds=1) if self._has_seconds else timedelta(minutes=1)
+        moment = datetime.fromtimestamp(timestamp, self.tz).replace(tzinfo=None, microsecond=0)
+        moment = moment.replace(second=0) if not self._has_seconds else moment
+        moment += unit
+        limit = moment.year + SEARCH_YEARS
+        while moment.year <= limit:
+            if moment.month not in self._months:
+                index = bisect.bisect_right(self._months, moment.month)
+                if index < len(self._months):
+                    moment = datetime(moment.year, self._months[index], 1)
+                else:
+                    moment = datetime(moment.year + 1, self._months[0], 1)
+                continue
+            if not self._day_matches(moment):
+                moment = datetime(moment.year, moment.month, moment.day) + timedelta(days=1)
+                continue
+            if moment.hour not in self._hours:
+                index = bisect.bisect_right(self._hours, moment.hour)
+                if index < len(self._hours):
+                    moment = moment.replace(hour=self._hours[index], minute=0, second=0)
+                else:
+                    moment = datetime(moment.year, moment.month, moment.day) + timedelta(days=1)
+                continue
+            if moment.minute not in self._minutes:
+                index = bisect.bisect_right(self._minutes, moment.minute)
+                if index < len(self._minutes):
+                    moment = moment.replace(minute=self._minutes[index], second=0)
+                else:
+                    moment = moment.replace(minute=0, second=0) + timedelta(hours=1)
+                continue
+            if moment.second not in self._seconds:
+                index = bisect.bisect_right(self._seconds, moment.second)
+                if index < len(self._seconds):
+                    moment = moment.replace(second=self._seconds[index])
+                else:
+                    moment = moment.replace(second=0) + timedelta(minutes=1)
+                continue
+            result = moment.replace(tzinfo=self.tz).timestamp()
+            if result > timestamp:
+                return result
+            moment += unit  # A wall clock time repeated when the clocks go back
+        raise CronError(f"Cron expression {self.expression!r} never matches.")
+
+
+@lru_cache(maxsize=4096)
+def parse_cron(expression: str, tz: tzinfo = timezone.utc) -> CronExpression:
+    """
+    Parse a cron expression, sharing one instance between identical expressions.
+
+    Raises:
+        CronError: If the expression is invalid.
+    """
+    return CronExpression(expression, tz)
+
+
+class _Schedule:
+    """A registered schedule. Its live heap entry is the one whose time equals `due`."""
+    __slots__ = ("schedule_id", "cron", "job", "jitter", "misfire_grace", "coalesce", "next_run", "due",
+                 "active")
+
+    def __init__(self, schedule_id: int, cron: CronExpression, job: tuple, jitter: float,
+                 misfire_grace: Optional[float], coalesce: bool):
+        self.schedule_id = schedule_id
+        self.cron = cron
+        self.job = job
+        self.jitter = jitter
+        self.misfire_grace = misfire_grace
+        self.coalesce = coalesce
+        self.next_run = 0.0
+        self.due = 0.0
+        self.active = True
+
+
+class ScheduleInfo(NamedTuple):
+    """A registered schedule."""
+    schedule_id: int  # The ID returned by `add`
+    expression: str  # The cron expression
+    job: tuple  # (scheduler_name, scheduler_id, job_type) of the triggered job
+    next_run: float  # UNIX time of the next run, before jitter
+    due: float  # UNIX time at which the next run fires, jitter included
+
+
+class CronStats(NamedTuple):
+    """The counters of a CronDispatcher."""
+    fired: int  # Runs handed to the workers
+    succeeded: int  # Triggers that returned a response
+    failed: int  # Triggers that failed
+    misfired: int  # Runs skipped for being later than the misfire grace time
+    coalesced: int  # Missed runs merged into another run
+    max_lateness: float  # Largest delay in seconds between a due time and its dispatch
+
+
+class CronDispatcher:
+    """
+    Triggers jobs on cron schedules from one dispatcher thread and a worker pool.
+
+    Attributes:
+        scheduler (Scheduler): Sends the triggers.
+        workers (int): Triggers sent concurrently.
+        misfire_grace (float): Default seconds a run may be late, None to never skip a run.
+        coalesce (bool): Default for merging several missed runs of a schedule into one.
+        jitter (float): Default upper bound in seconds of the random delay added to every run.
+    """
+
+    def __init__(self, scheduler, workers: int = DEFAULT_WORKERS, misfire_grace: Optional[float] = DEFAULT_MISFIRE_GRACE,
+                 coalesce: bool = True, jitter: float = 0.0, rate_limit=None, tz: tzinfo = timezone.utc,
+                 seed: int = None, clock=time.time, on_error: Callable[[tuple, Exception], None] = None):
+        """
+        Initialize the dispatcher without starting its thread.
+
+        Args:
+            scheduler (Scheduler): The scheduler whose session sends the triggers.
+            workers (int): Triggers sent concurrently.
+            misfire_grace (float, optional): Default seconds a run may be late before it is skipped.
+                None never skips a run.
+            coalesce (bool): Default for firing once instead of once per missed run.
+            jitter (float): Default upper bound in seconds of a random delay added to every run.
+            rate_limit (float or RateLimiter, optional): Maximum triggers started per second.
+            tz (tzinfo): Default time zone of the expressions. Defaults to UTC.
+            seed (int, optional): Seed of the jitter.
+            clock (callable): Returns the current UNIX time.
+            on_error (callable, optional): Called on the worker thread with the job tuple and the
+                exception when a trigger raises. Errors are logged to this module's logger otherwise.
+        """
+        if workers <= 0:
+            raise ValueError("The number of workers must be a positive integer.")
+        self.scheduler = scheduler
+        self.workers = workers
+        self.misfire_grace = misfire_grace
+        self.coalesce = coalesce
+        self.jitter = jitter
+        self.tz = tz
+        if isinstance(rate_limit, RateLimiter) or rate_limit is None:
+            self._limiter = rate_limit
+        else:
+            self._limiter = RateLimiter(rate_limit, capacity=1)
+        self._random = random.Random(seed)
+        self._clock = clock
+        self._on_error = on_error
+        self._condition = threading.Condition()
+        self._heap = []  # (due, schedule ID, schedule), stale entries are skipped when popped
+        self._schedules = {}  # schedule ID -> _Schedule
+        self._next_id = 1
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pyavrio-cron-worker")
+        self._in_flight = 0
+        self._counts = dict.fromkeys(("fired", "succeeded", "failed", "misfired", "coalesced"), 0)
+        self._max_lateness = 0.0
+        self._thread = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def add(self, expression: str, job, jitter: float = None, misfire_grace=_DEFAULT,
+            coalesce: bool = None, tz: tzinfo = None) -> int:
+        """
+        Trigger a job on a cron schedule.
+
+        Args:
+            expression (str): The cron expression.
+            job (Job, dict or tuple): The job, as accepted by `Scheduler.trigger_many`.
+            jitter (float, optional): Upper bound of the random delay of every run of this schedule.
+            misfire_grace (float, optional): Seconds a run of this schedule may be late, None to
+                never skip a run. Defaults to the dispatcher setting.
+            coalesce (bool, optional): Merge missed runs of this schedule into one.
+            tz (tzinfo, optional): The time zone of the expression.
+
+        Returns:
+            int: The ID of the schedule, used by `remove` and `get`.
+
+        Raises:
+            CronError: If the expression is invalid.
+            ValueError: If the job description is incomplete.
+        """
+        from .scheduler import Scheduler
+
+        cron = parse_cron(expression, tz or self.tz)
+        try:
+            arguments = tuple(Scheduler._job_arguments(job))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid job description {job!r}: {e}")
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The cron dispatcher is closed.")
+            schedule = _Schedule(self._next_id, cron, arguments, self.jitter if jitter is None else jitter,
+                                 self.misfire_grace if misfire_grace is _DEFAULT else misfire_grace,
+                                 self.coalesce if coalesce is None else coalesce)
+            self._next_id += 1
+            self._schedules[schedule.schedule_id] = schedule
+            self._push(schedule, cron.next_after(self._clock()))
+            if self._heap[0][2] is schedule:
+                self._condition.notify_all()  # The dispatcher may be sleeping past the new run
+        return schedule.schedule_id
+
+    def remove(self, schedule_id: int) -> bool:
+        """
+        Stop a schedule. A run already handed to the workers is still sent.
+
+        Returns:
+            bool: Whether the schedule existed.
+        """
+        with self._condition:
+            schedule = self._schedules.pop(schedule_id, None)
+            if schedule is None:
+                return False
+            schedule.active = False
+            # Stale heap entries are dropped when popped, or all at once when they pile up
+            if len(self._heap) > 2 * len(self._schedules) + 64:
+                self._heap = [entry for entry in self._heap if entry[2].active and entry[0] == entry[2].due]
+                heapq.heapify(self._heap)
+            return True
+
+    def get(self, schedule_id: int) -> Optional[ScheduleInfo]:
+        """Get a schedule, or None if it is unknown."""
+        with self._condition:
+            schedule = self._schedules.get(schedule_id)
+            if schedule is None:
+                return None
+            return ScheduleInfo(schedule.schedule_id, schedule.cron.expression, schedule.job,
+                                schedule.next_run, schedule.due)
+
+    def next_due(self) -> Optional[float]:
+        """Get the UNIX time of the earliest run, or None without schedules."""
+        with self._condition:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def stats(self) -> CronStats:
+        """Get the dispatch counters."""
+        with self._condition:
+            return CronStats(max_lateness=self._max_lateness, **self._counts)
+
+    def _push(self, schedule: _Schedule, next_run: float):
+        """Queue the next run of a schedule, with jitter. Needs the lock."""
+        schedule.next_run = next_run
+        schedule.due = next_run + (self._random.uniform(0, schedule.jitter) if schedule.jitter else 0.0)
+        heapq.heappush(self._heap, (schedule.due, schedule.schedule_id, schedule))
+
+    def _drop_stale(self):
+        """Pop the heap entries of removed schedules. Needs the lock."""
+        while self._heap and (not self._heap[0][2].active or self._heap[0][0] != self._heap[0][2].due):
+            heapq.heappop(self._heap)
+
+    def run_pending(self, now: float = None) -> int:
+        """
+        Hand every due run to the workers and queue the next run of each schedule.
+
+        The dispatcher thread started by `start` calls this whenever a run is due; call it
+        directly to drive the dispatcher from your own loop.
+
+        Args:
+            now (float, optional): The current UNIX time. Defaults to the clock.
+
+        Returns:
+            int: The number of runs handed to the workers.
+        """
+        with self._condition:
+            return self._dispatch_due(self._clock() if now is None else now)
+
+    def _dispatch_due(self, now: float) -> int:
+        """Fire every due run. Needs the lock."""
+        fired = 0
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return fired
+            due, _, schedule = heapq.heappop(self._heap)
+            self._max_lateness = max(self._max_lateness, now - due)
+            offset = due - schedule.next_run
+
+            # Collect the runs missed since, a bounded number of them
+            runs = [schedule.next_run]
+            next_run = schedule.cron.next_after(schedule.next_run)
+            while next_run + offset <= now and len(runs) < MAX_CATCH_UP:
+                runs.append(next_run)
+                next_run = schedule.cron.next_after(next_run)
+            if next_run + offset <= now:
+                self._counts["misfired"] += 1  # Runs beyond the catch-up bound are dropped
+                next_run = schedule.cron.next_after(now)
+            if schedule.coalesce and len(runs) > 1:
+                self._counts["coalesced"] += len(runs) - 1
+                runs = runs[-1:]
+
+            for run in runs:
+                if schedule.misfire_grace is not None and now - (run + offset) > schedule.misfire_grace:
+                    self._counts["misfired"] += 1
+                    continue
+                self._counts["fired"] += 1
+                self._in_flight += 1
+                self._executor.submit(self._fire, schedule.job)
+                fired += 1
+            self._push(schedule, next_run)
+
+    def _fire(self, job: tuple):
+        """Send one trigger on a worker thread."""
+        ok = False
+        try:
+            if self._limiter is not None:
+                self._limiter.acquire()
+            # _trigger raises instead of printing, so failures reach on_error and the logger
+            self.scheduler._trigger(*job)
+            ok = True
+        except Exception as e:
+            if self._on_error is not None:
+                self._on_error(job, e)
+            else:
+                logger.error("Error while triggering scheduler %s: %s", job[0], e)
+        finally:
+            # Counted even if the error callback raises, so join never waits forever
+            with self._condition:
+                self._counts["succeeded" if ok else "failed"] += 1
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def join(self, timeout: float = None) -> bool:
+        """
+        Wait until every run handed to the workers has been sent.
+
+        Returns:
+            bool: False if runs are still in flight when the timeout expires.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def start(self) -> "CronDispatcher":
+        """Start the dispatcher thread."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The cron dispatcher is closed.")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pyavrio-cron", daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        with self._condition:
+            while not self._closed:
+                self._drop_stale()
+                if not self._heap:
+                    self._condition.wait(MAX_WAIT)
+                    continue
+                delay = self._heap[0][0] - self._clock()
+                if delay > 0:
+                    self._condition.wait(min(delay, MAX_WAIT))
+                    continue
+                self._dispatch_due(self._clock())
+
+    def close(self, wait: bool = True):
+        """
+        Stop the dispatcher thread.
+
+        Args:
+            wait (bool): Wait for the runs already handed to the workers to be sent.
+        """
+        with self._condition:
+            self._closed = True
+            thread, self._thread = self._thread, None
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join()
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,419 @@
+"""
+Durable trigger queue for PyAvrio Scheduler
+
+The DispatchQueue class stores jobs to trigger in a SQLite database and sends
+them from a pool of worker threads, highest priority first, through a token
+bucket per host. An item is acknowledged only after the trigger response has
+been received, so a job is triggered at least once: a claim is a lease, and when
+a process dies, the items it had claimed but not acknowledged are sent again by
+any process using the same database once their lease expires. Every
+acknowledged item is skipped.
+
+Combine it with a TriggerLedger on the scheduler to also suppress the rare
+duplicate sent again after a crash.
+"""
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import requests
+
+from .jobs import JobType
+from .ratelimit import RateLimiter
+from .transport import JSONDecodeError
+
+PENDING = "pending"  # Waiting to be sent, possibly after a retry delay
+IN_FLIGHT = "in_flight"  # Claimed by a worker and not acknowledged yet
+DONE = "done"  # Acknowledged after a successful trigger
+FAILED = "failed"  # Given up after a permanent error or too many attempts
+
+DEFAULT_WORKERS = 4  # Triggers sent concurrently
+DEFAULT_MAX_ATTEMPTS = 5  # Attempts before an item is marked failed
+DEFAULT_RETRY_DELAY = 1.0  # Seconds before the first retry, doubled on every further attempt
+DEFAULT_LEASE = 300.0  # Seconds a claimed item may stay unacknowledged before it is sent again
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dispatch (
+    item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    host TEXT NOT NULL,
+    job_name TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL,
+    finished_at REAL,
+    response TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS dispatch_ready ON dispatch (host, state, priority DESC, item_id);
+"""
+
+_COLUMNS = "item_id, job_name, job_id, topic, priority, state, attempts, response, error, claimed_at"
+
+
+class DispatchItem(NamedTuple):
+    """One job in the queue."""
+    item_id: int  # Position in the queue, increasing
+    job_name: str  # The name of the job
+    job_id: object  # The ID of the job
+    topic: str  # The topic of the job, as given when queued
+    priority: int  # Higher priorities are sent first
+    state: str  # PENDING, IN_FLIGHT, DONE or FAILED
+    attempts: int  # Triggers sent so far
+    response: Optional[Dict]  # The trigger response once acknowledged
+    error: Optional[str]  # The last error, if any
+    claimed_at: Optional[float] = None  # When the item was last claimed
+
+
+class DispatchStats(NamedTuple):
+    """The outcome of one `DispatchQueue.run` call."""
+    sent: int  # Items acknowledged
+    retried: int  # Failed attempts put back in the queue
+    failed: int  # Items given up
+
+
+def _item(row) -> DispatchItem:
+    item_id, job_name, job_id, topic, priority, state, attempts, response, error, claimed_at = row
+    return DispatchItem(item_id, job_name, json.loads(job_id), topic, priority, state, attempts,
+                        json.loads(response) if response is not None else None, error, claimed_at)
+
+
+def _is_permanent(error: Exception) -> bool:
+    """
+    Client errors other than 429 will fail again, so they are not retried.
+
+    KeyError, TypeError and ValueError come from building or encoding the request,
+    before it is sent. Responses that cannot be decoded are handled by the caller.
+    """
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return 400 <= status < 500 and status != 429
+    return isinstance(error, (KeyError, TypeError, ValueError))
+
+
+class DispatchQueue:
+    """
+    A SQLite-backed priority queue of triggers with per-host rate limiting.
+
+    Several queues, in one process or many, may share a database: every claim is
+    made in a write transaction, so no two connections claim the same item. A
+    claimed item is leased for `lease` seconds; if it is not acknowledged by then,
+    as when its process died, any queue of the same host claims it again. A worker
+    whose lease expired cannot acknowledge the item any more, so set `lease` well
+    above the time a trigger takes, including retries of the transport. Items
+    belong to the host of the scheduler that queued them and are only sent by a
+    scheduler of the same host.
+
+    Attributes:
+        scheduler (Scheduler): Sends the triggers.
+        path (str): The database file, or ":memory:" for a queue that does not survive restarts.
+        workers (int): Triggers sent concurrently.
+        max_attempts (int): Attempts before an item is marked failed.
+        retry_delay (float): Seconds before the first retry.
+        lease (float): Seconds a claimed item may stay unacknowledged.
+        recovered (int): Items whose lease had expired when the queue was opened, queued again.
+    """
+
+    def __init__(self, scheduler, path: str = ":memory:", rate_limit=None, burst: float = None,
+                 workers: int = DEFAULT_WORKERS, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 retry_delay: float = DEFAULT_RETRY_DELAY, lease: float = DEFAULT_LEASE, clock=time.time,
+                 sleep=time.sleep):
+        """
+        Open or create a queue and recover the items whose lease has expired.
+
+        Args:
+            scheduler (Scheduler): The scheduler used to send the triggers.
+            path (str): The database file, or ":memory:".
+            rate_limit (float or RateLimiter, optional): Maximum triggers per second to the host of
+                the scheduler. Pass the same RateLimiter to several queues of one host to share it.
+            burst (float, optional): Triggers that may be sent at once when `rate_limit` is a number.
+                Defaults to one.
+            workers (int): Triggers sent concurrently.
+            max_attempts (int): Attempts before an item is marked failed.
+            retry_delay (float): Seconds before the first retry, doubled on every further attempt.
+            lease (float): Seconds a claimed item may stay unacknowledged before it is sent again.
+            clock (callable): Returns the current UNIX time.
+            sleep (callable): Function used to wait for delayed items.
+        """
+        if workers <= 0:
+            raise ValueError("The number of workers must be a positive integer.")
+        if max_attempts <= 0:
+            raise ValueError("The number of attempts must be a positive integer.")
+        if lease <= 0:
+            raise ValueError("The lease must be a positive number of seconds.")
+        self.scheduler = scheduler
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease = lease
+        self._host = scheduler.session.get_host().rstrip("/")
+        if isinstance(rate_limit, RateLimiter) or rate_limit is None:
+            self._limiter = rate_limit
+        else:
+            self._limiter = RateLimiter(rate_limit, capacity=burst or 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            # Acknowledgements survive a crash of the process without an fsync per trigger
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(dispatch)")]
+        if "claimed_at" not in columns:
+            # Databases created before leases; their items in flight count as expired
+            self._connection.execute("ALTER TABLE dispatch ADD COLUMN claimed_at REAL")
+        self.recovered = self._recover()
+
+    def _recover(self) -> int:
+        """Put back the items whose lease has expired, which their worker never acknowledged."""
+        now = self._clock()
+        with self._lock:
+            return self._connection.execute(
+                "UPDATE dispatch SET state = ?, available_at = ? WHERE host = ? AND state = ? "
+                "AND (claimed_at IS NULL OR claimed_at <= ?)",
+                (PENDING, now, self._host, IN_FLIGHT, now - self.lease)).rowcount
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def put(self, job, priority: int = 0) -> int:
+        """
+        Queue one job.
+
+        Args:
+            job: A Job, a dict with `jobName`, `jobId` and `topic` keys or a
+                (scheduler_name, scheduler_id, job_type) tuple.
+            priority (int): Higher priorities are sent first. Equal priorities are sent in queue order.
+
+        Returns:
+            int: The ID of the queue item.
+        """
+        return self.put_many([job], priority)[0]
+
+    def put_many(self, jobs: Iterable, priority: int = 0) -> List[int]:
+        """
+        Queue several jobs in one transaction.
+
+        Returns:
+            list: The IDs of the queue items, in the order of the jobs.
+        """
+        now = self._clock()
+        rows = []
+        for job in jobs:
+            name, scheduler_id, topic = self.scheduler._job_arguments(job)
+            topic = topic.value if isinstance(topic, JobType) else topic
+            rows.append((self._host, name, json.dumps(scheduler_id), topic, priority, PENDING, now, now))
+
+        ids = []
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for row in rows:
+                    ids.append(connection.execute(
+                        "INSERT INTO dispatch (host, job_name, job_id, topic, priority, state, available_at, "
+                        "enqueued_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row).lastrowid)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return ids
+
+    def _claim(self) -> Optional[DispatchItem]:
+        """
+        Mark the next ready item in flight, including items whose lease has expired.
+
+        Returns:
+            DispatchItem: The claimed item, or None if no item is ready.
+        """
+        now = self._clock()
+        with self._lock:
+            connection = self._connection
+            # Take the write lock before reading, so no other connection claims the same item
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    f"SELECT {_COLUMNS} FROM dispatch WHERE host = ? AND (state = ? AND available_at <= ? "
+                    "OR state = ? AND (claimed_at IS NULL OR claimed_at <= ?)) "
+                    "ORDER BY priority DESC, item_id LIMIT 1",
+                    (self._host, PENDING, now, IN_FLIGHT, now - self.lease)).fetchone()
+                if row is not None:
+                    connection.execute(
+                        "UPDATE dispatch SET state = ?, attempts = attempts + 1, claimed_at = ? WHERE item_id = ?",
+                        (IN_FLIGHT, now, row[0]))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return _item(row)._replace(state=IN_FLIGHT, attempts=row[6] + 1, claimed_at=now)
+
+    def _next_ready(self) -> Optional[float]:
+        """Get when the next pending item becomes ready, or None if nothing is pending."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT MIN(available_at) FROM dispatch WHERE host = ? AND state = ?",
+                (self._host, PENDING)).fetchone()[0]
+
+    def _ack(self, item: DispatchItem, response, error: Exception = None):
+        """
+        Mark an item sent, keeping the error if its response could not be read.
+
+        Ignored once the lease of the claim has been taken over by another claim.
+        """
+        with self._lock:
+            self._connection.execute(
+                "UPDATE dispatch SET state = ?, response = ?, error = ?, finished_at = ? "
+                "WHERE item_id = ? AND state = ? AND claimed_at = ?",
+                (DONE, json.dumps(response), str(error) if error is not None else None, self._clock(),
+                 item.item_id, IN_FLIGHT, item.claimed_at))
+
+    def _nack(self, item: DispatchItem, error: Exception) -> bool:
+        """Put a failed item back in the queue with a delay, or mark it failed. Returns whether it will be retried."""
+        retry = item.attempts < self.max_attempts and not _is_permanent(error)
+        now = self._clock()
+        with self._lock:
+            if retry:
+                delay = self.retry_delay * 2 ** (item.attempts - 1)
+                self._connection.execute(
+                    "UPDATE dispatch SET state = ?, available_at = ?, error = ? "
+                    "WHERE item_id = ? AND state = ? AND claimed_at = ?",
+                    (PENDING, now + delay, str(error), item.item_id, IN_FLIGHT, item.claimed_at))
+            else:
+                self._connection.execute(
+                    "UPDATE dispatch SET state = ?, error = ?, finished_at = ? "
+                    "WHERE item_id = ? AND state = ? AND claimed_at = ?",
+                    (FAILED, str(error), now, item.item_id, IN_FLIGHT, item.claimed_at))
+        return retry
+
+    def run(self, stop: threading.Event = None, poll_interval: float = 1.0) -> DispatchStats:
+        """
+        Send queued triggers until the queue is drained or `stop` is set.
+
+        Every worker claims the next item by priority, waits for the rate limiter,
+        sends the trigger and acknowledges the item once the response has arrived.
+        A successful trigger whose response cannot be decoded is acknowledged with no
+        response and the decoding error. Failed triggers are retried with exponential
+        delays; client errors other than 429 are not retried.
+
+        Args:
+            stop (threading.Event, optional): Stops the workers after their current trigger.
+                When given, the workers also wait for new items instead of returning once
+                the queue is drained.
+            poll_interval (float): Seconds between checks for new or delayed items.
+
+        Returns:
+            DispatchStats: The number of items sent, retried and given up.
+        """
+        counts = {"sent": 0, "retried": 0, "failed": 0}
+        counts_lock = threading.Lock()
+
+        def count(name):
+            with counts_lock:
+                counts[name] += 1
+
+        def work():
+            while stop is None or not stop.is_set():
+                item = self._claim()
+                if item is None:
+                    ready_at = self._next_ready()
+                    if ready_at is None and stop is None:
+                        return
+                    wait = poll_interval if ready_at is None else ready_at - self._clock()
+                    if stop is not None:
+                        stop.wait(max(0.0, min(wait, poll_interval)))
+                    else:
+                        self._sleep(max(0.0, min(wait, poll_interval)))
+                    continue
+
+                if self._limiter is not None:
+                    self._limiter.acquire()
+                try:
+                    response = self.scheduler._trigger(item.job_name, item.job_id, item.topic)
+                except JSONDecodeError as e:
+                    # The server accepted the trigger; only its response body is unreadable
+                    self._ack(item, None, e)
+                    count("sent")
+                except Exception as e:
+                    count("retried" if self._nack(item, e) else "failed")
+                else:
+                    self._ack(item, response)
+                    count("sent")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for future in [executor.submit(work) for _ in range(self.workers)]:
+                future.result()
+        return DispatchStats(counts["sent"], counts["retried"], counts["failed"])
+
+    def get(self, item_id: int) -> Optional[DispatchItem]:
+        """Get one item, or None if it is unknown."""
+        with self._lock:
+            row = self._connection.execute(f"SELECT {_COLUMNS} FROM dispatch WHERE item_id = ?",
+                                           (item_id,)).fetchone()
+        return _item(row) if row else None
+
+    def items(self, state: str = None, limit: int = None) -> List[DispatchItem]:
+        """
+        List the items of the host, in queue order.
+
+        Args:
+            state (str, optional): Only items in this state.
+            limit (int, optional): Return at most this many items.
+        """
+        query = f"SELECT {_COLUMNS} FROM dispatch WHERE host = ?"
+        params = [self._host]
+        if state is not None:
+            query += " AND state = ?"
+            params.append(state)
+        query += " ORDER BY item_id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [_item(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of items of the host in every state."""
+        counts = dict.fromkeys((PENDING, IN_FLIGHT, DONE, FAILED), 0)
+        with self._lock:
+            for state, count in self._connection.execute(
+                    "SELECT state, COUNT(*) FROM dispatch WHERE host = ? GROUP BY state", (self._host,)):
+                counts[state] = count
+        return counts
+
+    def purge(self, states: Iterable[str] = (DONE,)) -> int:
+        """
+        Delete finished items.
+
+        Args:
+            states (iterable): The states to delete, acknowledged items by default.
+
+        Returns:
+            int: The number of items deleted.
+        """
+        states = list(states)
+        placeholders = ", ".join("?" for _ in states)
+        with self._lock:
+            return self._connection.execute(
+                f"DELETE FROM dispatch WHERE host = ? AND state IN ({placeholders})",
+                [self._host, *states]).rowcount
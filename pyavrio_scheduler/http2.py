@@ -0,0 +1,159 @@
+"""
+HTTP/2 transport for PyAvrio Scheduler
+
+HTTP2Transport sends requests through an `httpx.Client` speaking HTTP/2, which
+multiplexes every concurrent list and trigger call to a host over a single
+connection, where HTTP/1.1 needs one connection per request in flight. It is a
+drop-in BaseTransport: responses are returned as `requests.Response` objects and
+errors raised as `requests.exceptions`, so Authentication and Scheduler work
+unchanged.
+
+This module needs the optional `httpx` and `h2` dependencies:
+
+    pip install pyavrio-scheduler[http2]
+"""
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depends on the installed extras
+    httpx = None
+
+from .codec import JsonCodec
+from .instrumentation import Instrumentation
+from .resilience import CircuitBreaker, RetryPolicy
+from .transport import DEFAULT_TIMEOUT, BaseTransport
+
+DEFAULT_MAX_CONNECTIONS = 10  # Connections kept open across all hosts, one per host in practice
+DEFAULT_MAX_CONCURRENCY = 32  # Requests multiplexed on a connection by trigger_many by default
+
+
+def _translate_error(error: Exception) -> requests.exceptions.RequestException:
+    """Map an httpx error to the requests exception callers already handle."""
+    if isinstance(error, httpx.ConnectTimeout):
+        return requests.exceptions.ConnectTimeout(str(error))
+    if isinstance(error, httpx.TimeoutException):
+        return requests.exceptions.ReadTimeout(str(error))
+    if isinstance(error, (httpx.NetworkError, httpx.RemoteProtocolError)):
+        return requests.exceptions.ConnectionError(str(error))
+    return requests.exceptions.RequestException(str(error))
+
+
+class _StreamedBody:
+    """Exposes an unread httpx response as the `raw` body of a `requests.Response`."""
+
+    def __init__(self, response):
+        self._response = response
+
+    def stream(self, chunk_size: int, decode_content: bool = True):
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        except httpx.HTTPError as e:
+            raise _translate_error(e) from e
+        finally:
+            self._response.close()
+
+    def read(self, amount: int = None) -> bytes:
+        return b"".join(self.stream(amount or 65536))
+
+    def close(self):
+        self._response.close()
+
+
+class HTTP2Transport(BaseTransport):
+    """
+    A transport multiplexing concurrent requests over one HTTP/2 connection per host.
+
+    Attributes:
+        http1 (bool): Whether servers without HTTP/2 are spoken to in HTTP/1.1.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS, http1: bool = True,
+                 keep_alive: bool = True, timeout=DEFAULT_TIMEOUT, verify=True,
+                 retry_policy: RetryPolicy = None, circuit_breaker: CircuitBreaker = None,
+                 instrumentation: Instrumentation = None, codec: JsonCodec = None,
+                 compression: bool = True):
+        """
+        Initialize the transport and its HTTP/2 client.
+
+        Args:
+            max_concurrency (int): Requests sent to one host at once by `trigger_many`
+                when it is not given a number of workers.
+            max_connections (int): Maximum number of connections open across all hosts.
+            http1 (bool): Negotiate the protocol with TLS ALPN, falling back to HTTP/1.1.
+                Set to False to speak HTTP/2 only, which is also required to use HTTP/2
+                over plain `http://` URLs (h2c with prior knowledge).
+            keep_alive (bool): Reuse connections between requests when True.
+            timeout (float or tuple): Default (connect, read) timeout in seconds.
+            verify (bool or str): Verify TLS certificates, or the path of a CA bundle.
+            retry_policy (RetryPolicy, optional): Retry failed requests according to this policy.
+            circuit_breaker (CircuitBreaker, optional): Fail fast while a host keeps failing.
+            instrumentation (Instrumentation, optional): Collect latency, size and retry metrics.
+            codec (JsonCodec, optional): The JSON codec. Defaults to the fastest one installed.
+            compression (bool): Ask for compressed responses in the encodings httpx can decode.
+
+        Raises:
+            ImportError: If httpx or h2 is not installed.
+        """
+        if httpx is None:
+            raise ImportError("The HTTP/2 transport requires httpx and h2. "
+                              "Install them with: pip install pyavrio-scheduler[http2]")
+        super().__init__(max_concurrency, keep_alive, timeout, retry_policy, circuit_breaker,
+                         instrumentation, codec, compression)
+        self.http1 = http1
+        limits = httpx.Limits(max_connections=max_connections,
+                              max_keepalive_connections=max_connections if keep_alive else 0)
+        # Raises ImportError when h2 is missing
+        self._client = httpx.Client(http1=http1, http2=True, limits=limits, verify=verify,
+                                    timeout=self._timeout(timeout))
+        if not compression:
+            self._client.headers["Accept-Encoding"] = "identity"
+
+    @staticmethod
+    def _timeout(timeout):
+        """Convert a requests-style (connect, read) timeout to an `httpx.Timeout`."""
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    def _send_request(self, method: str, url: str, kwargs) -> requests.Response:
+        stream = bool(kwargs.get("stream"))
+        try:
+            request = self._client.build_request(method, url, content=kwargs.get("data"),
+                                                 headers=kwargs.get("headers"), params=kwargs.get("params"),
+                                                 timeout=self._timeout(kwargs.get("timeout", self.timeout)))
+            response = self._client.send(request, stream=stream)
+        except httpx.HTTPError as e:
+            raise _translate_error(e) from e
+        return self._to_response(request, response, stream)
+
+    @staticmethod
+    def _to_response(request, response, stream: bool) -> requests.Response:
+        """Wrap an httpx exchange in a `requests.Response`."""
+        prepared = requests.PreparedRequest()
+        prepared.method = request.method
+        prepared.url = str(request.url)
+        prepared.headers = CaseInsensitiveDict(request.headers.multi_items())
+        prepared.body = request.content or None
+
+        converted = requests.Response()
+        converted.status_code = response.status_code
+        converted.headers = CaseInsensitiveDict(response.headers.multi_items())
+        converted.url = str(response.url)
+        converted.reason = response.reason_phrase
+        converted.encoding = get_encoding_from_headers(converted.headers)
+        converted.request = prepared
+        if stream:
+            converted.raw = _StreamedBody(response)
+        else:
+            converted._content = response.content
+            converted._content_consumed = True
+        return converted
+
+    def close(self):
+        """Close every connection."""
+        self._client.close()
@@ -0,0 +1,244 @@
+"""
+Request instrumentation for PyAvrio Scheduler
+
+The Instrumentation class collects client-side metrics for every request sent
+through a Transport: latency histograms per endpoint and status, bytes sent and
+received, and retries. Pre- and post-request hooks can observe each request, and
+PrometheusExporter renders the metrics in the Prometheus text format.
+
+Instrumentation is opt-in: a Transport without one only pays an `is None` check.
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRIC_PREFIX = "pyavrio"
+
+
+class RequestEvent:
+    """
+    The request observed by instrumentation hooks.
+
+    Attributes:
+        method (str): The HTTP method.
+        url (str): The full URL.
+        endpoint (str): The URL path, used as the metric label.
+        attempt (int): The attempt number, starting at 1.
+        started (float): `time.perf_counter()` when the request was sent.
+        status (str): The response status code, or "error" if no response was received.
+        latency (float): Seconds until the response headers were received.
+        bytes_sent (int): Size of the request body.
+        bytes_received (int): Size of the response body, when known.
+        error (Exception): The exception raised by the request, if any.
+    """
+    __slots__ = ("method", "url", "endpoint", "attempt", "started", "status", "latency",
+                 "bytes_sent", "bytes_received", "error")
+
+    def __init__(self, method: str, url: str, attempt: int = 1):
+        self.method = method
+        self.url = url
+        self.endpoint = urlsplit(url).path or "/"
+        self.attempt = attempt
+        self.started = time.perf_counter()
+        self.status = None
+        self.latency = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.error = None
+
+
+class Histogram:
+    """
+    A cumulative histogram with fixed upper bounds.
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Get (upper bound, cumulative count) pairs, ending with +Inf."""
+        pairs, total = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((bound, total))
+        pairs.append((float("inf"), self.count))
+        return pairs
+
+
+class Instrumentation:
+    """
+    Collects request metrics and runs hooks.
+
+    Attributes:
+        latency (dict): Histograms keyed by (endpoint, status).
+        bytes_sent (dict): Request body bytes per endpoint.
+        bytes_received (dict): Response body bytes per endpoint.
+        retries (dict): Retries per endpoint.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize empty metrics.
+
+        Args:
+            buckets (iterable): Upper bounds in seconds of the latency histograms.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.bytes_sent: Dict[str, int] = {}
+        self.bytes_received: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+        self._pre_hooks: List[Callable[[RequestEvent], None]] = []
+        self._post_hooks: List[Callable[[RequestEvent], None]] = []
+        self._lock = threading.Lock()
+
+    def add_pre_request_hook(self, hook: Callable[[RequestEvent], None]):
+        """Call `hook(event)` before every request is sent."""
+        self._pre_hooks.append(hook)
+
+    def add_post_request_hook(self, hook: Callable[[RequestEvent], None]):
+        """Call `hook(event)` after every request completes or fails."""
+        self._post_hooks.append(hook)
+
+    def request_started(self, method: str, url: str, attempt: int = 1) -> RequestEvent:
+        """
+        Record the start of a request and run the pre-request hooks.
+
+        Returns:
+            RequestEvent: The event to pass to `request_finished`.
+        """
+        event = RequestEvent(method, url, attempt)
+        for hook in self._pre_hooks:
+            hook(event)
+        return event
+
+    def request_finished(self, event: RequestEvent, response=None, error: Optional[Exception] = None,
+                         streamed: bool = False):
+        """
+        Record the outcome of a request and run the post-request hooks.
+
+        Args:
+            event (RequestEvent): The event returned by `request_started`.
+            response (requests.Response, optional): The response, if one was received.
+            error (Exception, optional): The exception raised by the request.
+            streamed (bool): Whether the body is still unread, in which case only a
+                declared `Content-Length` is counted.
+        """
+        event.latency = time.perf_counter() - event.started
+        event.error = error
+        if response is not None:
+            event.status = str(response.status_code)
+            body = getattr(response.request, "body", None)
+            event.bytes_sent = len(body) if body else 0
+            length = response.headers.get("Content-Length")
+            if length is not None and length.isdigit():
+                event.bytes_received = int(length)
+            elif not streamed:
+                event.bytes_received = len(response.content)
+        else:
+            event.status = "error"
+
+        with self._lock:
+            histogram = self.latency.get((event.endpoint, event.status))
+            if histogram is None:
+                histogram = self.latency[(event.endpoint, event.status)] = Histogram(self.buckets)
+            histogram.observe(event.latency)
+            self.bytes_sent[event.endpoint] = self.bytes_sent.get(event.endpoint, 0) + event.bytes_sent
+            self.bytes_received[event.endpoint] = self.bytes_received.get(event.endpoint, 0) + event.bytes_received
+
+        for hook in self._post_hooks:
+            hook(event)
+
+    def record_retry(self, url: str):
+        """Count a retry of a request to the URL."""
+        endpoint = urlsplit(url).path or "/"
+        with self._lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def reset(self):
+        """Drop every collected metric, keeping the hooks."""
+        with self._lock:
+            self.latency.clear()
+            self.bytes_sent.clear()
+            self.bytes_received.clear()
+            self.retries.clear()
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusExporter:
+    """
+    Renders the metrics of an Instrumentation in the Prometheus text exposition format.
+    """
+
+    def __init__(self, instrumentation: Instrumentation, prefix: str = METRIC_PREFIX):
+        """
+        Initialize the exporter.
+
+        Args:
+            instrumentation (Instrumentation): The metrics to export.
+            prefix (str): Prefix of every metric name.
+        """
+        self.instrumentation = instrumentation
+        self.prefix = prefix
+
+    def render(self) -> str:
+        """
+        Render the current metrics.
+
+        Returns:
+            str: The metrics in Prometheus text format.
+        """
+        metrics = self.instrumentation
+        name = f"{self.prefix}_request_duration_seconds"
+        lines = [f"# HELP {name} Client-side latency of Avrio requests.", f"# TYPE {name} histogram"]
+        with metrics._lock:
+            latency = sorted((key, (h.cumulative(), h.sum, h.count)) for key, h in metrics.latency.items())
+            counters = [
+                ("request_bytes_sent_total", "Request body bytes sent to Avrio.", dict(metrics.bytes_sent)),
+                ("response_bytes_received_total", "Response body bytes received from Avrio.",
+                 dict(metrics.bytes_received)),
+                ("request_retries_total", "Requests sent again by the retry policy.", dict(metrics.retries)),
+            ]
+
+        for (endpoint, status), (cumulative, total, count) in latency:
+            for bound, value in cumulative:
+                lines.append(f"{name}_bucket{_labels(endpoint=endpoint, status=status, le=_number(bound))} {value}")
+            lines.append(f"{name}_sum{_labels(endpoint=endpoint, status=status)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(endpoint=endpoint, status=status)} {count}")
+
+        for suffix, help_text, values in counters:
+            counter = f"{self.prefix}_{suffix}"
+            lines.append(f"# HELP {counter} {help_text}")
+            lines.append(f"# TYPE {counter} counter")
+            for endpoint, value in sorted(values.items()):
+                lines.append(f"{counter}{_labels(endpoint=endpoint)} {value}")
+
+        return "\n".join(lines) + "\n"
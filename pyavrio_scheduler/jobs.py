@@ -0,0 +1,221 @@
+"""
+Job field access for PyAvrio Scheduler
+
+The list API returns jobs as JSON objects. These helpers read the fields the
+client relies on, accepting the alternative key names used by the platform.
+The Job record holds the same data in a compact form for large catalogs.
+"""
+import json
+import sys
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+ID_FIELDS = ("jobId", "id")
+NAME_FIELDS = ("jobName", "name")
+STATUS_FIELDS = ("status", "jobStatus", "lastRunStatus")
+FREQUENCY_FIELDS = ("scheduledFrequency", "frequency")
+TOPIC_FIELDS = ("topic",)
+RUN_TIME_FIELDS = ("lastRunTime", "lastRunAt", "endTime")
+
+
+class JobType(Enum):
+    DATA_QUALITY = "dsdq"
+    PYTHON_NOTEBOOK = "python_notebook"
+    SQL_NOTEBOOK = "sql_notebook"
+
+
+def to_job_type(topic) -> Optional[JobType]:
+    """
+    Map a list topic such as `PYTHON_NOTEBOOK`, `DSDQ` or `data_quality` to a JobType.
+
+    Returns:
+        JobType: The job type, or None if the topic is unknown.
+    """
+    if topic is None or isinstance(topic, JobType):
+        return topic
+    value = str(topic).strip().lower()
+    if value == "data_quality":
+        value = "dsdq"
+    try:
+        return JobType(value)
+    except ValueError:
+        return None
+
+
+def _first(job: Dict, fields) -> Any:
+    for field in fields:
+        value = job.get(field)
+        if value is not None:
+            return value
+    return None
+
+
+def _used_field(job: Dict, fields) -> Optional[str]:
+    for field in fields:
+        if job.get(field) is not None:
+            return field
+    return None
+
+
+def job_id(job: Dict) -> Any:
+    """Get the ID of a listed job."""
+    return _first(job, ID_FIELDS)
+
+
+def job_name(job: Dict) -> Any:
+    """Get the name of a listed job."""
+    return _first(job, NAME_FIELDS)
+
+
+def job_status(job: Dict) -> Any:
+    """Get the status of a listed job."""
+    return _first(job, STATUS_FIELDS)
+
+
+def job_run_time(job: Dict) -> Any:
+    """Get the time of the latest run of a listed job."""
+    return _first(job, RUN_TIME_FIELDS)
+
+
+def job_frequency(job: Dict) -> Any:
+    """Get the scheduled frequency of a listed job."""
+    return _first(job, FREQUENCY_FIELDS)
+
+
+_encode_extras = json.JSONEncoder(separators=(",", ":")).encode
+
+# Slot of every alias, used by Job.get
+_JOB_FIELDS = {}
+for _slot, _fields in (("id", ID_FIELDS), ("name", NAME_FIELDS), ("status", STATUS_FIELDS),
+                       ("frequency", FREQUENCY_FIELDS), ("topic", TOPIC_FIELDS)):
+    for _field in _fields:
+        _JOB_FIELDS[_field] = _slot
+del _slot, _fields, _field
+# The preferred alias of every slot, which is always read from the slot
+_SLOT_FIELDS = {ID_FIELDS[0], NAME_FIELDS[0], STATUS_FIELDS[0], FREQUENCY_FIELDS[0], TOPIC_FIELDS[0]}
+
+
+class Job:
+    """
+    A compact record of a listed job.
+
+    The fields used for indexing and triggering are stored in slots. Every other
+    field of the listing is kept as one compact JSON string and only decoded when
+    accessed, which takes a fraction of the memory of the original dictionary.
+
+    A Job can be passed wherever the client accepts a listed job: `get` and item
+    access understand the original key names, and `trigger_scheduler` and
+    `trigger_many` accept it directly.
+
+    Attributes:
+        id: The ID of the job.
+        name (str): The name of the job.
+        topic (JobType or str): The job type, or the raw topic if it is not a known JobType.
+        status (str): The status reported by the listing.
+        frequency (str): The scheduled frequency.
+    """
+    __slots__ = ("id", "name", "topic", "status", "frequency", "_extras")
+
+    def __init__(self, id, name: str, topic: Union[JobType, str] = None, status: str = None,
+                 frequency: str = None, extras: Dict = None):
+        """
+        Initialize a job record.
+
+        Args:
+            id: The ID of the job.
+            name (str): The name of the job.
+            topic (JobType or str, optional): The job type or list topic.
+            status (str, optional): The status of the job.
+            frequency (str, optional): The scheduled frequency of the job.
+            extras (dict, optional): Every other field of the listing.
+        """
+        self.id = id
+        self.name = name
+        self.topic = to_job_type(topic) or topic
+        # Statuses and frequencies repeat across jobs, so share one string per value
+        self.status = sys.intern(status) if isinstance(status, str) else status
+        self.frequency = sys.intern(frequency) if isinstance(frequency, str) else frequency
+        self._extras = _encode_extras(extras) if extras else None
+
+    @classmethod
+    def from_dict(cls, data: Dict, topic=None) -> "Job":
+        """
+        Build a record from a job returned by the list API.
+
+        Args:
+            data (dict): The listed job.
+            topic (JobType or str, optional): The topic of the listing, used when the
+                job does not carry its own.
+
+        Returns:
+            Job: The record.
+        """
+        # Only the key each slot was read from is dropped; other aliases with a value are kept
+        used = {_used_field(data, fields) for fields in (ID_FIELDS, NAME_FIELDS, STATUS_FIELDS, FREQUENCY_FIELDS)}
+        extras = {key: value for key, value in data.items()
+                  if key not in _JOB_FIELDS or (key not in used and key not in _SLOT_FIELDS and value is not None)}
+        return cls(job_id(data), job_name(data), data.get("topic") or topic, job_status(data),
+                   job_frequency(data), extras)
+
+    @classmethod
+    def from_listing(cls, jobs: Iterable[Dict], topic=None) -> List["Job"]:
+        """Build records from a list API listing."""
+        return [cls.from_dict(job, topic) for job in jobs]
+
+    @property
+    def extras(self) -> Dict:
+        """Decode the fields that are not stored in slots."""
+        return json.loads(self._extras) if self._extras else {}
+
+    @property
+    def topic_name(self) -> Optional[str]:
+        """Get the topic as a string accepted by the scheduler APIs."""
+        return self.topic.value if isinstance(self.topic, JobType) else self.topic
+
+    def get(self, key: str, default=None) -> Any:
+        """Get a field by its listing key, like `dict.get`."""
+        slot = _JOB_FIELDS.get(key)
+        if slot is not None:
+            if key not in _SLOT_FIELDS and self._extras is not None:
+                # An alias that was not used for the slot keeps its own value
+                extras = self.extras
+                if key in extras:
+                    return extras[key]
+            value = self.topic_name if slot == "topic" else getattr(self, slot)
+            return default if value is None else value
+        return self.extras.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def to_dict(self) -> Dict:
+        """Convert the record back to a listing dictionary."""
+        data = {"jobId": self.id, "jobName": self.name, "topic": self.topic_name,
+                "status": self.status, "scheduledFrequency": self.frequency}
+        data.update(self.extras)
+        return data
+
+    def _values(self):
+        return self.id, self.name, self.topic, self.status, self.frequency, self._extras
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Job):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self._values()
+
+    def __setstate__(self, state):
+        self.id, self.name, self.topic, self.status, self.frequency, self._extras = state
+
+    def __repr__(self) -> str:
+        return f"Job(id={self.id!r}, name={self.name!r}, topic={self.topic_name!r}, status={self.status!r})"
+
+
+_MISSING = object()
@@ -0,0 +1,263 @@
+"""
+Trigger ledger for PyAvrio Scheduler
+
+The TriggerLedger class records every successful trigger by host, job ID and
+topic. A job triggered again within the deduplication window is not sent to the
+server; the caller gets the response recorded for the original trigger instead.
+This makes retried batches safe to run again after a partial failure.
+
+Entries live in memory for constant time lookups. With a database path they are
+also written to SQLite and reloaded on start, so the window survives restarts.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from .coalesce import SingleFlight
+
+DEFAULT_WINDOW = 3600.0  # Seconds during which a repeated trigger is suppressed
+
+_MISSING = object()  # Returned by _lookup when no trigger is recorded, as a response may be null
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS triggers (
+    host TEXT NOT NULL,
+    job_key TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    response TEXT NOT NULL,
+    triggered_at REAL NOT NULL,
+    PRIMARY KEY (host, job_key, topic)
+);
+CREATE INDEX IF NOT EXISTS triggers_time ON triggers (triggered_at);
+"""
+
+
+class TriggerLedger:
+    """
+    A thread-safe record of recent triggers, used to skip duplicates.
+
+    Attributes:
+        window (float): Seconds a recorded trigger suppresses repeated ones.
+        path (str): The SQLite database, or None for a ledger kept in memory only.
+        recorded (int): Triggers sent and recorded.
+        duplicates (int): Triggers skipped because they were recorded within the window,
+            including concurrent ones that waited for the original trigger.
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW, path: str = None, clock=time.time):
+        """
+        Open a ledger, loading the entries still inside the window from the database.
+
+        Args:
+            window (float): Seconds during which a repeated trigger is suppressed.
+            path (str, optional): A SQLite database file that keeps the ledger across restarts.
+            clock (callable): Returns the current UNIX time.
+        """
+        if window <= 0:
+            raise ValueError("The deduplication window must be a positive number of seconds.")
+        self.window = float(window)
+        self.path = path
+        self.recorded = 0
+        self.duplicates = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._entries = OrderedDict()  # key -> (triggered_at, encoded response), oldest first
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            if path != ":memory:":
+                # Survives a crash of the process without an fsync per trigger
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(_SCHEMA)
+            self._load()
+
+    def _load(self):
+        """Drop expired rows and load the others in trigger order."""
+        cutoff = self._clock() - self.window
+        with self._lock:
+            self._connection.execute("DELETE FROM triggers WHERE triggered_at <= ?", (cutoff,))
+            rows = self._connection.execute(
+                "SELECT host, job_key, topic, response, triggered_at FROM triggers ORDER BY triggered_at")
+            for host, job_key, topic, response, triggered_at in rows:
+                self._entries[(host, job_key, topic)] = (triggered_at, response)
+
+    @staticmethod
+    def make_key(host: str, scheduler_id, topic: str) -> Tuple[str, str, str]:
+        """
+        Build the ledger key of a trigger.
+
+        Args:
+            host (str): The Avrio host.
+            scheduler_id: The ID of the job.
+            topic (str): The topic sent to the trigger API, such as `NOTEBOOK`.
+
+        Returns:
+            tuple: The host without trailing slash, the JSON encoded ID and the topic.
+        """
+        return host.rstrip("/"), json.dumps(scheduler_id), topic
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(self._clock())
+            return len(self._entries)
+
+    def _expire(self, now: float):
+        """Drop entries that left the window. Entries are kept oldest first, so this stops at the first live one."""
+        cutoff = now - self.window
+        while self._entries:
+            key, (triggered_at, _) = next(iter(self._entries.items()))
+            if triggered_at > cutoff:
+                return
+            del self._entries[key]
+
+    def lookup(self, host: str, scheduler_id, topic: str) -> Optional[Dict]:
+        """
+        Get the response of a trigger recorded within the window.
+
+        Returns:
+            dict: A copy of the recorded response, or None if the job was not triggered recently.
+            A trigger recorded with a null response also returns None; `run` tells them apart.
+        """
+        response = self._lookup(self.make_key(host, scheduler_id, topic))
+        return None if response is _MISSING else response
+
+    def _lookup(self, key: Hashable):
+        """Get a copy of the recorded response, or _MISSING when there is none within the window."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock() - self.window:
+                return _MISSING
+        return json.loads(entry[1])
+
+    def record(self, host: str, scheduler_id, topic: str, response):
+        """
+        Record a successful trigger.
+
+        Args:
+            host (str): The Avrio host.
+            scheduler_id: The ID of the job.
+            topic (str): The topic sent to the trigger API.
+            response: The decoded trigger response.
+        """
+        self._record(self.make_key(host, scheduler_id, topic), response)
+
+    def _record(self, key: Tuple[str, str, str], response):
+        now = self._clock()
+        encoded = json.dumps(response, separators=(",", ":"))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now, encoded)
+            self._expire(now)
+            self.recorded += 1
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO triggers (host, job_key, topic, response, triggered_at) "
+                    "VALUES (?, ?, ?, ?, ?)", (*key, encoded, now))
+
+    def run(self, host: str, scheduler_id, topic: str, trigger: Callable[[], Dict]) -> Dict:
+        """
+        Trigger a job unless it was triggered within the window.
+
+        Concurrent calls for the same job send a single trigger. Failed triggers are
+        not recorded, so they are sent again by the next call.
+
+        Args:
+            host (str): The Avrio host.
+            scheduler_id: The ID of the job.
+            topic (str): The topic sent to the trigger API.
+            trigger (callable): Sends the trigger and returns the decoded response.
+
+        Returns:
+            dict: The response of this trigger, or of the original one when it is a duplicate.
+
+        Raises:
+            Exception: Whatever `trigger` raised.
+        """
+        key = self.make_key(host, scheduler_id, topic)
+        response = self._lookup(key)
+        if response is not _MISSING:
+            with self._lock:
+                self.duplicates += 1
+            return response
+
+        sent = []
+
+        def send():
+            # Another caller may have recorded the trigger since the lookup above
+            recorded = self._lookup(key)
+            if recorded is not _MISSING:
+                return recorded
+            result = trigger()
+            self._record(key, result)
+            sent.append(True)
+            return result
+
+        result = self._flight.do(key, send)
+        if not sent:
+            with self._lock:
+                self.duplicates += 1
+        return result
+
+    def forget(self, host: str, scheduler_id, topic: str) -> bool:
+        """
+        Remove a recorded trigger so that the job can be triggered again at once.
+
+        Returns:
+            bool: Whether the trigger was recorded.
+        """
+        key = self.make_key(host, scheduler_id, topic)
+        with self._lock:
+            found = self._entries.pop(key, None) is not None
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM triggers WHERE host = ? AND job_key = ? AND topic = ?", key)
+        return found
+
+    def prune(self) -> int:
+        """
+        Drop every entry that left the window, in memory and in the database.
+
+        Returns:
+            int: The number of entries dropped from memory.
+        """
+        now = self._clock()
+        with self._lock:
+            size = len(self._entries)
+            self._expire(now)
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM triggers WHERE triggered_at <= ?", (now - self.window,))
+            return size - len(self._entries)
+
+    def clear(self):
+        """Forget every recorded trigger."""
+        with self._lock:
+            self._entries.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM triggers")
+
+    def stats(self) -> Dict:
+        """
+        Get the ledger counters.
+
+        Returns:
+            dict: recorded, duplicates and the number of entries held.
+        """
+        with self._lock:
+            return {"recorded": self.recorded, "duplicates": self.duplicates, "size": len(self._entries)}
+
+    def close(self):
+        """Close the database, if any."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
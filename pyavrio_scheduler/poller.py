@@ -0,0 +1,405 @@
+"""
+Batched job status polling for PyAvrio Scheduler
+
+StatusPoller lets any number of callers wait for jobs to finish while sharing
+one background thread. Every tick it sends a single request per topic with
+pending waiters, for the first page of finished jobs with the most recent runs
+first, instead of one full listing per waiter, and backs off while nothing
+finishes. Waiters get a `concurrent.futures.Future`, which takes callbacks and
+can be awaited from asyncio.
+
+A waiter resolves with the next run of its job: the status and run time the
+job is listed with when it is watched are its baseline, and the waiter resolves
+once the job is listed with a terminal status and a different status or run
+time. A recurring job that last succeeded is therefore not reported finished
+again right after it is triggered.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, TimeoutError, wait
+from typing import Dict, Iterable, List, Optional, Set
+
+import requests
+
+from .jobs import RUN_TIME_FIELDS, job_id, job_run_time, job_status
+from .query import DEFAULT_PAGE_SIZE
+from .scheduler import LIST_TOPICS, Scheduler, SchedulerError
+
+TERMINAL_STATUSES = ("SUCCESS", "FAILED", "CANCELLED")  # Statuses a finished job reports
+DEFAULT_INTERVAL = 1.0  # Seconds between ticks right after a change
+DEFAULT_MAX_INTERVAL = 30.0  # Upper bound of the backed off interval
+DEFAULT_BACKOFF = 1.5  # Interval growth factor after a tick without finished jobs
+DEFAULT_MAX_ERRORS = 5  # Consecutive listing failures before the waiters of a topic fail
+
+_OBSERVE = object()  # Default of `since`: list the baseline when a job is watched
+
+
+def _fingerprint(job: Optional[Dict]) -> Optional[tuple]:
+    """Identify the run a listed job reports by its status and run time."""
+    if job is None:
+        return None
+    return str(job_status(job)).upper(), job_run_time(job)
+
+
+class _Waiter:
+    """A future waiting for a job, with the run it must not resolve with."""
+    __slots__ = ("future", "baseline")
+
+    def __init__(self, future: Future, baseline):
+        self.future = future
+        self.baseline = baseline
+
+
+class StatusPoller:
+    """
+    Waits for jobs to reach a terminal status using one shared polling thread.
+
+    Each tick sends one request per topic with pending waiters, for the first
+    page of jobs with a terminal status sorted by `lastRunTime`, most recent
+    first, and resolves the waiters of the jobs that report a run other than the
+    one listed when they were watched. A job that has just finished sorts first,
+    so the page only has to hold the jobs finishing within one interval. The
+    interval grows by `backoff` after every tick in which no job finished, up to
+    `max_interval`, and returns to `interval` when a job finishes or a new
+    waiter is added. The thread stops while nothing is being waited for.
+
+    The poller reports the status shown by the list API. A run is told apart from
+    the previous one by its status and its `lastRunTime`; for jobs listed without a
+    run time, a run ending with the same status as the baseline is only noticed if
+    the job was seen running in between, which takes a tick in which the whole
+    terminal listing fits on the page.
+
+    Attributes:
+        interval (float): Seconds between ticks right after a change.
+        max_interval (float): Upper bound of the backed off interval.
+        backoff (float): Interval growth factor.
+        terminal_statuses (tuple): Statuses that resolve a waiter.
+        request_count (int): Number of list requests sent so far.
+        tick_count (int): Number of polling ticks so far.
+    """
+
+    def __init__(self, scheduler: Scheduler, interval: float = DEFAULT_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL, backoff: float = DEFAULT_BACKOFF,
+                 terminal_statuses: Iterable[str] = TERMINAL_STATUSES, page_size: int = DEFAULT_PAGE_SIZE,
+                 max_errors: int = DEFAULT_MAX_ERRORS, clock=time.monotonic):
+        """
+        Initialize the poller without starting its thread.
+
+        Args:
+            scheduler (Scheduler): The scheduler used to list jobs.
+            interval (float): Seconds between ticks right after a change.
+            max_interval (float): Upper bound of the backed off interval.
+            backoff (float): Interval growth factor after a tick without finished jobs.
+            terminal_statuses (iterable): Statuses that resolve a waiter.
+            page_size (int): The number of most recently finished jobs listed per tick. A run
+                is only noticed while its job is among them.
+            max_errors (int): Consecutive listing failures of a topic before its waiters
+                fail with SchedulerError.
+            clock (callable): Monotonic clock returning seconds.
+        """
+        if interval <= 0 or max_interval < interval:
+            raise ValueError("interval must be positive and not above max_interval.")
+        if backoff < 1:
+            raise ValueError("backoff must be at least 1.")
+        self.scheduler = scheduler
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.terminal_statuses = tuple(status.upper() for status in terminal_statuses)
+        self.page_size = page_size
+        self.max_errors = max_errors
+        self.request_count = 0
+        self.tick_count = 0
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._waiters: Dict[str, Dict[str, List[_Waiter]]] = {}  # topic -> job ID -> waiters
+        self._errors: Dict[str, int] = {}  # topic -> consecutive listing failures
+        self._current_interval = interval
+        self._deadline = 0.0
+        self._thread = None
+        self._closed = False
+
+    @staticmethod
+    def _topic(job_type) -> str:
+        """Normalize a JobType or topic name to a list topic."""
+        topic = Scheduler._normalize_list_topic(job_type)
+        if topic not in LIST_TOPICS:
+            raise SchedulerError("Invalid topic selection. Please select from python_notebook, sql_notebook or data_quality.")
+        return topic
+
+    @property
+    def pending_count(self) -> int:
+        """Get the number of jobs being waited for."""
+        with self._condition:
+            return sum(len(jobs) for jobs in self._waiters.values())
+
+    def watch(self, scheduler_id, job_type, since=_OBSERVE) -> Future:
+        """
+        Wait for the next run of one job in the background.
+
+        Args:
+            scheduler_id: The ID of the job.
+            job_type (JobType or str): The topic of the job.
+            since (dict, optional): The job as listed before it was triggered; a run with its
+                status and run time does not resolve the waiter. None resolves with any terminal
+                status, including one already listed. Defaults to the job as listed by a request
+                sent before this method returns.
+
+        Returns:
+            Future: Resolves with the listed job once it reports a new terminal run, or fails
+            with SchedulerError, or the error raised while listing, if its topic cannot be
+            listed. Cancel it to stop waiting.
+
+        Raises:
+            SchedulerError: If the topic is invalid, cannot be listed for the baseline, or the
+                poller is closed.
+        """
+        topic = self._topic(job_type)
+        if since is _OBSERVE:
+            baseline = self._baselines(topic, [scheduler_id])[str(scheduler_id)]
+        else:
+            baseline = _fingerprint(since)
+        return self._watch(topic, str(scheduler_id), baseline)
+
+    def _watch(self, topic: str, key: str, baseline) -> Future:
+        """Add a waiter with a known baseline and make sure the thread runs."""
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise SchedulerError("The status poller is closed.")
+            self._waiters.setdefault(topic, {}).setdefault(key, []).append(_Waiter(future, baseline))
+            self._current_interval = self.interval
+            # Poll promptly for the new waiter without waking the thread for every watch
+            self._deadline = min(self._deadline, self._clock() + self.interval)
+            if self._thread is None:
+                self._deadline = 0.0
+                self._thread = threading.Thread(target=self._run, name="pyavrio-status-poller", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+        return future
+
+    def wait_for(self, job_ids: Iterable, job_type, timeout: float = None, since=_OBSERVE) -> Dict:
+        """
+        Block until every job reports a new terminal run.
+
+        Args:
+            job_ids (iterable): The IDs of the jobs.
+            job_type (JobType or str): The topic of the jobs.
+            timeout (float, optional): Seconds to wait. Waits indefinitely when None.
+            since (dict, optional): The jobs as listed before they were triggered, keyed by the
+                IDs as passed, or None to accept runs already listed. See `watch`.
+
+        Returns:
+            dict: The listed job of every ID, keyed by the IDs as passed.
+
+        Raises:
+            TimeoutError: If some jobs are still running when the timeout expires.
+            SchedulerError: If the topic is invalid or cannot be listed.
+        """
+        futures = self._watch_many(list(job_ids), job_type, since)
+        _, pending = wait(futures.values(), timeout=timeout)
+        if pending:
+            for future in pending:
+                future.cancel()
+            running = [scheduler_id for scheduler_id, future in futures.items() if future in pending]
+            raise TimeoutError(f"Timed out waiting for jobs: {running}")
+        return {scheduler_id: future.result() for scheduler_id, future in futures.items()}
+
+    def _watch_many(self, job_ids: List, job_type, since) -> Dict:
+        """Watch jobs of one topic, listing the topic once for all their baselines."""
+        topic = self._topic(job_type)
+        if since is _OBSERVE:
+            baselines = self._baselines(topic, job_ids)
+        else:
+            baselines = {str(scheduler_id): _fingerprint(since and since.get(scheduler_id))
+                         for scheduler_id in job_ids}
+        return {scheduler_id: self._watch(topic, str(scheduler_id), baselines[str(scheduler_id)])
+                for scheduler_id in job_ids}
+
+    def watch_async(self, scheduler_id, job_type) -> "asyncio.Future":
+        """
+        Wait for one job from a coroutine.
+
+        The baseline is listed on the default executor, so the event loop is not blocked.
+
+        Returns:
+            asyncio.Future: An awaitable bound to the running event loop, resolving like `watch`.
+        """
+        return asyncio.ensure_future(self._watch_async(scheduler_id, job_type))
+
+    async def _watch_async(self, scheduler_id, job_type) -> Dict:
+        future = await asyncio.get_running_loop().run_in_executor(None, self.watch, scheduler_id, job_type)
+        return await asyncio.wrap_future(future)
+
+    async def wait_for_async(self, job_ids: Iterable, job_type, timeout: float = None) -> Dict:
+        """
+        Asyncio counterpart of `wait_for`.
+
+        Raises:
+            asyncio.TimeoutError: If some jobs are still running when the timeout expires.
+            SchedulerError: If the topic is invalid or cannot be listed.
+        """
+        job_ids = list(job_ids)
+        loop = asyncio.get_running_loop()
+        futures = await loop.run_in_executor(None, self._watch_many, job_ids, job_type, _OBSERVE)
+        waiters = [asyncio.wrap_future(futures[scheduler_id]) for scheduler_id in job_ids]
+        try:
+            jobs = await asyncio.wait_for(asyncio.gather(*waiters), timeout)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        return dict(zip(job_ids, jobs))
+
+    def close(self):
+        """Stop polling and cancel every pending waiter."""
+        with self._condition:
+            self._closed = True
+            waiters, self._waiters = self._waiters, {}
+            self._condition.notify_all()
+        for jobs in waiters.values():
+            for waiters_of_job in jobs.values():
+                for waiter in waiters_of_job:
+                    waiter.future.cancel()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _pending_topics(self) -> Dict[str, Set[str]]:
+        """Drop cancelled waiters and get the job IDs still waited for per topic. Needs the lock."""
+        for topic in list(self._waiters):
+            jobs = self._waiters[topic]
+            for key in list(jobs):
+                jobs[key] = [waiter for waiter in jobs[key] if not waiter.future.done()]
+                if not jobs[key]:
+                    del jobs[key]
+            if not jobs:
+                del self._waiters[topic]
+                self._errors.pop(topic, None)
+        return {topic: set(jobs) for topic, jobs in self._waiters.items()}
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    while not self._closed and self._clock() < self._deadline:
+                        self._condition.wait(self._deadline - self._clock())
+                    topics = self._pending_topics()
+                    if self._closed or not topics:
+                        self._thread = None
+                        return
+
+                finished = sum(self._poll(topic, job_ids) for topic, job_ids in topics.items())
+
+                with self._condition:
+                    self.tick_count += 1
+                    if finished:
+                        self._current_interval = self.interval
+                    self._deadline = self._clock() + self._current_interval
+                    self._current_interval = min(self.max_interval, self._current_interval * self.backoff)
+        finally:
+            # Let the next watch start a new thread, even if this one died
+            with self._condition:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _fail(self, topic: str, error: Exception):
+        """Fail every waiter of a topic."""
+        with self._condition:
+            self._errors.pop(topic, None)
+            jobs = self._waiters.pop(topic, {})
+        for waiters in jobs.values():
+            for waiter in waiters:
+                if waiter.future.set_running_or_notify_cancel():
+                    waiter.future.set_exception(error)
+
+    def _list_finished(self, topic: str):
+        """
+        List the most recently finished jobs of a topic with one request.
+
+        Returns:
+            tuple: The listed jobs keyed by ID as a string, and whether the page holds every
+            finished job of the topic, in which case a job absent from it has not finished.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        with self._condition:
+            self.request_count += 1
+        data = self.scheduler._fetch_page(topic, 0, self.page_size, status_filter=self.terminal_statuses,
+                                          sort_by=RUN_TIME_FIELDS[0], ascending=False)
+        content = data.get("content") or []
+        listed = {}
+        for job in content:
+            # Check the status too, in case the server ignores the filter
+            if str(job_status(job)).upper() in self.terminal_statuses:
+                listed.setdefault(str(job_id(job)), job)
+        complete = not Scheduler._has_next_page(data, 0, self.page_size, len(content))
+        return listed, complete
+
+    def _baselines(self, topic: str, job_ids: Iterable) -> Dict[str, Optional[tuple]]:
+        """
+        List the runs jobs are watched from, before their waiters are added.
+
+        Raises:
+            SchedulerError: If the topic cannot be listed.
+        """
+        try:
+            listed, _ = self._list_finished(topic)
+        except (requests.exceptions.RequestException, ValueError) as req_err:
+            raise SchedulerError(f"Failed to list job statuses of {topic}: {req_err}") from req_err
+        # A job missing from the page is running or finished before every listed run; either
+        # way the next listed run is new
+        return {str(scheduler_id): _fingerprint(listed.get(str(scheduler_id))) for scheduler_id in job_ids}
+
+    def _poll(self, topic: str, job_ids: Set[str]) -> int:
+        """
+        List the finished jobs of a topic and resolve the waiters of new runs.
+
+        Returns:
+            int: The number of jobs that finished.
+        """
+        try:
+            listed, complete = self._list_finished(topic)
+        except (requests.exceptions.RequestException, ValueError) as req_err:
+            with self._condition:
+                errors = self._errors[topic] = self._errors.get(topic, 0) + 1
+            if errors >= self.max_errors:
+                self._fail(topic, SchedulerError(f"Failed to poll job statuses of {topic}: {req_err}"))
+            return 0
+        except Exception as error:
+            # Not transient, such as a failed user details lookup: fail the waiters instead of the thread
+            self._fail(topic, error)
+            return 0
+
+        resolved = []
+        finished = set()
+        with self._condition:
+            self._errors.pop(topic, None)
+            jobs = self._waiters.get(topic, {})
+            for key in job_ids:
+                job = listed.get(key)
+                fingerprint = _fingerprint(job)
+                waiting = []
+                for waiter in jobs.get(key, []):
+                    if job is None:
+                        if complete:
+                            # Absent from the whole terminal listing means running, so any terminal run is new
+                            waiter.baseline = None
+                        waiting.append(waiter)
+                    elif fingerprint != waiter.baseline:
+                        resolved.append((waiter.future, job))
+                        finished.add(key)
+                    else:
+                        waiting.append(waiter)
+                if waiting:
+                    jobs[key] = waiting
+                else:
+                    jobs.pop(key, None)
+        for future, job in resolved:
+            if future.set_running_or_notify_cancel():
+                future.set_result(job)
+        return len(finished)
@@ -0,0 +1,136 @@
+"""
+Listing queries for PyAvrio Scheduler
+
+The ListQuery class describes one job listing with the filters the list API
+applies on the server: a search string, a sort order, statuses, scheduled
+frequencies and the page window. Filtering on the server keeps responses small
+instead of downloading every job and filtering in the client.
+"""
+from typing import Dict, Iterable, Tuple, Union
+
+DEFAULT_PAGE_SIZE = 1000  # Number of jobs requested per list page
+
+
+def _values(values) -> Tuple[str, ...]:
+    """Normalize one value or an iterable of values to a tuple of upper-case strings."""
+    if values is None:
+        return ()
+    if isinstance(values, str):
+        values = (values,)
+    return tuple(str(value).strip().upper() for value in values)
+
+
+class ListQuery:
+    """
+    An immutable job listing query.
+
+    Every builder method returns a new query, so a base query can be shared and
+    refined safely:
+
+        failed_daily = ListQuery("sql_notebook").with_status("FAILED").with_frequency("DAILY")
+
+    Attributes:
+        topic (str or JobType): The topic to list.
+        search_by (str): Text the server matches against the jobs.
+        sort_by (str): Field the server sorts by, empty for the default order.
+        ascending (bool): Sort direction.
+        statuses (tuple): Only list jobs with one of these statuses, all when empty.
+        frequencies (tuple): Only list jobs with one of these scheduled frequencies, all when empty.
+        page (int): The zero-based first page.
+        size (int): The number of jobs per page.
+    """
+    __slots__ = ("topic", "search_by", "sort_by", "ascending", "statuses", "frequencies", "page", "size")
+
+    def __init__(self, topic, search_by: str = "", sort_by: str = "", ascending: bool = True,
+                 statuses: Union[str, Iterable[str]] = (), frequencies: Union[str, Iterable[str]] = (),
+                 page: int = 0, size: int = DEFAULT_PAGE_SIZE):
+        """
+        Initialize the query.
+
+        Args:
+            topic (str or JobType): python_notebook, sql_notebook or data_quality.
+            search_by (str): Text the server matches against the jobs.
+            sort_by (str): Field the server sorts by.
+            ascending (bool): Sort direction.
+            statuses (str or iterable): Statuses to keep.
+            frequencies (str or iterable): Scheduled frequencies to keep.
+            page (int): The zero-based first page.
+            size (int): The number of jobs per page.
+
+        Raises:
+            ValueError: If the page or size is out of range.
+        """
+        if page < 0:
+            raise ValueError("Page must not be negative.")
+        if size <= 0:
+            raise ValueError("Page size must be a positive integer.")
+        self.topic = topic
+        self.search_by = search_by or ""
+        self.sort_by = sort_by or ""
+        self.ascending = bool(ascending)
+        self.statuses = _values(statuses)
+        self.frequencies = _values(frequencies)
+        self.page = page
+        self.size = size
+
+    def _replace(self, **changes) -> "ListQuery":
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return ListQuery(**fields)
+
+    def for_topic(self, topic) -> "ListQuery":
+        """Get the same query for another topic."""
+        return self._replace(topic=topic)
+
+    def search(self, text: str) -> "ListQuery":
+        """Only list jobs matching the search text."""
+        return self._replace(search_by=text)
+
+    def order_by(self, field: str, ascending: bool = True) -> "ListQuery":
+        """Sort the listing by a job field."""
+        return self._replace(sort_by=field, ascending=ascending)
+
+    def with_status(self, *statuses: str) -> "ListQuery":
+        """Only list jobs with one of these statuses, in addition to those already selected."""
+        return self._replace(statuses=self.statuses + _values(statuses))
+
+    def with_frequency(self, *frequencies: str) -> "ListQuery":
+        """Only list jobs with one of these scheduled frequencies, in addition to those already selected."""
+        return self._replace(frequencies=self.frequencies + _values(frequencies))
+
+    def paginate(self, page: int, size: int = None) -> "ListQuery":
+        """Start at another page, optionally with another page size."""
+        return self._replace(page=page, size=size if size is not None else self.size)
+
+    def list_params(self) -> Dict:
+        """Get the filters as keyword arguments of `Scheduler._list_payload`."""
+        return {
+            "search_by": self.search_by,
+            "sort_by": self.sort_by,
+            "ascending": self.ascending,
+            "status_filter": list(self.statuses),
+            "frequency_filter": list(self.frequencies),
+        }
+
+    def filters(self) -> Dict:
+        """Get every field that changes the response, for use in cache keys."""
+        return {
+            "searchBy": self.search_by,
+            "sortBy": self.sort_by,
+            "ascending": self.ascending,
+            "statusFilter": sorted(set(self.statuses)),
+            "scheduledFrequencyFilter": sorted(set(self.frequencies)),
+            "page": self.page,
+            "size": self.size,
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ListQuery):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ListQuery({fields})"
@@ -0,0 +1,90 @@
+"""
+Rate limiting for PyAvrio Scheduler
+
+The RateLimiter class implements a thread-safe token bucket used to cap how
+many requests per second are sent to the Avrio gateway.
+"""
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket.
+
+    Attributes:
+        rate (float): Tokens added to the bucket per second.
+        capacity (float): Maximum number of tokens the bucket can hold.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize a full token bucket.
+
+        Args:
+            rate (float): Number of requests allowed per second.
+            capacity (float, optional): Burst size. Defaults to one second worth of tokens,
+                with a minimum of one.
+            clock (callable): Monotonic clock returning seconds.
+            sleep (callable): Function used to wait for tokens.
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be a positive number.")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self, tokens: float) -> float:
+        """Take tokens if available and return 0, otherwise return the seconds to wait."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Take tokens from the bucket without waiting.
+
+        Args:
+            tokens (float): Number of tokens to take.
+
+        Returns:
+            bool: True if the tokens were taken, False if the bucket is short.
+        """
+        return self._take(tokens) == 0.0
+
+    def acquire(self, tokens: float = 1.0):
+        """
+        Take tokens from the bucket, waiting until enough are available.
+
+        Args:
+            tokens (float): Number of tokens to take.
+        """
+        wait = self._take(tokens)
+        while wait:
+            self._sleep(wait)
+            wait = self._take(tokens)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """
+        Take tokens from the bucket, yielding to the event loop until enough are available.
+
+        Args:
+            tokens (float): Number of tokens to take.
+        """
+        wait = self._take(tokens)
+        while wait:
+            await asyncio.sleep(wait)
+            wait = self._take(tokens)
@@ -0,0 +1,196 @@
+"""
+Retry and circuit breaking for PyAvrio Scheduler
+
+RetryPolicy decides whether and when a failed request is sent again, using
+exponential backoff with jitter and honouring `Retry-After`. CircuitBreaker
+tracks failures per host and fails fast while a backend is down.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+
+DEFAULT_RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without sending the request while the circuit of a host is open"""
+    pass
+
+
+class RetryPolicy:
+    """
+    When and how often to retry a request.
+
+    Idempotent requests (sign-in, user details, listings) are retried on connection
+    errors, timeouts and the configured statuses. Non-idempotent requests (triggers)
+    are only retried when `retry_non_idempotent` is set, since a lost response may
+    hide a job that already started.
+
+    Attributes:
+        max_attempts (int): Total attempts, including the first one.
+        backoff_base (float): Delay in seconds before the first retry.
+        backoff_max (float): Upper bound of the backoff delay.
+        jitter (bool): Pick a random delay up to the backoff ("full jitter").
+        retry_statuses (tuple): Response statuses that are retried.
+        respect_retry_after (bool): Wait for the server's `Retry-After` when present.
+        max_retry_after (float): Give up instead of waiting longer than this for `Retry-After`.
+        retry_non_idempotent (bool): Also retry triggers.
+    """
+
+    def __init__(self, max_attempts: int = 3, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 jitter: bool = True, retry_statuses=DEFAULT_RETRY_STATUSES, respect_retry_after: bool = True,
+                 max_retry_after: float = 120.0, retry_non_idempotent: bool = False, sleep=time.sleep):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts (int): Total attempts, including the first one.
+            backoff_base (float): Delay in seconds before the first retry, doubled on every retry.
+            backoff_max (float): Upper bound of the backoff delay.
+            jitter (bool): Randomize delays to avoid synchronized retries.
+            retry_statuses (iterable): Response statuses that are retried.
+            respect_retry_after (bool): Wait for the server's `Retry-After` when present.
+            max_retry_after (float): Give up instead of waiting longer than this for `Retry-After`.
+            retry_non_idempotent (bool): Also retry triggers.
+            sleep (callable): Function used to wait between attempts.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.retry_non_idempotent = retry_non_idempotent
+        self.sleep = sleep
+
+    def allows(self, attempt: int, idempotent: bool) -> bool:
+        """
+        Whether another attempt may follow a failed one.
+
+        Args:
+            attempt (int): Number of attempts made so far.
+            idempotent (bool): Whether the request can safely be repeated.
+        """
+        return attempt < self.max_attempts and (idempotent or self.retry_non_idempotent)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Get the delay before the next attempt.
+
+        Args:
+            attempt (int): Number of attempts made so far, starting at 1.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    @staticmethod
+    def retry_after(response) -> Optional[float]:
+        """
+        Read the `Retry-After` header of a response.
+
+        Returns:
+            float: Seconds to wait, or None if the header is missing or invalid.
+        """
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+
+    def delay_for(self, attempt: int, response=None) -> Optional[float]:
+        """
+        Get the delay before retrying, honouring `Retry-After`.
+
+        Returns:
+            float: Seconds to wait, or None if the server asks to wait longer than allowed.
+        """
+        if response is not None and self.respect_retry_after:
+            retry_after = self.retry_after(response)
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+        return self.backoff(attempt)
+
+
+class CircuitBreaker:
+    """
+    A per-host circuit breaker.
+
+    After `failure_threshold` consecutive failures (connection errors or 5xx
+    responses) the circuit of the host opens and requests fail immediately with
+    CircuitOpenError. After `reset_timeout` seconds one probe request is let
+    through; its success closes the circuit, its failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        """
+        Initialize the breaker with every circuit closed.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open a circuit.
+            reset_timeout (float): Seconds a circuit stays open before a probe is allowed.
+            clock (callable): Monotonic clock returning seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, list] = {}  # host -> [state, consecutive failures, opened at]
+
+    def state(self, host: str) -> str:
+        """Get the circuit state of a host."""
+        with self._lock:
+            circuit = self._hosts.get(host)
+            if circuit is None:
+                return self.CLOSED
+            if circuit[0] == self.OPEN and self._clock() - circuit[2] >= self.reset_timeout:
+                return self.HALF_OPEN
+            return circuit[0]
+
+    def before_request(self, host: str):
+        """
+        Check that a request to the host may be sent.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe in flight.
+        """
+        with self._lock:
+            circuit = self._hosts.get(host)
+            if circuit is None or circuit[0] == self.CLOSED:
+                return
+            if circuit[0] == self.OPEN and self._clock() - circuit[2] >= self.reset_timeout:
+                circuit[0] = self.HALF_OPEN  # Let this request through as the probe
+                return
+            raise CircuitOpenError(f"Circuit open for {host}: failing fast after {circuit[1]} failures.")
+
+    def record_success(self, host: str):
+        """Close the circuit of a host."""
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host: str):
+        """Count a failure and open the circuit once the threshold is reached."""
+        with self._lock:
+            circuit = self._hosts.setdefault(host, [self.CLOSED, 0, 0.0])
+            circuit[1] += 1
+            if circuit[0] == self.HALF_OPEN or circuit[1] >= self.failure_threshold:
+                circuit[0] = self.OPEN
+                circuit[2] = self._clock()
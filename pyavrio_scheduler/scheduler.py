@@ -1,90 +1,666 @@
 from .session import Session
 import requests
-from enum import Enum
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .auth import UserDetailsError
 from .endpoints import SchedulerEndpoints
+from .cache import ListingCache
+from .catalog import JobCatalog
+from .coalesce import SingleFlight
+from .ledger import TriggerLedger
+from .jobs import Job, JobType, job_id, to_job_type
+from .query import ListQuery
+from .ratelimit import RateLimiter
+from .streaming import STREAM_CHUNK_SIZE, iter_listing
 
-class JobType(Enum):
-    DATA_QUALITY = "dsdq"
-    PYTHON_NOTEBOOK = "python_notebook"
-    SQL_NOTEBOOK = "sql_notebook"
+LIST_TOPICS = ("DSDQ", "PYTHON_NOTEBOOK", "SQL_NOTEBOOK")  # Topics accepted by the list API
+
+class SchedulerError(Exception):
+    """Custom exception for scheduler errors"""
+    pass
+
+class TriggerResult(NamedTuple):
+    """The outcome of one trigger sent by `Scheduler.trigger_many`."""
+    job: Any  # The job description as passed by the caller
+    response: Optional[Dict]  # The decoded trigger response, None on failure
+    error: Optional[Exception]  # The exception raised by the trigger, None on success
+    latency: float  # Seconds spent sending the trigger
+
+    @property
+    def ok(self) -> bool:
+        """Whether the trigger succeeded."""
+        return self.error is None
 
 class Scheduler:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, cache: ListingCache = None, catalog: JobCatalog = None,
+                 single_flight: SingleFlight = None, ledger: TriggerLedger = None):
+        """
+        Initialize the Scheduler for a session.
+
+        Args:
+            session (Session): The authenticated session.
+            cache (ListingCache, optional): Cache for `list_all` results. Listings are
+                always downloaded when not provided.
+            catalog (JobCatalog, optional): Catalog used to resolve jobs triggered by name only.
+            single_flight (SingleFlight, optional): Coalesces identical concurrent `list_all`
+                calls. Share one between schedulers to coalesce calls across sessions of the
+                same user. Every scheduler gets its own when not provided.
+            ledger (TriggerLedger, optional): Records triggers so that a job triggered again
+                within the ledger window is skipped. Every trigger is sent when not provided.
+        """
         self.session = session
+        self.cache = cache
+        self.catalog = catalog
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+        self.ledger = ledger
+        self._status_poller = None
+        self._status_poller_lock = threading.Lock()
+
+    def _headers(self) -> Dict:
+        """Build the request headers for the current user."""
+        return {
+            "Authorization": "Bearer " + self.session.get_access_token(),
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def _normalize_list_topic(selected_topic_name) -> str:
+        """Map a user supplied topic name to the topic expected by the list API."""
+        if isinstance(selected_topic_name, JobType):
+            selected_topic_name = selected_topic_name.value
+        selected_topic_name = selected_topic_name.strip().upper()
+        if selected_topic_name == "DATA_QUALITY":
+            selected_topic_name = "DSDQ"
+        return selected_topic_name
+
+    @staticmethod
+    def _list_payload(user_id, topic: str, page: int, size: int, status_filter=None, frequency_filter=None,
+                      search_by: str = "", sort_by: str = "", ascending: bool = True) -> Dict:
+        """Build the request body of the list API."""
+        return {
+            "userId": user_id,
+            "topic": topic,
+            "searchBy": search_by,
+            "sortBy": sort_by,
+            "ascending": ascending,
+            "page": page,
+            "size": size,
+            "statusFilter": list(status_filter or []),
+            "scheduledFrequencyFilter": list(frequency_filter or [])
+        }
+
+    def _query(self, selected_topic_name, search: str = None, sort_by: str = None, ascending: bool = True,
+               status=None, frequency=None) -> ListQuery:
+        """
+        Build the query of a listing call from a topic name or ListQuery and filter keywords.
+
+        The topic of the returned query is normalized but not validated.
+        """
+        if isinstance(selected_topic_name, ListQuery):
+            query = selected_topic_name
+        else:
+            query = ListQuery(selected_topic_name)
+        query = query.for_topic(self._normalize_list_topic(query.topic))
+        if search:
+            query = query.search(search)
+        if sort_by:
+            query = query.order_by(sort_by, ascending)
+        if status:
+            query = query.with_status(*([status] if isinstance(status, str) else status))
+        if frequency:
+            query = query.with_frequency(*([frequency] if isinstance(frequency, str) else frequency))
+        return query
+
+    def _post_list(self, topic: str, page: int, size: int, headers: Dict = None,
+                   stream: bool = False, **filters) -> requests.Response:
+        """
+        Send one request to the list API.
+
+        Args:
+            topic (str): A normalized list topic.
+            page (int): The zero-based page number.
+            size (int): The number of jobs per page.
+            headers (dict, optional): Extra request headers.
+            stream (bool): Return as soon as the headers arrive, leaving the body unread.
+            **filters: Server-side filters, as accepted by `_list_payload`.
+
+        Returns:
+            requests.Response: The successful (2xx or 304) response.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        endpoint = self.session.get_host().rstrip("/") + SchedulerEndpoints.LIST_API
+        payload = self._list_payload(self.session.user_state.user_id, topic, page, size, **filters)
+
+        request_headers = self._headers()
+        if headers:
+            request_headers.update(headers)
+
+        response = self.session.transport.post(endpoint, headers=request_headers, json=payload, stream=stream)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+
+        return response
+
+    def _fetch_page(self, topic: str, page: int, size: int, **filters) -> Dict:
+        """
+        Fetch one page of the job listing.
+
+        Args:
+            topic (str): A normalized list topic.
+            page (int): The zero-based page number.
+            size (int): The number of jobs per page.
+            **filters: Server-side filters, as accepted by `_list_payload`.
+
+        Returns:
+            dict: The decoded response body.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        return self.session.transport.decode(self._post_list(topic, page, size, **filters))
+
+    def _fetch_cached(self, query: ListQuery) -> list:
+        """
+        Fetch one page of a listing through the cache.
+
+        Fresh entries are returned as is. Expired entries holding validators are
+        revalidated with a conditional request. Listings with different filters are
+        cached separately.
+        """
+        key = self.cache.make_key(self.session.get_host(), self.session.user_state.user_id, query.topic,
+                                  query.filters())
+        entry, fresh = self.cache.lookup(key)
+        if fresh:
+            return entry.value
+
+        headers = entry.conditional_headers() if entry is not None else None
+        response = self._post_list(query.topic, query.page, query.size, headers=headers, **query.list_params())
+        if response.status_code == 304 and entry is not None:
+            if self.cache.revalidate(key, entry) is not None:
+                return entry.value
+            # Invalidated while the request was in flight, by a trigger for instance: the
+            # validators are outdated, so fetch the listing again
+            response.close()
+            response = self._post_list(query.topic, query.page, query.size, **query.list_params())
 
-    def list_all(self, selected_topic_name):
-        """Call list scheduler API and return results."""
+        content = self.session.transport.decode(response).get("content", [])
+        self.cache.store(key, content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return content
+
+    def _fetch_listing(self, query: ListQuery) -> list:
+        """Fetch the jobs of one page of a listing, through the cache if there is one."""
+        if self.cache is not None:
+            return self._fetch_cached(query)
+        return self._fetch_page(query.topic, query.page, query.size, **query.list_params()).get("content", [])
+
+    def invalidate_cache(self, selected_topic_name=None) -> int:
+        """
+        Drop cached listings of the current user.
+
+        Args:
+            selected_topic_name (str, optional): Only drop listings of this topic.
+
+        Returns:
+            int: The number of listings dropped.
+        """
+        if self.cache is None:
+            return 0
+        topic = self._normalize_list_topic(selected_topic_name) if selected_topic_name else None
+        return self.cache.invalidate(self.session.get_host(), self.session.user_state.user_id, topic)
+
+    def list_all(self, selected_topic_name, records: bool = False, stream: bool = False, search: str = None,
+                 sort_by: str = None, ascending: bool = True, status=None, frequency=None):
+        """
+        Call list scheduler API and return results.
+
+        The topic can be given as a ListQuery, and the filter keywords are applied on
+        the server, so only matching jobs are downloaded:
+
+            scheduler.list_all("sql_notebook", status="FAILED", frequency="DAILY")
+
+        Concurrent calls for the same host, user, topic and filters share one request
+        and receive the same list, so callers must not modify it. Coalesced calls are
+        counted by `single_flight.stats()`.
+
+        With `records=True` the jobs are returned as compact Job records instead of
+        the raw dictionaries. With `stream=True` an iterator is returned instead of a
+        list: jobs are decoded one by one as the response is downloaded, bypassing the
+        cache, and a failure while reading the body raises SchedulerError.
+
+        Args:
+            selected_topic_name (str or ListQuery): python_notebook, sql_notebook or data_quality,
+                or a query selecting the topic, filters and page.
+            records (bool): Return Job records.
+            stream (bool): Return an iterator decoding the response incrementally.
+            search (str, optional): Only list jobs matching this text.
+            sort_by (str, optional): Sort the listing by this field.
+            ascending (bool): Sort direction when `sort_by` is given.
+            status (str or list, optional): Only list jobs with these statuses.
+            frequency (str or list, optional): Only list jobs with these scheduled frequencies.
+
+        Raises:
+            UserDetailsError: If the user ID of a new session cannot be looked up.
+        """
         try:
-            endpoint = self.session.get_host().rstrip("/") + SchedulerEndpoints.LIST_API
-        
-            headers = {
-                "Authorization": "Bearer " + self.session.user_state.access_token,
-                "Content-Type": "application/json",
-            }
-            selected_topic_name = selected_topic_name.strip().upper()
-
-            if selected_topic_name == "DATA_QUALITY" :
-                selected_topic_name = "DSDQ"
-
-            payload = {
-                "userId": self.session.user_state.user_id,
-                "topic": selected_topic_name,
-                "searchBy": "",
-                "sortBy": "",
-                "ascending": True,
-                "page": 0,
-                "size": 1000,
-                "statusFilter": [],
-                "scheduledFrequencyFilter": []
-            }
-
-            if selected_topic_name == "DSDQ" or selected_topic_name == "PYTHON_NOTEBOOK" or selected_topic_name == "SQL_NOTEBOOK"  :
-                pass
-            else:
+            query = self._query(selected_topic_name, search, sort_by, ascending, status, frequency)
+            selected_topic_name = query.topic
+
+            if selected_topic_name not in LIST_TOPICS:
                 print("Invalid topic selection. Please select from python_notebook, sql_notebook or data_quality.")
                 return None
-            
-            response = requests.post(endpoint, headers=headers, json=payload)
-            response.raise_for_status()
 
-            if response.status_code == 500:
-                print(f"Server Error: {response.text}")
+            if stream:
+                response = self._post_list(selected_topic_name, query.page, query.size, stream=True,
+                                           **query.list_params())
+                return self._stream_response(response, selected_topic_name, query.page, records)
 
-            return response.json().get("content", [])
+            key = ListingCache.make_key(self.session.get_host(), self.session.user_state.user_id,
+                                        selected_topic_name, query.filters())
+            content = self.single_flight.do(key, lambda: self._fetch_listing(query))
+
+            return Job.from_listing(content, selected_topic_name) if records else content
 
         except requests.exceptions.HTTPError as http_err:
             print(f"Error while calling list scheduler API: {http_err}")
         except requests.exceptions.RequestException as req_err:
             print(f"Request exception occurred: {req_err}")
+        except UserDetailsError:
+            raise  # Without a user ID no call can succeed
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
 
         return None
 
-    
-    def trigger_scheduler(self, scheduler_name, scheduler_id, job_type: JobType):
-        """Trigger scheduler API."""
+    def iter_jobs(self, selected_topic_name, page_size: int = None, prefetch: bool = True,
+                  records: bool = False, stream: bool = False, search: str = None, sort_by: str = None,
+                  ascending: bool = True, status=None, frequency=None) -> Iterator[Dict]:
+        """
+        Iterate over every job of a topic, walking all pages of the listing.
+
+        Jobs are yielded one at a time. While the caller consumes a page, the next
+        page is fetched in the background, so at most two pages are held in memory.
+        Filters are applied on the server, as in `list_all`, and every page is
+        requested with the same filters.
+
+        Args:
+            selected_topic_name (str or ListQuery): python_notebook, sql_notebook or data_quality,
+                or a query selecting the topic, filters and first page.
+            page_size (int, optional): The number of jobs requested per page. Defaults to the
+                size of the query.
+            prefetch (bool): Fetch the next page in the background when True.
+            records (bool): Yield compact Job records instead of dictionaries.
+            stream (bool): Decode each page while it is downloaded instead of buffering it.
+                Pages are then fetched one after the other, without prefetching.
+            search (str, optional): Only list jobs matching this text.
+            sort_by (str, optional): Sort the listing by this field.
+            ascending (bool): Sort direction when `sort_by` is given.
+            status (str or list, optional): Only list jobs with these statuses.
+            frequency (str or list, optional): Only list jobs with these scheduled frequencies.
+
+        Yields:
+            dict or Job: One job of the listing.
+
+        Raises:
+            SchedulerError: If the topic is invalid or a page cannot be fetched.
+        """
+        query = self._query(selected_topic_name, search, sort_by, ascending, status, frequency)
+        topic = query.topic
+        if topic not in LIST_TOPICS:
+            raise SchedulerError("Invalid topic selection. Please select from python_notebook, sql_notebook or data_quality.")
+        if page_size is None:
+            page_size = query.size
+        if page_size <= 0:
+            raise SchedulerError("Page size must be a positive integer.")
+        filters = query.list_params()
+
+        if stream:
+            yield from self._iter_streamed(topic, query.page, page_size, records, filters)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        pending = None
         try:
-            job_type = job_type.strip().upper()
-            if job_type == "PYTHON_NOTEBOOK" or job_type == "SQL_NOTEBOOK" :
-                job_type = "NOTEBOOK"
-            elif job_type == "DATA_QUALITY" :
-                job_type = "DSDQ"
-
-            endpoint = self.session.get_host() + SchedulerEndpoints.TRIGGER_API
-            headers = {"Authorization": "Bearer " + self.session.user_state.access_token, "Content-Type": "application/json"}
-
-            payload = {
-                "jobName": scheduler_name,
-                "jobId": scheduler_id,
-                "topic": job_type, 
-                "userId": self.session.user_state.user_id
-            }
-
-            response = requests.post(endpoint, headers=headers, json=payload)
-            response.raise_for_status()
+            page = query.page
+            data = self._get_page(topic, page, page_size, filters)
+            while True:
+                content = data.get("content") or []
+                has_next = self._has_next_page(data, page, page_size, len(content))
+
+                if has_next and executor is not None:
+                    pending = executor.submit(self._get_page, topic, page + 1, page_size, filters)
+
+                for job in content:
+                    yield Job.from_dict(job, topic) if records else job
+                del content, data  # Release the consumed page before waiting for the next
+
+                if not has_next:
+                    return
+                page += 1
+                if pending is not None:
+                    data, pending = pending.result(), None
+                else:
+                    data = self._get_page(topic, page, page_size, filters)
+        finally:
+            if pending is not None:
+                pending.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def _iter_streamed(self, topic: str, page: int, page_size: int, records: bool,
+                       filters: Dict) -> Iterator[Dict]:
+        """Walk the pages of a listing from `page` on, decoding each one while it is downloaded."""
+        while True:
+            try:
+                response = self._post_list(topic, page, page_size, stream=True, **filters)
+            except requests.exceptions.RequestException as req_err:
+                raise SchedulerError(f"Failed to list page {page} of {topic}: {req_err}")
 
-            return response.json()  
+            meta = {}
+            count = 0
+            for job in self._stream_response(response, topic, page, records, meta):
+                count += 1
+                yield job
+
+            if not self._has_next_page(meta, page, page_size, count):
+                return
+            page += 1
+
+    @staticmethod
+    def _stream_response(response: requests.Response, topic: str, page: int, records: bool,
+                         meta: Dict = None) -> Iterator[Dict]:
+        """
+        Yield the jobs of a streamed list response as they are decoded.
+
+        Raises:
+            SchedulerError: If the body cannot be read or decoded.
+        """
+        try:
+            chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            for job in iter_listing(chunks, "content", meta):
+                yield Job.from_dict(job, topic) if records else job
+        except (requests.exceptions.RequestException, ValueError) as err:
+            raise SchedulerError(f"Failed to read page {page} of {topic}: {err}")
+        finally:
+            response.close()
+
+    def _get_page(self, topic: str, page: int, size: int, filters: Dict = None) -> Dict:
+        """Fetch one page of the listing, converting request failures to SchedulerError."""
+        try:
+            return self._fetch_page(topic, page, size, **(filters or {}))
+        except requests.exceptions.RequestException as req_err:
+            raise SchedulerError(f"Failed to list page {page} of {topic}: {req_err}")
+
+    @staticmethod
+    def _has_next_page(data: Dict, page: int, page_size: int, count: int) -> bool:
+        """Decide whether another page follows, using the paging fields when present."""
+        if "last" in data:
+            return not data["last"]
+        if "totalPages" in data:
+            return page + 1 < data["totalPages"]
+        return count >= page_size
+
+    @staticmethod
+    def _job_types(topics) -> List[JobType]:
+        """Resolve "all", one topic or an iterable of topics to distinct JobType members."""
+        if isinstance(topics, str) and topics.strip().lower() == "all":
+            return list(JobType)
+        if isinstance(topics, (str, JobType)):
+            topics = [topics]
+        job_types = []
+        for topic in topics:
+            job_type = to_job_type(topic)
+            if job_type is None:
+                raise SchedulerError(f"Invalid topic {topic!r}. Please select from python_notebook, "
+                                     "sql_notebook or data_quality.")
+            if job_type not in job_types:
+                job_types.append(job_type)
+        return job_types
+
+    def list_topics(self, topics="all", records: bool = True, in_completion_order: bool = False,
+                    page_size: int = None, **filters):
+        """
+        List several topics concurrently and merge the results.
+
+        Every topic is walked page by page on its own thread over the shared connection
+        pool. Jobs are tagged with their JobType and de-duplicated by (JobType, job ID),
+        which drops jobs repeated when pages shift during the walk.
+
+        Args:
+            topics (str, JobType or iterable): "all", or the topics to list.
+            records (bool): Return Job records, whose `topic` is the JobType. With False the
+                job dictionaries are returned with a `jobType` key holding the JobType.
+            in_completion_order (bool): Return an iterator of (JobType, jobs) pairs in the order the
+                topics finish, instead of one merged list.
+            page_size (int, optional): The number of jobs requested per page.
+            **filters: Server-side filters applied to every topic, as accepted by `iter_jobs`.
+
+        Returns:
+            list or iterator: The merged jobs in topic order, or (JobType, jobs) pairs.
+
+        Raises:
+            SchedulerError: If a topic is invalid or cannot be listed.
+        """
+        job_types = self._job_types(topics)
+        executor = ThreadPoolExecutor(max_workers=len(job_types) or 1)
+        futures = {executor.submit(self._list_topic, job_type, records, page_size, filters): job_type
+                   for job_type in job_types}
+        if in_completion_order:
+            return self._iter_topics(executor, futures)
+
+        try:
+            results = {futures[future]: future.result() for future in futures}
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        return [job for job_type in job_types for job in results[job_type]]
+
+    def _list_topic(self, job_type: JobType, records: bool, page_size: int, filters: Dict) -> List:
+        """Walk every page of one topic, tagging and de-duplicating its jobs."""
+        seen = set()
+        jobs = []
+        for job in self.iter_jobs(job_type, page_size=page_size, prefetch=False, records=records, **filters):
+            key = job_id(job)
+            if key in seen:
+                continue
+            seen.add(key)
+            if not records:
+                job["jobType"] = job_type
+            jobs.append(job)
+        return jobs
+
+    @staticmethod
+    def _iter_topics(executor: ThreadPoolExecutor, futures: Dict) -> Iterator[Tuple[JobType, List]]:
+        """Yield (JobType, jobs) pairs as the topics finish."""
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _normalize_trigger_topic(job_type) -> str:
+        """Map a user supplied topic name to the topic expected by the trigger API."""
+        if isinstance(job_type, JobType):
+            job_type = job_type.value
+        job_type = job_type.strip().upper()
+        if job_type == "PYTHON_NOTEBOOK" or job_type == "SQL_NOTEBOOK" :
+            job_type = "NOTEBOOK"
+        elif job_type == "DATA_QUALITY" :
+            job_type = "DSDQ"
+        return job_type
+
+    @classmethod
+    def _trigger_payload(cls, user_id, scheduler_name, scheduler_id, job_type) -> Dict:
+        """Build the request body of the trigger API."""
+        return {
+            "jobName": scheduler_name,
+            "jobId": scheduler_id,
+            "topic": cls._normalize_trigger_topic(job_type),
+            "userId": user_id
+        }
+
+    def _trigger(self, scheduler_name, scheduler_id, job_type) -> Dict:
+        """
+        Send one trigger request, unless the ledger recorded the same trigger recently.
+
+        Returns:
+            dict: The trigger response, or the recorded response of the original trigger.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        if self.ledger is not None:
+            return self.ledger.run(self.session.get_host(), scheduler_id, self._normalize_trigger_topic(job_type),
+                                   lambda: self._send_trigger(scheduler_name, scheduler_id, job_type))
+        return self._send_trigger(scheduler_name, scheduler_id, job_type)
+
+    def _send_trigger(self, scheduler_name, scheduler_id, job_type) -> Dict:
+        """Send one trigger request."""
+        endpoint = self.session.get_host() + SchedulerEndpoints.TRIGGER_API
+
+        payload = self._trigger_payload(self.session.user_state.user_id, scheduler_name, scheduler_id, job_type)
+
+        response = self.session.transport.post(endpoint, idempotent=False, headers=self._headers(), json=payload)
+        response.raise_for_status()
+
+        # The triggered job changes state, so its cached listing is no longer accurate
+        self.invalidate_cache(job_type)
+
+        return self.session.transport.decode(response)
+
+    def resolve_job(self, scheduler_name, job_type=None):
+        """
+        Resolve a job name to its ID and topic using the scheduler catalog.
+
+        Args:
+            scheduler_name (str): The name of the job.
+            job_type (str, optional): The topic, needed when names repeat across topics.
+
+        Returns:
+            tuple: The job ID and its list topic.
+
+        Raises:
+            SchedulerError: If there is no catalog or the name is unknown or ambiguous.
+        """
+        if self.catalog is None:
+            raise SchedulerError("A JobCatalog is required to trigger a job by name only.")
+        topic = self._normalize_list_topic(job_type) if job_type else None
+        try:
+            topic, job = self.catalog.resolve(scheduler_name, topic)
+        except LookupError as e:
+            raise SchedulerError(str(e))
+        return job_id(job), topic
+
+    def trigger_scheduler(self, scheduler_name, scheduler_id=None, job_type: JobType = None):
+        """
+        Trigger scheduler API.
+
+        When `scheduler_id` is omitted, the ID and topic are resolved from the
+        scheduler catalog by name. A Job record can be passed instead of the name.
+        """
+        if isinstance(scheduler_name, Job):
+            scheduler_name, scheduler_id, job_type = scheduler_name.name, scheduler_name.id, scheduler_name.topic
+        if scheduler_id is None:
+            scheduler_id, job_type = self.resolve_job(scheduler_name, job_type)
+        try:
+            return self._trigger(scheduler_name, scheduler_id, job_type)
         except requests.exceptions.RequestException as req_err:
             print(f"Error while triggering scheduler: {req_err}")
             return None
+
+    def trigger_many(self, jobs: Iterable, max_workers: int = None,
+                     rate_limit: float = None) -> Iterator[TriggerResult]:
+        """
+        Trigger many jobs concurrently on a bounded thread pool.
+
+        Results are yielded as the triggers complete, not in submission order.
+        Failures are reported in the result instead of being printed.
+
+        Args:
+            jobs (iterable): Jobs to trigger, each either a Job, a dict with `jobName`, `jobId`
+                and `topic` keys or a (scheduler_name, scheduler_id, job_type) tuple.
+            max_workers (int, optional): Number of concurrent triggers. Defaults to the
+                per-host pool size of the session transport.
+            rate_limit (float, optional): Maximum number of triggers started per second.
+
+        Yields:
+            TriggerResult: The outcome of one trigger.
+        """
+        if max_workers is None:
+            max_workers = self.session.transport.pool_maxsize
+        limiter = RateLimiter(rate_limit, capacity=1) if rate_limit else None
+
+        def run(job):
+            if limiter is not None:
+                limiter.acquire()
+            started = time.perf_counter()
+            try:
+                name, scheduler_id, topic = self._job_arguments(job)
+                response = self._trigger(name, scheduler_id, topic)
+                return TriggerResult(job, response, None, time.perf_counter() - started)
+            except Exception as e:
+                return TriggerResult(job, None, e, time.perf_counter() - started)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run, job) for job in jobs]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    @property
+    def status_poller(self):
+        """Get the StatusPoller shared by every `wait_for` call of this scheduler."""
+        with self._status_poller_lock:
+            if self._status_poller is None:
+                from .poller import StatusPoller
+                self._status_poller = StatusPoller(self)
+            return self._status_poller
+
+    def wait_for(self, job_ids: Iterable, job_type, timeout: float = None, include_finished: bool = False) -> Dict:
+        """
+        Block until triggered jobs report a new terminal run.
+
+        Concurrent callers share one background poller, so any number of waiters
+        costs one listing request per topic per polling tick. Use
+        `status_poller.watch` for a future per job instead.
+
+        Args:
+            job_ids (iterable): The IDs of the jobs.
+            job_type (JobType or str): The topic of the jobs.
+            timeout (float, optional): Seconds to wait. Waits indefinitely when None.
+            include_finished (bool): Return jobs already listed with a terminal status right
+                away, instead of waiting for their next run.
+
+        Returns:
+            dict: The listed job of every ID, keyed by the IDs as passed.
+
+        Raises:
+            concurrent.futures.TimeoutError: If some jobs are still running when the timeout expires.
+            SchedulerError: If the topic is invalid or cannot be listed.
+        """
+        if include_finished:
+            return self.status_poller.wait_for(job_ids, job_type, timeout, since=None)
+        return self.status_poller.wait_for(job_ids, job_type, timeout)
+
+    @staticmethod
+    def _job_arguments(job):
+        """Extract (scheduler_name, scheduler_id, job_type) from a job description."""
+        if isinstance(job, Job):
+            return job.name, job.id, job.topic
+        if isinstance(job, dict):
+            return job["jobName"], job["jobId"], job["topic"]
+        scheduler_name, scheduler_id, job_type = job
+        return scheduler_name, scheduler_id, job_type
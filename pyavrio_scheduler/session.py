@@ -1,24 +1,38 @@
-from .state import UserState
+from .state import SessionState
+from .tokens import TokenManager
+from .transport import DEFAULT_BACKEND, BaseTransport, create_transport
 
 class Session:
     """
     The Session class stores the user state and host information for the current session.
 
     Attributes:
-        _user_state (UserState): The state of the current user, holding information such as access tokens and user details.
+        _user_state (SessionState): The state of the current user, holding information such as access tokens and user details.
         _host (str): The host URL or server address for the session.
+        _transport (BaseTransport): The HTTP transport used for every request of the session.
+        _token_manager (TokenManager): Refreshes the access token before it expires, if any.
     """
     
-    def __init__(self, host: str, user_state: UserState):
+    def __init__(self, host: str, user_state: SessionState, transport=None,
+                 token_manager: TokenManager = None):
         """
         Initialize the Session object with host and user state information.
 
         Args:
             host (str): The host URL or address for the session.
-            user_state (UserState): An instance of the UserState class holding user-specific data.
+            user_state (SessionState): The state holding user-specific data, owned by this session
+                or the shared UserState singleton.
+            transport (BaseTransport or str, optional): The HTTP transport to use, or the name
+                of the backend to create one with: "requests" (the default) or "http2".
+            token_manager (TokenManager, optional): Keeps the access token valid. The token
+                held by the user state is used as is when not provided.
         """
         self._user_state = user_state  # Store the user state instance in the session
         self._host = host  # Store the host URL for the session
+        if transport is None or isinstance(transport, str):
+            transport = create_transport(transport or DEFAULT_BACKEND)
+        self._transport = transport
+        self._token_manager = token_manager
 
     def get_host(self) -> str:
         """
@@ -30,23 +44,73 @@ class Session:
         return self._host 
 
     @property
-    def user_state(self) -> UserState:
+    def user_state(self) -> SessionState:
         """
         Retrieve the current user's state information.
 
         Returns:
-            UserState: The user state object that holds the user's information and session data.
+            SessionState: The user state object that holds the user's information and session data.
         """
         return self._user_state 
+
+    @property
+    def transport(self) -> BaseTransport:
+        """
+        Retrieve the HTTP transport of the session.
+
+        Returns:
+            BaseTransport: The transport shared by the authentication and scheduler calls.
+        """
+        return self._transport
+
+    @property
+    def token_manager(self) -> TokenManager:
+        """
+        Retrieve the token manager of the session, if any.
+
+        Returns:
+            TokenManager: The manager refreshing the access token, or None.
+        """
+        return self._token_manager
+
+    def get_access_token(self) -> str:
+        """
+        Get a valid access token for the session.
+
+        When the session has a token manager, the token is refreshed shortly before
+        it expires and the user state is updated with the new one.
+
+        Returns:
+            str: The access token.
+        """
+        if self._token_manager is None:
+            return self._user_state.access_token
+        token = self._token_manager.get_token()
+        if token != self._user_state.access_token:
+            self._user_state.access_token = token
+        return token
+
+    def close(self):
+        """Close the connections held by the session transport."""
+        self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
-    def get_scheduler(self):
+    def get_scheduler(self, **kwargs):
         """
         Retrieve the scheduler instance associated with the current session.
 
         This method imports the Scheduler class and returns an instance of it, passing the current session as an argument.
 
+        Args:
+            **kwargs: Optional keyword arguments forwarded to the Scheduler, such as `cache`.
+
         Returns:
             Scheduler: An instance of the Scheduler class associated with this session.
         """
         from .scheduler import Scheduler  
-        return Scheduler(self)  
+        return Scheduler(self, **kwargs)
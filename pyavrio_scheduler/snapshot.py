@@ -0,0 +1,317 @@
+"""
+Persistent job snapshot for PyAvrio Scheduler
+
+The JobSnapshot class keeps the last known listing of every topic in a local
+SQLite database. Each sync compares a fresh listing with the snapshot, writes
+only the jobs that were added, removed or changed, and appends those deltas to
+a change feed. Consumers can read jobs and changes from the snapshot instead of
+calling the list API.
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .catalog import JobCatalog
+from .jobs import job_frequency, job_id, job_name, job_status
+
+TRACKED_FIELDS = ("name", "status", "frequency")  # Fields whose change is recorded in the feed
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    topic TEXT NOT NULL,
+    job_key TEXT NOT NULL,
+    name TEXT,
+    status TEXT,
+    frequency TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (topic, job_key)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE TABLE IF NOT EXISTS syncs (
+    sync_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    added INTEGER NOT NULL,
+    changed INTEGER NOT NULL,
+    removed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    sync_id INTEGER NOT NULL,
+    topic TEXT NOT NULL,
+    job_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    old TEXT,
+    new TEXT,
+    changed_at REAL NOT NULL
+);
+"""
+
+
+class Change(NamedTuple):
+    """One entry of the change feed."""
+    seq: int  # Position in the feed, increasing
+    sync_id: int  # The sync that detected the change
+    topic: str  # The list topic of the job
+    job_id: object  # The ID of the job
+    kind: str  # "added", "changed" or "removed"
+    fields: Tuple[str, ...]  # Tracked fields that changed, empty for added and removed jobs
+    old: Optional[Dict]  # The job before the change, None when added
+    new: Optional[Dict]  # The job after the change, None when removed
+    changed_at: float  # UNIX time of the sync
+
+
+class SyncResult(NamedTuple):
+    """The outcome of syncing one topic."""
+    sync_id: int
+    topic: str
+    added: int
+    changed: int
+    removed: int
+
+
+def _tracked(job: Dict) -> Tuple:
+    return job_name(job), job_status(job), job_frequency(job)
+
+
+def _encode(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+class JobSnapshot:
+    """
+    A SQLite store of the latest listing per topic, with a change feed.
+
+    Topics are the list topics used by the list API, such as `PYTHON_NOTEBOOK`.
+    Only the standard library `sqlite3` module is needed.
+    """
+
+    def __init__(self, path: str = ":memory:", tracked_fields: Iterable[str] = TRACKED_FIELDS,
+                 clock=time.time):
+        """
+        Open or create a snapshot.
+
+        Args:
+            path (str): The database file, or ":memory:" for a snapshot kept in memory.
+            tracked_fields (iterable): Which of "name", "status" and "frequency" produce
+                "changed" entries in the feed. Other differences update the stored job silently.
+            clock (callable): Returns the current UNIX time.
+        """
+        unknown = set(tracked_fields) - set(TRACKED_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown tracked fields: {sorted(unknown)}")
+        self.path = path
+        self.tracked_fields = tuple(field for field in TRACKED_FIELDS if field in tracked_fields)
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")  # Readers do not block syncs
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def sync(self, topic: str, jobs: Iterable[Dict]) -> SyncResult:
+        """
+        Replace the snapshot of a topic with a fresh, complete listing.
+
+        Only added, removed and changed jobs are written, in one transaction.
+
+        Args:
+            topic (str): The list topic of the listing.
+            jobs (iterable): Every job of the topic, as returned by the list API.
+
+        Returns:
+            SyncResult: The number of added, changed and removed jobs.
+        """
+        now = self._clock()
+        fresh = {}
+        for job in jobs:
+            job = dict(job)
+            job.pop("jobType", None)  # Tag added by Scheduler.list_topics
+            fresh[_encode(job_id(job))] = job
+
+        with self._lock:
+            stored = {key: (name, status, frequency, data) for key, name, status, frequency, data in
+                      self._connection.execute(
+                          "SELECT job_key, name, status, frequency, data FROM jobs WHERE topic = ?", (topic,))}
+
+            upserts, deletes, changes = [], [], []
+            for key, job in fresh.items():
+                data = _encode(job)
+                previous = stored.pop(key, None)
+                if previous is not None and previous[3] == data:
+                    continue
+                upserts.append((topic, key, *_tracked(job), data, now))
+                if previous is None:
+                    changes.append((topic, key, "added", (), None, data))
+                    continue
+                fields = tuple(field for field, old, new in zip(TRACKED_FIELDS, previous[:3], _tracked(job))
+                               if field in self.tracked_fields and old != new)
+                if fields:
+                    changes.append((topic, key, "changed", fields, previous[3], data))
+            for key, previous in stored.items():
+                deletes.append((topic, key))
+                changes.append((topic, key, "removed", (), previous[3], None))
+
+            counts = {"added": 0, "changed": 0, "removed": 0}
+            for change in changes:
+                counts[change[2]] += 1
+
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                sync_id = connection.execute(
+                    "INSERT INTO syncs (topic, synced_at, added, changed, removed) VALUES (?, ?, ?, ?, ?)",
+                    (topic, now, counts["added"], counts["changed"], counts["removed"])).lastrowid
+                connection.executemany(
+                    "INSERT OR REPLACE INTO jobs (topic, job_key, name, status, frequency, data, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", upserts)
+                connection.executemany("DELETE FROM jobs WHERE topic = ? AND job_key = ?", deletes)
+                connection.executemany(
+                    "INSERT INTO changes (sync_id, topic, job_key, kind, fields, old, new, changed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(sync_id, topic, key, kind, json.dumps(fields), old, new, now)
+                     for topic, key, kind, fields, old, new in changes])
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return SyncResult(sync_id, topic, counts["added"], counts["changed"], counts["removed"])
+
+    def refresh(self, scheduler, topics="all", page_size: int = None) -> Dict[str, SyncResult]:
+        """
+        Sync topics from the list API, listing them concurrently.
+
+        Args:
+            scheduler (Scheduler): The scheduler used to list jobs.
+            topics (str, JobType or iterable): "all", or the topics to sync.
+            page_size (int, optional): The number of jobs requested per page.
+
+        Returns:
+            dict: The SyncResult of every list topic.
+
+        Raises:
+            SchedulerError: If a topic cannot be listed. Topics listed before the
+                failure are still synced.
+        """
+        results = {}
+        for job_type, jobs in scheduler.list_topics(topics, records=False, in_completion_order=True,
+                                                    page_size=page_size):
+            topic = scheduler._normalize_list_topic(job_type)
+            results[topic] = self.sync(topic, jobs)
+        return results
+
+    def jobs(self, topic: str = None, status: str = None, frequency: str = None) -> List[Dict]:
+        """
+        Read jobs from the snapshot.
+
+        Args:
+            topic (str, optional): Only jobs of this list topic.
+            status (str, optional): Only jobs with this status.
+            frequency (str, optional): Only jobs with this scheduled frequency.
+
+        Returns:
+            list: The jobs, ordered by topic and ID.
+        """
+        clauses, params = [], []
+        for column, value in (("topic", topic), ("status", status), ("frequency", frequency)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT data FROM jobs{where} ORDER BY topic, job_key", params).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def get(self, topic: str, scheduler_id) -> Optional[Dict]:
+        """Read one job from the snapshot, or None if it is unknown."""
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM jobs WHERE topic = ? AND job_key = ?",
+                                           (topic, _encode(scheduler_id))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, topic: str = None) -> int:
+        """Get the number of jobs in the snapshot."""
+        with self._lock:
+            if topic is None:
+                return self._connection.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            return self._connection.execute("SELECT COUNT(*) FROM jobs WHERE topic = ?", (topic,)).fetchone()[0]
+
+    def to_catalog(self, catalog: JobCatalog = None) -> JobCatalog:
+        """
+        Load the snapshot into a JobCatalog.
+
+        Args:
+            catalog (JobCatalog, optional): The catalog to update. A new one is created when not provided.
+
+        Returns:
+            JobCatalog: The catalog holding every job of the snapshot.
+        """
+        catalog = catalog if catalog is not None else JobCatalog()
+        with self._lock:
+            topics = [topic for topic, in self._connection.execute("SELECT DISTINCT topic FROM jobs")]
+        for topic in topics:
+            catalog.update(topic, self.jobs(topic))
+        return catalog
+
+    def changes(self, since: int = 0, topic: str = None, limit: int = None) -> List[Change]:
+        """
+        Read the change feed.
+
+        Args:
+            since (int): Only changes after this sequence number. Pass the `seq` of the last
+                change processed to resume a consumer.
+            topic (str, optional): Only changes of this list topic.
+            limit (int, optional): Return at most this many changes.
+
+        Returns:
+            list: The changes in feed order.
+        """
+        query = "SELECT seq, sync_id, topic, job_key, kind, fields, old, new, changed_at FROM changes WHERE seq > ?"
+        params = [since]
+        if topic is not None:
+            query += " AND topic = ?"
+            params.append(topic)
+        query += " ORDER BY seq"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [Change(seq, sync_id, topic, json.loads(key), kind, tuple(json.loads(fields)),
+                       json.loads(old) if old is not None else None,
+                       json.loads(new) if new is not None else None, changed_at)
+                for seq, sync_id, topic, key, kind, fields, old, new, changed_at in rows]
+
+    def last_sequence(self) -> int:
+        """Get the sequence number of the latest change, 0 if there is none."""
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def prune_changes(self, before: int) -> int:
+        """
+        Drop old entries of the change feed.
+
+        Args:
+            before (int): Drop changes with a sequence number up to and including this one.
+
+        Returns:
+            int: The number of changes dropped.
+        """
+        with self._lock:
+            return self._connection.execute("DELETE FROM changes WHERE seq <= ?", (before,)).rowcount
@@ -1,87 +1,191 @@
 """
-Global user state management for PyAvrio Scheduler
+User state management for PyAvrio Scheduler
 
-This class manages the global state of the user within the PyAvrio Scheduler application.
-It follows the Singleton pattern to ensure there is only one instance of the user state.
-The state includes information like access token, username, email, and user ID.
+SessionState holds the authentication state of one Session: access token,
+username, email, and user ID. Every field is protected by a lock, so several
+sessions for different users or hosts can be driven from one process. The user
+ID can be resolved lazily, the first time it is read.
+
+UserState is the original process-global Singleton, kept for code that shares
+one state across the application.
 """
+import threading
+from typing import Callable
+
 
-class UserState:
+class SessionState:
     """
-    A Singleton class to manage the user state across the application.
+    A thread-safe user state owned by a single Session.
 
     Attributes:
-        _instance (UserState): The single instance of the UserState class.
         _access_token (str): The access token for authentication.
         _username (str): The username of the currently authenticated user.
         _email (str): The email address of the currently authenticated user.
         _user_id (int): The unique ID of the currently authenticated user.
     """
-    
-    _instance = None  # Holds the instance of the UserState class (for Singleton pattern)
-    _access_token = None  # Stores the access token
-    _username = None  # Stores the username
-    _email = None  # Stores the user's email address
-    _user_id = None  # Stores the user's ID
 
-    def __new__(cls):
+    def __init__(self, access_token=None, username=None, email=None, user_id=None):
         """
-        Ensure that only one instance of the UserState class is created.
+        Initialize the state.
 
-        The method implements the Singleton pattern. If the instance already exists,
-        it returns the existing instance; otherwise, it creates a new one.
-
-        Returns:
-            UserState: The single instance of the UserState class.
+        Args:
+            access_token (str, optional): The access token.
+            username (str, optional): The username.
+            email (str, optional): The email address.
+            user_id (int, optional): The user ID.
         """
-        if cls._instance is None:
-            # If instance does not exist, create a new one
-            cls._instance = super(UserState, cls).__new__(cls)
-        return cls._instance
+        self._lock = threading.RLock()
+        self._access_token = access_token
+        self._username = username
+        self._email = email
+        self._user_id = user_id
+        self._user_id_loader = None
 
     @property
     def access_token(self):
         """Get the current access token."""
-        return self._access_token
+        with self._lock:
+            return self._access_token
 
     @access_token.setter
     def access_token(self, value):
         """Set the access token."""
-        self._access_token = value
+        with self._lock:
+            self._access_token = value
 
     @property
     def username(self):
         """Get the current username."""
-        return self._username
+        with self._lock:
+            return self._username
 
     @username.setter
     def username(self, value):
         """Set the username."""
-        self._username = value
+        with self._lock:
+            self._username = value
 
     @property
     def email(self):
         """Get the current email address."""
-        return self._email
+        with self._lock:
+            return self._email
 
     @email.setter
     def email(self, value):
         """Set the email address."""
-        self._email = value
+        with self._lock:
+            self._email = value
 
     @property
     def user_id(self):
-        """Get the current user ID."""
-        return self._user_id
+        """
+        Get the current user ID, resolving it with the user ID loader when it is unset.
+
+        Raises:
+            Exception: Whatever the loader raised. It is called again on the next read.
+        """
+        with self._lock:
+            user_id, loader = self._user_id, self._user_id_loader
+        if user_id is None and loader is not None:
+            # Called without the lock, so a slow lookup does not block the other fields
+            user_id = loader()
+            with self._lock:
+                if self._user_id_loader is loader:
+                    self._user_id = user_id
+                    self._user_id_loader = None
+        return user_id
 
     @user_id.setter
     def user_id(self, value):
         """Set the user ID."""
-        self._user_id = value
+        with self._lock:
+            self._user_id = value
+
+    def set_user_id_loader(self, loader: Callable[[], object]):
+        """
+        Resolve the user ID lazily.
+
+        Args:
+            loader (callable): Called without arguments the first time `user_id` is
+                read while it is unset. Its result is kept as the user ID. Any user ID
+                already set is cleared, since it may belong to a previous sign-in.
+        """
+        with self._lock:
+            self._user_id = None
+            self._user_id_loader = loader
+
+    def update(self, **fields):
+        """
+        Set several fields at once, so readers never see a half-updated state.
+
+        Args:
+            **fields: Any of access_token, username, email and user_id.
+        """
+        unknown = set(fields) - {"access_token", "username", "email", "user_id"}
+        if unknown:
+            raise AttributeError(f"Unknown state fields: {sorted(unknown)}")
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, "_" + name, value)
+
+    def snapshot(self) -> dict:
+        """
+        Read every field at once, without resolving a lazy user ID.
+
+        Returns:
+            dict: access_token, username, email and user_id.
+        """
+        with self._lock:
+            return {
+                "access_token": self._access_token,
+                "username": self._username,
+                "email": self._email,
+                "user_id": self._user_id,
+            }
 
     def clear(self):
         """Clear all stored state data."""
-        self._access_token = None
-        self._username = None
-        self._email = None
-        self._user_id = None
+        with self._lock:
+            self._access_token = None
+            self._username = None
+            self._email = None
+            self._user_id = None
+            self._user_id_loader = None
+
+
+class UserState(SessionState):
+    """
+    A Singleton class to manage the user state across the application.
+
+    Attributes:
+        _instance (UserState): The single instance of the UserState class.
+        _access_token (str): The access token for authentication.
+        _username (str): The username of the currently authenticated user.
+        _email (str): The email address of the currently authenticated user.
+        _user_id (int): The unique ID of the currently authenticated user.
+    """
+    
+    _instance = None  # Holds the instance of the UserState class (for Singleton pattern)
+    _instance_lock = threading.Lock()  # Guards creation of the single instance
+
+    def __new__(cls):
+        """
+        Ensure that only one instance of the UserState class is created.
+
+        The method implements the Singleton pattern. If the instance already exists,
+        it returns the existing instance; otherwise, it creates a new one.
+
+        Returns:
+            UserState: The single instance of the UserState class.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                # If instance does not exist, create a new one
+                instance = super(UserState, cls).__new__(cls)
+                SessionState.__init__(instance)
+                cls._instance = instance
+        return cls._instance
+
+    def __init__(self):
+        """Keep the existing state: the single instance is initialized once in `__new__`."""
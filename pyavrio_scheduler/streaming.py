@@ -0,0 +1,136 @@
+"""
+Incremental JSON decoding for PyAvrio Scheduler
+
+`iter_listing` decodes a list API response while it is being downloaded and
+yields the jobs of its `content` array one at a time, so a large page is never
+held in memory as raw bytes, text and an object tree at once. The other
+top-level fields, such as the paging information, are collected on the side.
+"""
+import codecs
+import json
+from typing import Dict, Iterable, Iterator
+
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read from the socket at a time
+
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",]}"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """A text buffer over a byte stream, refilled on demand."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping what was consumed. Returns False at the end."""
+        while not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self._text_decoder.decode(b"", final=True)
+            else:
+                text = self._text_decoder.decode(chunk)
+            if text:
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self) -> str:
+        """Get the next non-whitespace character without consuming it, or "" at the end."""
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self.fill():
+                return ""
+
+    def next_char(self) -> str:
+        """Consume and return the next non-whitespace character."""
+        char = self.peek()
+        if not char:
+            raise ValueError("Unexpected end of JSON stream.")
+        self.pos += 1
+        return char
+
+    def expect(self, expected: str):
+        char = self.next_char()
+        if char != expected:
+            raise ValueError(f"Expected {expected!r} at offset {self.pos - 1} but found {char!r}.")
+
+    def value(self):
+        """Decode one complete JSON value, reading more of the stream until it is available."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A number followed by anything but a delimiter, e.g. "1." or "1e", or by the
+                # end of the buffer may continue in the next chunk
+                if self.eof or (end < len(self.buffer) and (
+                        self.buffer[end] in _DELIMITERS or not isinstance(value, (int, float)))):
+                    self.pos = end
+                    return value
+            self.fill()
+
+
+def iter_listing(chunks: Iterable[bytes], key: str = "content", meta: Dict = None) -> Iterator:
+    """
+    Decode a JSON object incrementally, yielding the items of one of its arrays.
+
+    Args:
+        chunks (iterable): The UTF-8 encoded body, in chunks of any size.
+        key (str): The top-level key of the array to stream.
+        meta (dict, optional): Receives every other top-level field once it has been read.
+            Fields after the array are only available when the iteration is finished.
+
+    Yields:
+        The decoded items of the array, as soon as each is complete.
+
+    Raises:
+        ValueError: If the body is not a JSON object or is truncated.
+    """
+    reader = _Reader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        name = reader.value()
+        if not isinstance(name, str):
+            raise ValueError(f"Expected an object key but found {name!r}.")
+        reader.expect(":")
+
+        if name == key and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield reader.value()
+                    separator = reader.next_char()
+                    if separator == "]":
+                        break
+                    if separator != ",":
+                        raise ValueError(f"Expected ',' or ']' but found {separator!r}.")
+        else:
+            value = reader.value()
+            if meta is not None:
+                meta[name] = value
+
+        separator = reader.next_char()
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or '}}' but found {separator!r}.")
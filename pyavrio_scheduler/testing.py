@@ -0,0 +1,500 @@
+"""
+Local stand-in Avrio server for PyAvrio Scheduler tests
+
+MockAvrioServer implements the sign-in, user details, job list and trigger
+endpoints on a background thread using only the standard library, so the
+client can be exercised end to end without a real Avrio deployment.
+MockAvrioH2Server serves the same endpoints over cleartext HTTP/2 (h2c with
+prior knowledge) and needs the optional `h2` dependency.
+"""
+import base64
+import gzip
+import json
+import random
+import socket
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:  # pragma: no cover - depends on the installed extras
+    h2 = None
+
+from .endpoints import SchedulerEndpoints
+
+COMPRESS_MIN_SIZE = 1024  # Smaller bodies are sent uncompressed, as gateways usually do
+
+
+def make_token(email: str, exp: float = None, **claims) -> str:
+    """
+    Build an unsigned JWT carrying the given email and claims.
+
+    Args:
+        email (str): The email claim of the token.
+        exp (float, optional): The expiry claim as a UNIX timestamp.
+        **claims: Any extra claims to put in the payload.
+
+    Returns:
+        str: The encoded token.
+    """
+    def encode(data):
+        raw = json.dumps(data).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    payload = {"email": email}
+    if exp is not None:
+        payload["exp"] = int(exp)
+    payload.update(claims)
+    return encode({"alg": "none", "typ": "JWT"}) + "." + encode(payload) + ".signature"
+
+
+def make_jobs(count: int, topic: str = "PYTHON_NOTEBOOK", start: int = 1) -> list:
+    """
+    Generate listing entries shaped like the ones returned by the list API.
+
+    Args:
+        count (int): Number of jobs.
+        topic (str): The list topic of the jobs.
+        start (int): The first job ID.
+
+    Returns:
+        list: The jobs as dictionaries.
+    """
+    statuses = ("SUCCESS", "FAILED", "RUNNING", "SCHEDULED")
+    frequencies = ("DAILY", "WEEKLY", "MONTHLY", "HOURLY")
+    return [{
+        "jobId": job_id,
+        "jobName": f"{topic.lower()}_job_{job_id}",
+        "topic": topic.upper(),
+        "status": statuses[job_id % len(statuses)],
+        "scheduledFrequency": frequencies[job_id % len(frequencies)],
+        "cronExpression": f"{job_id % 60} {job_id % 24} * * *",
+        "createdBy": "user@example.com",
+        "createdAt": "2024-01-01T00:00:00Z",
+        "lastRunTime": "2024-06-01T00:00:00Z",
+        "description": f"Generated job {job_id}",
+    } for job_id in range(start, start + count)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections open between requests
+    disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+    def setup(self):
+        super().setup()
+        self.server.mock.record_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        mock = self.server.mock
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            payload = json.loads(body.decode("utf-8")) if body else {}
+        except ValueError:
+            payload = {}
+
+        status, data, headers = mock.handle(self.path, payload, dict(self.headers))
+        raw, encoding = mock.encode_body(status, data, self.headers.get("Accept-Encoding"))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(raw)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Accept bursts of concurrent connections without SYN retries
+
+
+class MockAvrioServer:
+    """
+    A threaded HTTP server that mimics the Avrio endpoints used by the client.
+
+    Attributes:
+        email (str): The email returned inside issued access tokens.
+        user_id (int): The user ID returned by the user details endpoint.
+        jobs (dict): Jobs served by the list endpoint, keyed by upper-case topic.
+        latency (float): Seconds to sleep before answering each request.
+        etags (bool): Whether listings carry an `ETag` and honour `If-None-Match`.
+        error_rate (float): Fraction of requests answered with `error_status`.
+        error_status (int): The status of randomly injected errors.
+        compression (bool): Whether bodies are gzipped for clients that accept it.
+        requests (list): The (path, payload) pairs received so far, when recorded.
+        bytes_sent (int): Response body bytes written so far, after compression.
+    """
+
+    def __init__(self, jobs: dict = None, email: str = "user@example.com", user_id: int = 1,
+                 latency: float = 0.0, etags: bool = True, error_rate: float = 0.0, error_status: int = 503,
+                 record_requests: bool = True, seed: int = None, host: str = "127.0.0.1", port: int = 0,
+                 compression: bool = True):
+        """
+        Initialize the server without starting it.
+
+        Args:
+            jobs (dict, optional): Jobs to serve, keyed by topic name.
+            email (str): The email to put in issued access tokens.
+            user_id (int): The user ID returned by the user details endpoint.
+            latency (float): Seconds to sleep before answering each request.
+            etags (bool): Whether listings carry an `ETag` and honour `If-None-Match`.
+            error_rate (float): Fraction of requests answered with `error_status`.
+            error_status (int): The status of randomly injected errors.
+            record_requests (bool): Keep every request in `requests`. Disable for long benchmarks.
+            seed (int, optional): Seed of the random error injection.
+            host (str): The interface to bind.
+            port (int): The port to bind, 0 picks a free one.
+            compression (bool): Gzip bodies of at least COMPRESS_MIN_SIZE bytes when the
+                request accepts it.
+        """
+        self.email = email
+        self.user_id = user_id
+        self.latency = latency
+        self.etags = etags
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.record_requests = record_requests
+        self.compression = compression
+        self.bytes_sent = 0
+        self.jobs = {topic.upper(): list(items) for topic, items in (jobs or {}).items()}
+        self.requests = []
+        self._errors = {}  # path -> list of (status, headers) answered before the normal response
+        self._random = random.Random(seed)
+        self._request_count = 0
+        self._address = (host, port)
+        self._lock = threading.Lock()
+        self._connections = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def connection_count(self) -> int:
+        """Get the number of TCP connections accepted so far."""
+        return self._connections
+
+    @property
+    def request_count(self) -> int:
+        """Get the number of requests answered so far."""
+        return self._request_count
+
+    def record_connection(self):
+        """Count a newly accepted connection."""
+        with self._lock:
+            self._connections += 1
+
+    def record_bytes(self, count: int):
+        """Count response body bytes written."""
+        with self._lock:
+            self.bytes_sent += count
+
+    def encode_body(self, status: int, data, accept_encoding: str = None):
+        """
+        Serialize a response body, gzipping it when the client accepts it.
+
+        Args:
+            status (int): The HTTP status code.
+            data: The JSON-serializable body.
+            accept_encoding (str, optional): The `Accept-Encoding` request header.
+
+        Returns:
+            tuple: The body bytes and the `Content-Encoding`, None when uncompressed.
+        """
+        raw = json.dumps(data).encode("utf-8") if status != 304 else b""
+        encoding = None
+        if self.compression and len(raw) >= COMPRESS_MIN_SIZE and "gzip" in (accept_encoding or ""):
+            raw, encoding = gzip.compress(raw, compresslevel=6), "gzip"
+        self.record_bytes(len(raw))
+        return raw, encoding
+
+    def inject_error(self, path: str, status: int, times: int = 1, headers: dict = None):
+        """
+        Answer the next requests to a path with an error status.
+
+        Args:
+            path (str): The endpoint path, e.g. `SchedulerEndpoints.LIST_API`.
+            status (int): The error status to return.
+            times (int): How many requests get the error.
+            headers (dict, optional): Extra response headers such as `Retry-After`.
+        """
+        with self._lock:
+            self._errors.setdefault(path, []).extend([(status, headers or {})] * times)
+
+    def start(self) -> "MockAvrioServer":
+        """Start serving on a background thread."""
+        self._server = _Server(self._address, _Handler)
+        self._server.mock = self
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server and release its socket."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def handle(self, path: str, payload: dict, headers: dict):
+        """
+        Produce the status code and JSON body for a request.
+
+        Args:
+            path (str): The request path.
+            payload (dict): The decoded JSON request body.
+            headers (dict): The request headers.
+
+        Returns:
+            tuple: The HTTP status code, the JSON-serializable response body and extra headers.
+        """
+        with self._lock:
+            self._request_count += 1
+            if self.record_requests:
+                self.requests.append((path, payload))
+            errors = self._errors.get(path)
+            error = errors.pop(0) if errors else None
+            if error is None and self.error_rate and self._random.random() < self.error_rate:
+                error = (self.error_status, {})
+        if self.latency:
+            time.sleep(self.latency)
+        if error is not None:
+            return error[0], {"error": f"Injected {error[0]}"}, error[1]
+
+        if path == SchedulerEndpoints.TOKEN_ENDPOINT:
+            return 200, {"accessToken": make_token(payload.get("email") or self.email)}, {}
+        if path == SchedulerEndpoints.USER_DETAILS:
+            return 200, {"userId": self.user_id}, {}
+        if path == SchedulerEndpoints.LIST_API:
+            data = self._list_page(payload)
+            etag = '"%08x"' % (zlib.crc32(json.dumps(data, sort_keys=True).encode("utf-8")))
+            if self.etags and headers.get("If-None-Match") == etag:
+                return 304, None, {"ETag": etag}
+            return 200, data, {"ETag": etag} if self.etags else {}
+        if path == SchedulerEndpoints.TRIGGER_API:
+            return 200, {"jobId": payload.get("jobId"), "jobName": payload.get("jobName"),
+                         "topic": payload.get("topic"), "status": "TRIGGERED"}, {}
+        return 404, {"error": f"Unknown path {path}"}, {}
+
+    def set_status(self, job_id, status: str, topic: str = None):
+        """
+        Change the status of served jobs.
+
+        Args:
+            job_id: The ID of the job.
+            status (str): The new status.
+            topic (str, optional): Only change the job in this topic.
+        """
+        with self._lock:
+            for name, jobs in self.jobs.items():
+                if topic is not None and name != topic.upper():
+                    continue
+                for job in jobs:
+                    if job.get("jobId") == job_id:
+                        job["status"] = status
+
+    def _list_page(self, payload: dict) -> dict:
+        jobs = self.jobs.get(str(payload.get("topic", "")).upper(), [])
+        statuses = payload.get("statusFilter")
+        if statuses:
+            jobs = [job for job in jobs if job.get("status") in statuses]
+        frequencies = payload.get("scheduledFrequencyFilter")
+        if frequencies:
+            jobs = [job for job in jobs if job.get("scheduledFrequency") in frequencies]
+        search = str(payload.get("searchBy") or "").lower()
+        if search:
+            jobs = [job for job in jobs if search in str(job.get("jobName", "")).lower()]
+        sort_by = payload.get("sortBy")
+        if sort_by:
+            jobs = sorted(jobs, key=lambda job: str(job.get(sort_by, "")),
+                          reverse=not payload.get("ascending", True))
+        page = int(payload.get("page") or 0)
+        size = int(payload.get("size") or 1000)
+        content = jobs[page * size:(page + 1) * size]
+        total_pages = (len(jobs) + size - 1) // size if size else 0
+        return {
+            "content": content,
+            "number": page,
+            "size": size,
+            "totalElements": len(jobs),
+            "totalPages": total_pages,
+            "last": page + 1 >= total_pages,
+        }
+
+
+class _H2Connection:
+    """Serves the streams of one HTTP/2 connection, answering each on its own thread."""
+
+    def __init__(self, mock: "MockAvrioH2Server", sock: socket.socket):
+        self.mock = mock
+        self.sock = sock
+        self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False,
+                                                                         header_encoding="utf-8"))
+        self.lock = threading.Condition()  # Guards the state machine and socket writes
+        self.streams = {}  # stream ID -> (headers, body)
+        self.closed = False
+
+    def run(self):
+        with self.lock:
+            self.conn.initiate_connection()
+            self._flush()
+        try:
+            while True:
+                data = self.sock.recv(65536)
+                if not data:
+                    break
+                with self.lock:
+                    for event in self.conn.receive_data(data):
+                        self._on_event(event)
+                    self._flush()
+        except (OSError, h2.exceptions.ProtocolError):
+            pass
+        finally:
+            with self.lock:
+                self.closed = True
+                self.lock.notify_all()
+            self.sock.close()
+
+    def _on_event(self, event):
+        if isinstance(event, h2.events.RequestReceived):
+            self.streams[event.stream_id] = (dict(event.headers), bytearray())
+        elif isinstance(event, h2.events.DataReceived):
+            self.streams[event.stream_id][1].extend(event.data)
+            self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            headers, body = self.streams.pop(event.stream_id)
+            threading.Thread(target=self._respond, args=(event.stream_id, headers, bytes(body)),
+                             daemon=True).start()
+        elif isinstance(event, (h2.events.WindowUpdated, h2.events.RemoteSettingsChanged,
+                                h2.events.StreamReset)):
+            self.lock.notify_all()
+
+    def _flush(self):
+        data = self.conn.data_to_send()
+        if data:
+            self.sock.sendall(data)
+
+    def _respond(self, stream_id: int, headers: dict, body: bytes):
+        try:
+            payload = json.loads(body.decode("utf-8")) if body else {}
+        except ValueError:
+            payload = {}
+        request_headers = {name.title(): value for name, value in headers.items() if not name.startswith(":")}
+        status, data, extra = self.mock.handle(headers.get(":path", ""), payload, request_headers)
+        raw, encoding = self.mock.encode_body(status, data, headers.get("accept-encoding"))
+
+        response_headers = [(":status", str(status)), ("content-type", "application/json"),
+                            ("content-length", str(len(raw)))]
+        if encoding:
+            response_headers.append(("content-encoding", encoding))
+        response_headers.extend((name.lower(), value) for name, value in extra.items())
+        try:
+            with self.lock:
+                self.conn.send_headers(stream_id, response_headers, end_stream=not raw)
+                self._flush()
+                while raw:
+                    # Respect the flow control window of the client
+                    window = self.conn.local_flow_control_window(stream_id)
+                    if window <= 0:
+                        if self.closed:
+                            return
+                        self.lock.wait()
+                        continue
+                    size = min(window, len(raw), self.conn.max_outbound_frame_size)
+                    self.conn.send_data(stream_id, raw[:size], end_stream=size == len(raw))
+                    raw = raw[size:]
+                    self._flush()
+        except (OSError, h2.exceptions.ProtocolError):
+            pass  # The client reset the stream or went away
+
+
+class MockAvrioH2Server(MockAvrioServer):
+    """
+    A MockAvrioServer speaking cleartext HTTP/2 with prior knowledge (h2c).
+
+    Every request stream is answered on its own thread, so concurrent requests
+    multiplexed over one connection are served concurrently. `connection_count`
+    counts the TCP connections, which is one per client when streams are multiplexed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the server without starting it.
+
+        Args:
+            *args: Positional arguments of MockAvrioServer.
+            **kwargs: Keyword arguments of MockAvrioServer.
+
+        Raises:
+            ImportError: If h2 is not installed.
+        """
+        if h2 is None:
+            raise ImportError("MockAvrioH2Server requires h2. Install it with: pip install h2")
+        super().__init__(*args, **kwargs)
+        self._sockets = []
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the running server."""
+        host, port = self._server.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockAvrioH2Server":
+        """Start serving on a background thread."""
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(self._address)
+        self._server.listen(128)
+        self._thread = threading.Thread(target=self._serve, args=(self._server,), daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve(self, server: socket.socket):
+        while True:
+            try:
+                sock, _ = server.accept()
+            except OSError:
+                return  # The server was stopped
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.record_connection()
+            with self._lock:
+                self._sockets.append(sock)
+            threading.Thread(target=_H2Connection(self, sock).run, daemon=True).start()
+
+    def stop(self):
+        """Stop the server and close its connections."""
+        if self._server is not None:
+            try:
+                self._server.shutdown(socket.SHUT_RDWR)  # Wakes up the blocked accept
+            except OSError:
+                pass
+            self._server.close()
+            self._server = None
+            with self._lock:
+                sockets, self._sockets = self._sockets, []
+            for sock in sockets:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
@@ -0,0 +1,253 @@
+"""
+Access token management for PyAvrio Scheduler
+
+The TokenManager class tracks the `exp` claim of the JWT access token and signs
+in again shortly before it expires. Concurrent callers share a single refresh.
+The TokenFileCache class optionally persists tokens on disk so that short-lived
+processes can reuse a valid token instead of signing in.
+"""
+import base64
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+DEFAULT_REFRESH_MARGIN = 60.0  # Seconds before expiry at which the token is refreshed
+
+
+def decode_jwt_payload(jwt_token: str) -> Dict:
+    """
+    Decode the payload of a JWT without verifying its signature.
+
+    Args:
+        jwt_token (str): The JWT token.
+
+    Returns:
+        dict: The decoded payload.
+
+    Raises:
+        ValueError: If the token is not a well-formed JWT.
+    """
+    parts = jwt_token.split('.')
+    if len(parts) != 3:
+        raise ValueError("Invalid JWT token format.")
+
+    # Add padding if necessary, then decode the Base64 payload
+    payload_base64 = parts[1] + '=' * ((4 - len(parts[1]) % 4) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(payload_base64).decode('utf-8'))
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid JWT payload.")
+    return payload
+
+
+def token_expiry(jwt_token: str) -> Optional[float]:
+    """
+    Get the expiry time of a JWT.
+
+    Args:
+        jwt_token (str): The JWT token.
+
+    Returns:
+        float: The `exp` claim as a UNIX timestamp, or None if the token has none
+            or cannot be decoded.
+    """
+    try:
+        exp = decode_jwt_payload(jwt_token).get("exp")
+    except ValueError:
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+class TokenFileCache:
+    """
+    A JSON file of access tokens readable only by its owner.
+
+    Tokens are stored per key, usually the host and username. The file is written
+    atomically with mode 0600 and is ignored if other users can read or write it.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): Location of the cache file. `~` is expanded.
+        """
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(host: str, username: str) -> str:
+        """Build the cache key of a host and username."""
+        return f"{host.rstrip('/')}|{username}"
+
+    def _read(self) -> Dict:
+        try:
+            info = os.stat(self.path)
+        except FileNotFoundError:
+            return {}
+        if info.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+            # Never trust a token file that other users can read or tamper with
+            return {}
+        if hasattr(os, "getuid") and info.st_uid != os.getuid():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def load(self, key: str) -> Optional[str]:
+        """
+        Load a token.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str: The cached token, or None.
+        """
+        with self._lock:
+            token = self._read().get(key)
+        return token if isinstance(token, str) else None
+
+    def _write(self, data: Dict):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".pyavrio-token-")
+        try:
+            os.chmod(temp_path, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def save(self, key: str, token: str):
+        """
+        Store a token, creating the file with mode 0600.
+
+        Args:
+            key (str): The cache key.
+            token (str): The access token.
+        """
+        with self._lock:
+            data = self._read()
+            data[key] = token
+            self._write(data)
+
+    def delete(self, key: str):
+        """Remove a token from the cache."""
+        with self._lock:
+            data = self._read()
+            if data.pop(key, None) is not None:
+                self._write(data)
+
+
+class TokenManager:
+    """
+    Keeps an access token valid by signing in again before it expires.
+
+    Attributes:
+        refresh_margin (float): Seconds before expiry at which the token is refreshed.
+    """
+
+    def __init__(self, fetch: Callable[[], str], token: str = None, refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+                 cache: TokenFileCache = None, cache_key: str = None, clock: Callable[[], float] = time.time):
+        """
+        Initialize the manager.
+
+        Args:
+            fetch (callable): Signs in and returns a new access token.
+            token (str, optional): An access token obtained already.
+            refresh_margin (float): Seconds before expiry at which the token is refreshed.
+            cache (TokenFileCache, optional): On-disk cache consulted before signing in.
+            cache_key (str, optional): Key of this token in the cache.
+            clock (callable): Wall clock returning UNIX timestamps.
+        """
+        self.refresh_margin = refresh_margin
+        self.refresh_count = 0
+        self._fetch = fetch
+        self._cache = cache
+        self._cache_key = cache_key
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._current = (None, None)  # (token, expiry) replaced as a whole for lock-free reads
+        if token is not None:
+            self._set(token)
+
+    @property
+    def token(self) -> Optional[str]:
+        """Get the current token without refreshing it."""
+        return self._current[0]
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """Get the expiry of the current token as a UNIX timestamp."""
+        return self._current[1]
+
+    def _set(self, token: str):
+        self._current = (token, token_expiry(token))
+
+    def _is_usable(self, current, margin: float) -> bool:
+        token, expires_at = current
+        if token is None:
+            return False
+        return expires_at is None or self._clock() < expires_at - margin
+
+    def get_token(self) -> str:
+        """
+        Get a valid access token, refreshing it if it is about to expire.
+
+        While a token is still valid but inside the refresh margin, only one caller
+        refreshes it and the others keep using the current token. Once it has
+        expired, every caller waits for that single refresh.
+
+        Returns:
+            str: The access token.
+        """
+        current = self._current
+        if self._is_usable(current, self.refresh_margin):
+            return current[0]
+
+        if self._is_usable(current, 0):
+            # Still valid: refresh proactively unless someone else already is
+            if not self._lock.acquire(blocking=False):
+                return current[0]
+        else:
+            self._lock.acquire()
+        try:
+            if not self._is_usable(self._current, self.refresh_margin):
+                self._refresh()
+            return self._current[0]
+        finally:
+            self._lock.release()
+
+    def _refresh(self):
+        if self._cache is not None and self._cache_key is not None:
+            cached = self._cache.load(self._cache_key)
+            if cached is not None and cached != self._current[0]:
+                candidate = (cached, token_expiry(cached))
+                if self._is_usable(candidate, self.refresh_margin):
+                    self._current = candidate
+                    return
+
+        self._set(self._fetch())
+        self.refresh_count += 1
+        if self._cache is not None and self._cache_key is not None:
+            self._cache.save(self._cache_key, self._current[0])
+
+    def invalidate(self):
+        """Forget the current token so that the next call signs in again."""
+        with self._lock:
+            token = self._current[0]
+            if self._cache is not None and self._cache_key is not None and token is not None:
+                if self._cache.load(self._cache_key) == token:
+                    self._cache.delete(self._cache_key)
+            self._current = (None, None)
@@ -0,0 +1,306 @@
+"""
+HTTP transport layer for PyAvrio Scheduler
+
+A transport sends every authentication and scheduler request of a `Session`.
+BaseTransport defines the interface and the behaviour shared by all backends:
+it optionally applies a RetryPolicy and a per-host CircuitBreaker to every
+request and reports each attempt to an Instrumentation. A backend only sends
+one HTTP exchange and returns it as a `requests.Response`, raising
+`requests.exceptions` errors, so callers do not depend on the HTTP library.
+
+Two backends are available, selected by name with `create_transport`:
+
+- "requests": Transport, the default, owns a pooled, keep-alive `requests.Session`
+  so that calls reuse the same TCP/TLS connections instead of opening a new one
+  per request. HTTP/1.1 still needs one connection per concurrent request.
+- "http2": HTTP2Transport, from `pyavrio_scheduler.http2`, multiplexes concurrent
+  calls over a single HTTP/2 connection per host.
+
+JSON bodies are encoded and decoded with the fastest installed JsonCodec, and
+compressed responses are requested with `Accept-Encoding` and decoded on the fly.
+"""
+import json
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from .codec import JsonCodec, get_codec
+from .instrumentation import Instrumentation
+from .resilience import CircuitBreaker, RetryPolicy
+
+DEFAULT_POOL_CONNECTIONS = 10  # Number of distinct hosts kept in the pool
+DEFAULT_POOL_MAXSIZE = 10  # Number of connections kept per host
+DEFAULT_TIMEOUT = (10.0, 60.0)  # (connect, read) timeout in seconds
+DEFAULT_BACKEND = "requests"  # Backend created by `create_transport` when none is named
+
+# Raised by `decode`, as `Response.json` does since requests 2.27; a ValueError either way
+JSONDecodeError = getattr(requests.exceptions, "JSONDecodeError", json.JSONDecodeError)
+
+
+class BaseTransport:
+    """
+    The HTTP transport interface shared by `Authentication` and `Scheduler`.
+
+    Backends implement `_send_request`, which sends one HTTP exchange, and `close`.
+
+    Attributes:
+        timeout (float or tuple): Default timeout applied to every request.
+        keep_alive (bool): Whether connections are kept open between requests.
+        retry_policy (RetryPolicy): When failed requests are retried, None disables retries.
+        circuit_breaker (CircuitBreaker): Per-host breaker, None disables circuit breaking.
+        instrumentation (Instrumentation): Collects request metrics, None disables collection.
+        codec (JsonCodec): Encodes `json` request bodies and decodes responses in `decode`.
+        compression (bool): Whether compressed responses are requested.
+        retry_count (int): Number of retries sent so far.
+    """
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOL_MAXSIZE, keep_alive: bool = True,
+                 timeout=DEFAULT_TIMEOUT, retry_policy: RetryPolicy = None,
+                 circuit_breaker: CircuitBreaker = None, instrumentation: Instrumentation = None,
+                 codec: JsonCodec = None, compression: bool = True):
+        """
+        Initialize the settings shared by every backend.
+
+        Args:
+            pool_maxsize (int): Maximum number of requests sent to one host at once.
+            keep_alive (bool): Reuse connections between requests when True.
+            timeout (float or tuple): Default (connect, read) timeout in seconds.
+            retry_policy (RetryPolicy, optional): Retry failed requests according to this policy.
+            circuit_breaker (CircuitBreaker, optional): Fail fast while a host keeps failing.
+            instrumentation (Instrumentation, optional): Collect latency, size and retry metrics.
+            codec (JsonCodec, optional): The JSON codec. Defaults to the fastest one installed.
+            compression (bool): Ask for compressed responses.
+        """
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.instrumentation = instrumentation
+        self.codec = codec if codec is not None else get_codec()
+        self.compression = compression
+        self.retry_count = 0
+        self._retry_lock = threading.Lock()
+        self._pool_maxsize = pool_maxsize
+
+    @property
+    def pool_maxsize(self) -> int:
+        """Get the maximum number of requests sent to one host at once."""
+        return self._pool_maxsize
+
+    def post(self, url: str, idempotent: bool = True, **kwargs) -> requests.Response:
+        """
+        Send a POST request.
+
+        Args:
+            url (str): The full URL to post to.
+            idempotent (bool): Whether the request can safely be sent twice.
+            **kwargs: `headers`, `json`, `data`, `params`, `stream` or `timeout`, as
+                accepted by `requests.Session.post`.
+
+        Returns:
+            requests.Response: The response returned by the server.
+        """
+        return self.request("POST", url, idempotent=idempotent, **kwargs)
+
+    def request(self, method: str, url: str, idempotent: bool = True, **kwargs) -> requests.Response:
+        """
+        Send a request, applying the default timeout, the retry policy and the
+        circuit breaker.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The full URL of the request.
+            idempotent (bool): Whether the request can safely be sent twice. Requests that
+                are not idempotent are only retried if the retry policy allows it.
+            **kwargs: `headers`, `json`, `data`, `params`, `stream` or `timeout`, as
+                accepted by `requests.Session.request`.
+
+        Returns:
+            requests.Response: The last response returned by the server.
+
+        Raises:
+            CircuitOpenError: If the circuit of the host is open.
+            requests.exceptions.RequestException: If the last attempt failed to connect.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if kwargs.get("json") is not None:
+            kwargs["data"] = self.codec.dumps(kwargs.pop("json"))
+            headers = dict(kwargs.get("headers") or {})
+            headers.setdefault("Content-Type", "application/json")
+            kwargs["headers"] = headers
+        policy, breaker = self.retry_policy, self.circuit_breaker
+        if policy is None and breaker is None:
+            return self._send(method, url, 1, kwargs)
+
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker is not None:
+                breaker.before_request(host)
+            try:
+                response = self._send(method, url, attempt, kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if breaker is not None:
+                    breaker.record_failure(host)
+                if policy is None or not policy.allows(attempt, idempotent):
+                    raise
+                delay = policy.backoff(attempt)
+            except Exception:
+                # Release a half-open probe slot whatever went wrong; only connection errors are retried
+                if breaker is not None:
+                    breaker.record_failure(host)
+                raise
+            else:
+                if breaker is not None:
+                    if response.status_code >= 500:
+                        breaker.record_failure(host)
+                    else:
+                        breaker.record_success(host)
+                if (policy is None or response.status_code not in policy.retry_statuses
+                        or not policy.allows(attempt, idempotent)):
+                    return response
+                delay = policy.delay_for(attempt, response)
+                if delay is None:
+                    return response
+                response.close()
+
+            with self._retry_lock:
+                self.retry_count += 1
+            if self.instrumentation is not None:
+                self.instrumentation.record_retry(url)
+            policy.sleep(delay)
+
+    def _send(self, method: str, url: str, attempt: int, kwargs) -> requests.Response:
+        """Send one attempt, reporting it to the instrumentation when enabled."""
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return self._send_request(method, url, kwargs)
+
+        event = instrumentation.request_started(method, url, attempt)
+        try:
+            response = self._send_request(method, url, kwargs)
+        except Exception as e:
+            instrumentation.request_finished(event, error=e)
+            raise
+        instrumentation.request_finished(event, response, streamed=bool(kwargs.get("stream")))
+        return response
+
+    def _send_request(self, method: str, url: str, kwargs) -> requests.Response:
+        """
+        Send one HTTP exchange.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The full URL of the request.
+            kwargs (dict): The request options, with `json` already encoded into `data`.
+
+        Returns:
+            requests.Response: The response, with the body left unread when `stream` is set.
+
+        Raises:
+            requests.exceptions.RequestException: If no response was received.
+        """
+        raise NotImplementedError
+
+    def decode(self, response: requests.Response):
+        """
+        Decode the JSON body of a response with the transport codec.
+
+        Raises:
+            JSONDecodeError: If the body is not valid JSON. It is the `JSONDecodeError` that
+                `Response.json` raises in the installed version of requests, or the one of
+                the json module before requests 2.27; both are ValueErrors.
+        """
+        try:
+            return self.codec.loads(response.content)
+        except ValueError as e:
+            raise JSONDecodeError(str(e), response.text, 0) from e
+
+    def close(self):
+        """Close every connection held by the transport."""
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Transport(BaseTransport):
+    """
+    The default transport, sending requests over a pooled, keep-alive `requests.Session`.
+    """
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE, keep_alive: bool = True,
+                 timeout=DEFAULT_TIMEOUT, pool_block: bool = False,
+                 retry_policy: RetryPolicy = None, circuit_breaker: CircuitBreaker = None,
+                 instrumentation: Instrumentation = None, codec: JsonCodec = None,
+                 compression: bool = True):
+        """
+        Initialize the transport and its connection pools.
+
+        Args:
+            pool_connections (int): Number of per-host connection pools to cache.
+            pool_maxsize (int): Maximum number of connections kept open per host.
+            keep_alive (bool): Reuse connections between requests when True.
+            timeout (float or tuple): Default (connect, read) timeout in seconds.
+            pool_block (bool): Block when the per-host pool is exhausted instead of
+                opening a throw-away connection.
+            retry_policy (RetryPolicy, optional): Retry failed requests according to this policy.
+            circuit_breaker (CircuitBreaker, optional): Fail fast while a host keeps failing.
+            instrumentation (Instrumentation, optional): Collect latency, size and retry metrics.
+            codec (JsonCodec, optional): The JSON codec. Defaults to the fastest one installed.
+            compression (bool): Ask for compressed responses: gzip and deflate, and brotli
+                when the `brotli` package is installed to decode it.
+        """
+        super().__init__(pool_maxsize, keep_alive, timeout, retry_policy, circuit_breaker,
+                         instrumentation, codec, compression)
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              pool_block=pool_block)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # urllib3 lists the encodings it can decode, including br only when brotli is installed
+        self._session.headers["Accept-Encoding"] = ACCEPT_ENCODING if compression else "identity"
+
+        if not keep_alive:
+            # Ask the server to close the connection after every response
+            self._session.headers["Connection"] = "close"
+
+    def _send_request(self, method: str, url: str, kwargs) -> requests.Response:
+        return self._session.request(method, url, **kwargs)
+
+    def close(self):
+        """Close every pooled connection."""
+        self._session.close()
+
+
+def create_transport(backend: str = DEFAULT_BACKEND, **options) -> BaseTransport:
+    """
+    Create a transport by backend name.
+
+    Args:
+        backend (str): "requests" for the pooled HTTP/1.1 Transport, or "http2" for
+            HTTP2Transport, which needs the optional `httpx` and `h2` dependencies.
+        **options: Keyword arguments of the backend class, such as `retry_policy`.
+
+    Returns:
+        BaseTransport: The new transport.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend == "requests":
+        return Transport(**options)
+    if backend == "http2":
+        from .http2 import HTTP2Transport
+        return HTTP2Transport(**options)
+    raise ValueError(f"Unknown transport backend {backend!r}. Choose 'requests' or 'http2'.")
@@ -0,0 +1,166 @@
+"""
+User details cache for PyAvrio Scheduler
+
+Listing and triggering jobs needs the numeric ID of the signed-in user, which
+the user details endpoint returns for an email address. The UserDetailsCache
+class memoizes email -> user ID per host for a TTL, so signing in again, or
+opening several sessions for the same user, does not repeat the lookup.
+Concurrent lookups of the same user share one request.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict
+
+from .coalesce import SingleFlight
+
+DEFAULT_USER_DETAILS_TTL = 3600.0  # Seconds a user ID is reused before it is looked up again
+DEFAULT_MAX_USERS = 1024  # Users kept before the least recently used is evicted
+
+
+class UserDetailsCache:
+    """
+    A thread-safe TTL and LRU cache of user IDs, keyed by host and email.
+
+    Attributes:
+        ttl (float): Seconds a user ID is fresh.
+        max_entries (int): Maximum number of users kept.
+        hits (int): Resolutions answered from the cache.
+        lookups (int): Resolutions that called the user details endpoint.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_USER_DETAILS_TTL, max_entries: int = DEFAULT_MAX_USERS,
+                 clock=time.monotonic):
+        """
+        Initialize an empty cache.
+
+        Args:
+            ttl (float): Seconds a user ID is reused without contacting the server.
+            max_entries (int): Maximum number of users kept.
+            clock (callable): Monotonic clock returning seconds.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer.")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.lookups = 0
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (user ID, expiry)
+        self._single_flight = SingleFlight()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(host: str, email: str) -> tuple:
+        """
+        Build the cache key of a user.
+
+        Args:
+            host (str): The host URL. A trailing slash is ignored.
+            email (str): The email address of the user. Case is ignored.
+
+        Returns:
+            tuple: The key.
+        """
+        return host.rstrip("/"), (email or "").lower()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, host: str, email: str):
+        """
+        Get the cached user ID of a user.
+
+        Returns:
+            The user ID, or None when it is not cached or has expired.
+        """
+        key = self.make_key(host, email)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._clock() >= entry[1]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def store(self, host: str, email: str, user_id):
+        """
+        Store the user ID of a user.
+
+        Args:
+            host (str): The host URL.
+            email (str): The email address of the user.
+            user_id: The user ID returned by the user details endpoint.
+        """
+        key = self.make_key(host, email)
+        with self._lock:
+            self._entries[key] = (user_id, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def resolve(self, host: str, email: str, lookup: Callable[[], object]):
+        """
+        Get the user ID of a user, looking it up when it is not cached.
+
+        Concurrent resolutions of the same user wait for a single lookup.
+
+        Args:
+            host (str): The host URL.
+            email (str): The email address of the user.
+            lookup (callable): Called without arguments to fetch the user ID.
+
+        Returns:
+            The user ID.
+
+        Raises:
+            Exception: Whatever the lookup raised. Failures are not cached.
+        """
+        user_id = self.get(host, email)
+        if user_id is not None:
+            with self._lock:
+                self.hits += 1
+            return user_id
+
+        def fetch():
+            with self._lock:
+                self.lookups += 1
+            value = lookup()
+            self.store(host, email, value)
+            return value
+
+        return self._single_flight.do(self.make_key(host, email), fetch)
+
+    def invalidate(self, host: str = None, email: str = None) -> int:
+        """
+        Drop every entry matching the given host and email.
+
+        Arguments left as None match any value.
+
+        Returns:
+            int: The number of entries dropped.
+        """
+        host = host.rstrip("/") if host is not None else None
+        email = email.lower() if email is not None else None
+        with self._lock:
+            stale = [key for key in self._entries
+                     if (host is None or key[0] == host) and (email is None or key[1] == email)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: hits, lookups and the current size.
+        """
+        return {"hits": self.hits, "lookups": self.lookups, "size": len(self._entries)}
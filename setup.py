@@ -26,10 +26,17 @@ setup(
     install_requires=[
         "requests>=2.25.0",
     ],
+    extras_require={
+        "async": ["httpx>=0.23"],
+        "http2": ["httpx[http2]>=0.23"],
+    },
+    entry_points={
+        "console_scripts": ["pyavrio-scheduler=pyavrio_scheduler.cli:main"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
 )
\ No newline at end of file
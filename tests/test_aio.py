@@ -0,0 +1,97 @@
+import time
+import unittest
+from pyavrio_scheduler.aio import AsyncAuthentication, AsyncSession, httpx
+from pyavrio_scheduler.auth import AuthenticationError
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.scheduler import SchedulerError
+from pyavrio_scheduler.state import UserState
+from pyavrio_scheduler.testing import MockAvrioServer
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        UserState._instance = None
+        self.jobs = [{"jobId": i, "jobName": f"job_{i}"} for i in range(12)]
+        self.server = MockAvrioServer(jobs={"DSDQ": self.jobs}, user_id=7).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    async def authenticate(self):
+        return await AsyncAuthentication().authenticate({
+            "host": self.server.url,
+            "method": "password",
+            "username": "user@example.com",
+            "password": "secret",
+        })
+
+    async def test_authenticate_password_method(self):
+        """
+        Test that the async sign-in flow fills the user state.
+        """
+        async with await self.authenticate() as session:
+            self.assertIsInstance(session, AsyncSession)
+            self.assertEqual(session.user_state.email, "user@example.com")
+            self.assertEqual(session.user_state.user_id, 7)
+
+    async def test_authenticate_missing_host(self):
+        """
+        Test that parameter validation matches the blocking client.
+        """
+        auth = AsyncAuthentication()
+        with self.assertRaisesRegex(AuthenticationError, "Host must be specified."):
+            await auth.authenticate({"method": "password"})
+        await auth.client.aclose()
+
+    async def test_list_all_and_iter_jobs(self):
+        """
+        Test listing a single page and iterating over every page.
+        """
+        async with await self.authenticate() as session:
+            scheduler = session.get_scheduler()
+            self.assertEqual(await scheduler.list_all("data_quality"), self.jobs)
+            self.assertIsNone(await scheduler.list_all("invalid_topic"))
+
+            jobs = [job async for job in scheduler.iter_jobs("dsdq", page_size=5)]
+            self.assertEqual(jobs, self.jobs)
+
+            with self.assertRaises(SchedulerError):
+                async for _ in scheduler.iter_jobs("invalid_topic"):
+                    pass
+
+    async def test_trigger_many_concurrently(self):
+        """
+        Test that concurrent triggers overlap on one event loop.
+        """
+        async with await self.authenticate() as session:
+            scheduler = session.get_scheduler()
+            self.server.latency = 0.1
+            jobs = [(f"job_{i}", i, "sql_notebook") for i in range(50)]
+
+            started = time.perf_counter()
+            results = [result async for result in scheduler.trigger_many(jobs)]
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(results), 50)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertLess(elapsed, 50 * 0.1 / 2)
+        triggers = [payload for path, payload in self.server.requests
+                    if path == SchedulerEndpoints.TRIGGER_API]
+        self.assertTrue(all(payload["topic"] == "NOTEBOOK" for payload in triggers))
+
+    async def test_trigger_scheduler(self):
+        """
+        Test a single trigger and its failure path.
+        """
+        async with await self.authenticate() as session:
+            scheduler = session.get_scheduler()
+            response = await scheduler.trigger_scheduler("job_1", 1, "data_quality")
+            self.assertEqual(response["topic"], "DSDQ")
+
+            unreachable = AsyncSession("http://127.0.0.1:1", session.user_state, session.client)
+            self.assertIsNone(await unreachable.get_scheduler().trigger_scheduler("job_1", 1, "data_quality"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import bench_client  # noqa: E402
+import bench_codec  # noqa: E402
+import bench_memory  # noqa: E402
+from harness import percentile, summarize  # noqa: E402
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    def test_percentile_nearest_rank(self):
+        """
+        Test that percentiles use the nearest-rank method.
+        """
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile(values, 100), 100.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_summarize_reports_throughput(self):
+        """
+        Test that a summary reports milliseconds and operations per second.
+        """
+        result = summarize("x", [0.001, 0.002, 0.003, 0.004], elapsed=2.0, errors=1)
+        self.assertEqual(result["count"], 4)
+        self.assertEqual(result["errors"], 1)
+        self.assertEqual(result["p50_ms"], 2.0)
+        self.assertEqual(result["throughput_per_s"], 2.0)
+        self.assertGreater(result["peak_rss_mb"], 0)
+
+    def test_client_benchmark_smoke(self):
+        """
+        Test that the client benchmark runs every scenario against the server process.
+        """
+        args = bench_client.parse_args(["--jobs", "30", "--page-size", "10", "--triggers", "5",
+                                        "--workers", "2", "--iterations", "1"])
+        results = bench_client.run(args)
+
+        self.assertEqual([r["scenario"] for r in results], ["auth", "list_all", "iter_jobs", "iter_jobs_stream",
+                                                           "trigger_many"])
+        self.assertTrue(all(r["errors"] == 0 for r in results))
+        self.assertEqual(results[-1]["count"], 5)
+
+    def test_memory_benchmark_smoke(self):
+        """
+        Test that the memory benchmark compares dictionaries with Job records.
+        """
+        results = bench_memory.run(300)
+        self.assertEqual([r["representation"] for r in results], ["dict", "Job"])
+        self.assertLess(results[1]["retained_mb"], results[0]["retained_mb"])
+
+    def test_codec_benchmark_smoke(self):
+        """
+        Test that the codec benchmark decodes with every codec and measures compressed listings.
+        """
+        results = bench_codec.run(bench_codec.parse_args(["--jobs", "200", "--iterations", "2"]))
+        by_name = {r["scenario"]: r for r in results}
+
+        self.assertIn("decode_json", by_name)
+        self.assertTrue(all(r["errors"] == 0 for r in results))
+        self.assertLess(by_name["list_all_gzip_json"]["wire_bytes_per_call"],
+                        by_name["list_all_identity_json"]["wire_bytes_per_call"])
+
+
+if __name__ == '__main__':
+    unittest.main()
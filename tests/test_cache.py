@@ -0,0 +1,148 @@
+import unittest
+from pyavrio_scheduler.cache import ListingCache
+from pyavrio_scheduler.scheduler import Scheduler
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import UserState
+from pyavrio_scheduler.testing import MockAvrioServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestListingCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ListingCache(ttl=10, max_entries=2, clock=self.clock)
+
+    def test_key_ignores_trailing_slash_and_filter_order(self):
+        """
+        Test that equivalent listings share one key.
+        """
+        key_1 = ListingCache.make_key("https://host/", 1, "DSDQ", {"a": [1, 2], "b": "x"})
+        key_2 = ListingCache.make_key("https://host", 1, "DSDQ", {"b": "x", "a": [1, 2]})
+        self.assertEqual(key_1, key_2)
+
+    def test_ttl_expiry(self):
+        """
+        Test that entries are fresh until the TTL elapses.
+        """
+        key = ListingCache.make_key("h", 1, "DSDQ")
+        self.cache.store(key, [1], etag='"v1"')
+        self.assertTrue(self.cache.lookup(key)[1])
+
+        self.clock.now = 11
+        entry, fresh = self.cache.lookup(key)
+        self.assertFalse(fresh)
+        self.assertEqual(entry.conditional_headers(), {"If-None-Match": '"v1"'})
+
+        self.cache.revalidate(key)
+        self.assertTrue(self.cache.lookup(key)[1])
+        self.assertEqual(self.cache.stats()["not_modified"], 1)
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used entry is evicted.
+        """
+        keys = [ListingCache.make_key("h", 1, topic) for topic in ("A", "B", "C")]
+        self.cache.store(keys[0], [])
+        self.cache.store(keys[1], [])
+        self.cache.lookup(keys[0])
+        self.cache.store(keys[2], [])
+
+        self.assertIsNone(self.cache.lookup(keys[1])[0])
+        self.assertIsNotNone(self.cache.lookup(keys[0])[0])
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_invalidate(self):
+        """
+        Test that invalidation only drops matching entries.
+        """
+        self.cache.store(ListingCache.make_key("h", 1, "A"), [])
+        self.cache.store(ListingCache.make_key("h", 2, "A"), [])
+        self.assertEqual(self.cache.invalidate("h", 1), 1)
+        self.assertEqual(len(self.cache), 1)
+
+
+class TestSchedulerCache(unittest.TestCase):
+    def setUp(self):
+        UserState._instance = None
+        self.jobs = [{"jobId": 1, "jobName": "daily"}]
+        self.server = MockAvrioServer(jobs={"PYTHON_NOTEBOOK": self.jobs}).start()
+        user_state = UserState()
+        user_state.access_token = "mock_access_token"
+        user_state.user_id = 1
+        self.clock = FakeClock()
+        self.cache = ListingCache(ttl=10, clock=self.clock)
+        self.session = Session(self.server.url, user_state)
+        self.scheduler = Scheduler(self.session, cache=self.cache)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def test_fresh_listing_served_from_cache(self):
+        """
+        Test that repeated listings within the TTL are not downloaded again.
+        """
+        for _ in range(3):
+            self.assertEqual(self.scheduler.list_all("python_notebook"), self.jobs)
+
+        self.assertEqual(self.server.request_count, 1)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_expired_listing_revalidated(self):
+        """
+        Test that an expired listing is revalidated with a conditional request.
+        """
+        self.scheduler.list_all("python_notebook")
+        self.clock.now = 20
+        self.assertEqual(self.scheduler.list_all("python_notebook"), self.jobs)
+
+        self.assertEqual(self.cache.not_modified, 1)
+        self.assertEqual(self.server.request_count, 2)
+
+        self.server.jobs["PYTHON_NOTEBOOK"].append({"jobId": 2, "jobName": "weekly"})
+        self.clock.now = 40
+        self.assertEqual(len(self.scheduler.list_all("python_notebook")), 2)
+        self.assertEqual(self.cache.not_modified, 1)
+
+    def test_trigger_invalidates_listing(self):
+        """
+        Test that triggering a job drops the cached listing of its topic.
+        """
+        self.scheduler.list_all("python_notebook")
+        self.scheduler.trigger_scheduler("daily", 1, "python_notebook")
+        self.scheduler.list_all("python_notebook")
+
+        self.assertEqual(self.cache.stats()["hits"], 0)
+        self.assertEqual(self.server.request_count, 3)
+
+    def test_invalidation_during_revalidation(self):
+        """
+        Test that a 304 arriving after the listing was invalidated is not served from the stale entry.
+        """
+        self.scheduler.list_all("python_notebook")
+        self.clock.now = 20
+        post_list = self.scheduler._post_list
+
+        def triggered_in_flight(*args, **kwargs):
+            response = post_list(*args, **kwargs)
+            if response.status_code == 304:
+                self.server.set_status(1, "RUNNING")
+                self.scheduler.invalidate_cache("python_notebook")
+            return response
+
+        self.scheduler._post_list = triggered_in_flight
+        jobs = self.scheduler.list_all("python_notebook")
+        self.assertEqual(jobs, [{"jobId": 1, "jobName": "daily", "status": "RUNNING"}])
+        self.assertEqual(self.cache.not_modified, 0)
+        self.assertEqual(self.server.request_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import threading
+import unittest
+from pyavrio_scheduler.catalog import JobCatalog
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.scheduler import Scheduler, SchedulerError
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import UserState
+from pyavrio_scheduler.testing import MockAvrioServer
+
+
+def job(job_id, name, status="SUCCESS"):
+    return {"jobId": job_id, "jobName": name, "status": status}
+
+
+class TestJobCatalog(unittest.TestCase):
+    def setUp(self):
+        self.catalog = JobCatalog()
+        self.catalog.update("PYTHON_NOTEBOOK", [job(1, "daily_sales"), job(2, "daily_costs", "FAILED")])
+        self.catalog.update("DSDQ", [job(1, "weekly_dq")])
+
+    def test_lookups(self):
+        """
+        Test lookups by ID, name, prefix, topic and status.
+        """
+        self.assertEqual(self.catalog.get(2)["jobName"], "daily_costs")
+        self.assertEqual(self.catalog.get(1, "DSDQ")["jobName"], "weekly_dq")
+        self.assertEqual(self.catalog.find_by_name("weekly_dq")["jobId"], 1)
+        self.assertIsNone(self.catalog.find_by_name("missing"))
+        self.assertEqual([j["jobName"] for j in self.catalog.with_prefix("daily_")],
+                         ["daily_costs", "daily_sales"])
+        self.assertEqual(len(self.catalog.by_topic("PYTHON_NOTEBOOK")), 2)
+        self.assertEqual([j["jobId"] for j in self.catalog.by_status("FAILED")], [2])
+
+    def test_ambiguous_id(self):
+        """
+        Test that an ID shared across topics needs a topic.
+        """
+        with self.assertRaises(LookupError):
+            self.catalog.get(1)
+
+    def test_incremental_update(self):
+        """
+        Test that an update only touches added, changed and removed jobs.
+        """
+        counts = self.catalog.update("PYTHON_NOTEBOOK", [job(1, "daily_sales", "RUNNING"), job(3, "monthly")])
+
+        self.assertEqual(counts, {"added": 1, "changed": 1, "removed": 1})
+        self.assertIsNone(self.catalog.find_by_name("daily_costs"))
+        self.assertEqual(self.catalog.by_status("FAILED"), [])
+        self.assertEqual([j["jobName"] for j in self.catalog.with_prefix("m")], ["monthly"])
+        self.assertEqual(len(self.catalog), 3)
+
+    def test_reads_during_updates(self):
+        """
+        Test that lookups running alongside updates see whole listings and never fail.
+        """
+        listings = [[job(n, f"job_{n}", status) for n in range(500)] for status in ("RUNNING", "SUCCESS")]
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            try:
+                while not stop.is_set():
+                    self.assertIn(len(self.catalog.by_topic("SQL_NOTEBOOK")), (0, 500))
+                    self.assertIn(len(self.catalog.by_status("RUNNING")), (0, 500))
+                    self.catalog.find_by_name("job_7", "SQL_NOTEBOOK")
+                    self.catalog.get(7, "SQL_NOTEBOOK")
+            except Exception as error:
+                errors.append(error)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for n in range(50):
+            self.catalog.update("SQL_NOTEBOOK", listings[n % 2])
+        stop.set()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(errors, [])
+
+
+class TestSchedulerCatalog(unittest.TestCase):
+    def setUp(self):
+        UserState._instance = None
+        self.server = MockAvrioServer(jobs={
+            "SQL_NOTEBOOK": [job(i, f"report_{i}") for i in range(30)],
+            "DSDQ": [job(100, "dq_check")],
+        }).start()
+        user_state = UserState()
+        user_state.access_token = "mock_access_token"
+        user_state.user_id = 1
+        self.session = Session(self.server.url, user_state)
+        self.scheduler = Scheduler(self.session, catalog=JobCatalog())
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def test_trigger_by_name_without_list_call(self):
+        """
+        Test that a refreshed catalog lets jobs be triggered by name only.
+        """
+        result = self.scheduler.catalog.refresh(self.scheduler, page_size=10)
+        self.assertEqual(result["SQL_NOTEBOOK"]["added"], 30)
+        requests_before = self.server.request_count
+
+        response = self.scheduler.trigger_scheduler("report_7")
+        self.scheduler.trigger_scheduler("dq_check")
+
+        self.assertEqual(response["jobId"], 7)
+        self.assertEqual(self.server.request_count, requests_before + 2)
+        triggers = [payload for path, payload in self.server.requests
+                    if path == SchedulerEndpoints.TRIGGER_API]
+        self.assertEqual([(p["jobId"], p["topic"]) for p in triggers], [(7, "NOTEBOOK"), (100, "DSDQ")])
+
+    def test_trigger_unknown_name(self):
+        """
+        Test that an unknown name or a missing catalog raises SchedulerError.
+        """
+        with self.assertRaises(SchedulerError):
+            self.scheduler.trigger_scheduler("missing")
+        with self.assertRaises(SchedulerError):
+            Scheduler(self.session).trigger_scheduler("report_7")
+
+
+if __name__ == "__main__":
+    unittest.main()
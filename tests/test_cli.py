@@ -0,0 +1,184 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pyavrio_scheduler import cli
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.testing import MockAvrioServer, make_jobs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run_python(code: str) -> str:
+    """Run code in a fresh interpreter and return its standard output."""
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_package_import_does_not_load_requests(self):
+        """
+        Test that importing the package loads none of the HTTP stack.
+        """
+        output = _run_python("import sys, pyavrio_scheduler; "
+                             "print(sorted(m for m in ('requests', 'urllib3', 'pyavrio_scheduler.auth') "
+                             "if m in sys.modules))")
+        self.assertEqual(output.strip(), "[]")
+
+    def test_help_does_not_load_requests(self):
+        """
+        Test that `--help` of every command runs without importing requests.
+        """
+        output = _run_python(
+            "import contextlib, io, sys\n"
+            "from pyavrio_scheduler import cli\n"
+            "for argv in (['--help'], ['list', '--help'], ['bulk-trigger', '--help']):\n"
+            "    with contextlib.redirect_stdout(io.StringIO()):\n"
+            "        try:\n"
+            "            cli.main(argv)\n"
+            "        except SystemExit:\n"
+            "            pass\n"
+            "print('requests' in sys.modules)")
+        self.assertEqual(output.strip(), "False")
+
+    def test_lazy_attributes(self):
+        """
+        Test that the public classes are still importable from the package.
+        """
+        import pyavrio_scheduler
+        from pyavrio_scheduler.scheduler import Scheduler
+
+        self.assertIs(pyavrio_scheduler.Scheduler, Scheduler)
+        self.assertIn("Authentication", dir(pyavrio_scheduler))
+        with self.assertRaises(AttributeError):
+            pyavrio_scheduler.Missing
+
+
+class TestCommands(unittest.TestCase):
+    def setUp(self):
+        jobs = {"PYTHON_NOTEBOOK": make_jobs(5), "SQL_NOTEBOOK": make_jobs(3, "SQL_NOTEBOOK")}
+        self.server = MockAvrioServer(jobs=jobs).start()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.directory.name, "tokens.json")
+        self.env = patch.dict(os.environ, {"PYAVRIO_HOST": self.server.url, "PYAVRIO_USERNAME": "user@example.com",
+                                           "PYAVRIO_PASSWORD": "secret", "PYAVRIO_TOKEN_CACHE": self.cache})
+        self.env.start()
+        os.environ.pop("PYAVRIO_ACCESS_TOKEN", None)
+
+    def tearDown(self):
+        self.env.stop()
+        self.server.stop()
+        self.directory.cleanup()
+
+    def run_cli(self, *argv, stdin: str = None):
+        stdout = io.StringIO()
+        with patch("sys.stdin", io.StringIO(stdin or "")):
+            status = cli.main(list(argv), stdout=stdout)
+        return status, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def paths(self):
+        return [path for path, _ in self.server.requests]
+
+    def test_auth_caches_the_token(self):
+        """
+        Test that `auth` signs in once and later commands reuse the cached token without the password.
+        """
+        status, lines = self.run_cli("auth")
+        self.assertEqual(status, 0)
+        self.assertEqual(lines[0]["email"], "user@example.com")
+        self.assertEqual(lines[0]["userId"], 1)
+        self.assertTrue(os.path.exists(self.cache))
+
+        os.environ.pop("PYAVRIO_PASSWORD")
+        status, lines = self.run_cli("list", "python_notebook")
+        self.assertEqual(status, 0)
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(self.paths().count(SchedulerEndpoints.TOKEN_ENDPOINT), 1)
+
+    def test_missing_credentials_is_a_usage_error(self):
+        """
+        Test that a run without a cached token or password exits with status 2.
+        """
+        os.environ.pop("PYAVRIO_PASSWORD")
+        with patch("sys.stderr", io.StringIO()) as stderr, self.assertRaises(SystemExit) as raised:
+            self.run_cli("list")
+        self.assertEqual(raised.exception.code, 2)
+        self.assertIn("No valid cached token", stderr.getvalue())
+
+    def test_non_positive_numbers_are_usage_errors(self):
+        """
+        Test that zero, negative and non-finite numeric options are rejected before anything is sent.
+        """
+        for option, value in (("--rate-limit", "0"), ("--rate-limit", "-5"), ("--rate-limit", "nan"),
+                              ("--workers", "0"), ("--page-size", "-1")):
+            command = "list" if option == "--page-size" else "bulk-trigger"
+            with self.subTest(option=option, value=value), patch("sys.stderr", io.StringIO()) as stderr, \
+                    self.assertRaises(SystemExit) as raised:
+                self.run_cli(command, option, value)
+            self.assertEqual(raised.exception.code, 2)
+            self.assertIn("is not a positive", stderr.getvalue())
+        self.assertEqual(self.server.request_count, 0)
+
+    def test_list_writes_json_lines_with_filters(self):
+        """
+        Test that `list` writes one job per line and sends the filters to the server.
+        """
+        status, lines = self.run_cli("list", "--status", "FAILED", "--page-size", "2")
+        self.assertEqual(status, 0)
+        self.assertEqual({line["status"] for line in lines}, {"FAILED"})
+        self.assertEqual({line["topic"] for line in lines}, {"PYTHON_NOTEBOOK", "SQL_NOTEBOOK"})
+        payloads = [payload for path, payload in self.server.requests if path == SchedulerEndpoints.LIST_API]
+        self.assertTrue(all(payload["statusFilter"] == ["FAILED"] for payload in payloads))
+
+    def test_trigger(self):
+        """
+        Test that `trigger` prints the trigger response.
+        """
+        status, lines = self.run_cli("trigger", "job_a", "--id", "7", "--topic", "sql_notebook")
+        self.assertEqual(status, 0)
+        self.assertEqual(lines, [{"jobId": 7, "jobName": "job_a", "topic": "NOTEBOOK", "status": "TRIGGERED"}])
+
+    def test_bulk_trigger_from_listing_on_stdin(self):
+        """
+        Test that the output of `list` can be piped into `bulk-trigger`.
+        """
+        _, listed = self.run_cli("list", "python_notebook")
+        stdin = "\n".join(json.dumps(job) for job in listed) + "\n\n"
+        status, lines = self.run_cli("bulk-trigger", "--workers", "2", stdin=stdin)
+
+        self.assertEqual(status, 0)
+        self.assertEqual(sorted(line["jobId"] for line in lines), [1, 2, 3, 4, 5])
+        self.assertTrue(all(line["ok"] and line["response"]["status"] == "TRIGGERED" for line in lines))
+
+    def test_bulk_trigger_from_csv_reports_failures(self):
+        """
+        Test that CSV input is accepted and a failed trigger sets exit status 1.
+        """
+        path = os.path.join(self.directory.name, "jobs.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("jobName,jobId,topic\njob_a,1,python_notebook\njob_b,2,python_notebook\n")
+        self.server.inject_error(SchedulerEndpoints.TRIGGER_API, 500)
+
+        status, lines = self.run_cli("bulk-trigger", path, "--workers", "1")
+        self.assertEqual(status, 1)
+        self.assertEqual([line["ok"] for line in lines], [False, True])
+        self.assertIn("500", lines[0]["error"])
+        self.assertEqual(lines[1]["jobId"], 2)
+
+    def test_bulk_trigger_rejects_incomplete_jobs(self):
+        """
+        Test that a job without an ID is reported before anything is triggered.
+        """
+        with patch("sys.stderr", io.StringIO()), self.assertRaises(SystemExit) as raised:
+            self.run_cli("bulk-trigger", stdin='{"jobName": "job_a", "topic": "sql_notebook"}\n')
+        self.assertEqual(raised.exception.code, 2)
+        self.assertNotIn(SchedulerEndpoints.TRIGGER_API, self.paths())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pyavrio_scheduler.coalesce import SingleFlight
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.scheduler import Scheduler
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer, make_jobs
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        """
+        Test that callers arriving while a call is in flight wait for it and get its result.
+        """
+        group = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        runs = []
+
+        def work():
+            runs.append(1)
+            started.set()
+            release.wait(5)
+            return ["result"]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(group.do, "key", work)
+            started.wait(5)
+            followers = [executor.submit(group.do, "key", work) for _ in range(3)]
+            while group.stats()["coalesced"] < 3:
+                time.sleep(0.001)
+            release.set()
+            results = [leader.result()] + [future.result() for future in followers]
+
+        self.assertEqual(len(runs), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(group.stats(), {"calls": 4, "executions": 1, "coalesced": 3, "in_flight": 0})
+
+    def test_errors_reach_every_caller_and_are_not_kept(self):
+        """
+        Test that a failure is raised in coalesced callers and the next call runs again.
+        """
+        group = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def fail():
+            started.set()
+            release.wait(5)
+            raise RuntimeError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(group.do, "key", fail)
+            started.wait(5)
+            follower = executor.submit(group.do, "key", fail)
+            while group.coalesced < 1:
+                time.sleep(0.001)
+            release.set()
+            for future in (leader, follower):
+                with self.assertRaises(RuntimeError):
+                    future.result()
+
+        self.assertEqual(group.do("key", lambda: "ok"), "ok")
+        self.assertEqual(group.executions, 2)
+
+    def test_different_keys_do_not_coalesce(self):
+        """
+        Test that sequential and distinct calls each run.
+        """
+        group = SingleFlight()
+        self.assertEqual([group.do(key, lambda key=key: key) for key in ("a", "b", "a")], ["a", "b", "a"])
+        self.assertEqual(group.coalesced, 0)
+        self.assertEqual(group.executions, 3)
+
+
+class TestListAllCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAvrioServer(jobs={"PYTHON_NOTEBOOK": make_jobs(50)}, latency=0.2).start()
+        self.session = Session(self.server.url, SessionState(access_token="token", user_id=1))
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def list_calls(self):
+        return [payload for path, payload in self.server.requests if path == SchedulerEndpoints.LIST_API]
+
+    def test_identical_calls_share_one_request(self):
+        """
+        Test that concurrent identical list_all calls send a single request.
+        """
+        scheduler = Scheduler(self.session)
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(lambda _: scheduler.list_all("python_notebook"), range(5)))
+
+        self.assertEqual(len(self.list_calls()), 1)
+        self.assertTrue(all(result is results[0] and len(result) == 50 for result in results))
+        self.assertEqual(scheduler.single_flight.stats()["coalesced"], 4)
+
+    def test_different_filters_are_not_coalesced(self):
+        """
+        Test that calls with different filters send their own requests.
+        """
+        scheduler = Scheduler(self.session)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            failed = executor.submit(scheduler.list_all, "python_notebook", status="FAILED")
+            everything = executor.submit(scheduler.list_all, "python_notebook")
+            self.assertEqual({job["status"] for job in failed.result()}, {"FAILED"})
+            self.assertEqual(len(everything.result()), 50)
+
+        self.assertEqual(len(self.list_calls()), 2)
+        self.assertEqual(scheduler.single_flight.coalesced, 0)
+
+    def test_shared_group_coalesces_across_schedulers(self):
+        """
+        Test that schedulers sharing a SingleFlight coalesce calls of the same user.
+        """
+        group = SingleFlight()
+        schedulers = [Scheduler(self.session, single_flight=group) for _ in range(3)]
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(lambda scheduler: scheduler.list_all("python_notebook"), schedulers))
+
+        self.assertEqual(len(self.list_calls()), 1)
+        self.assertTrue(all(len(result) == 50 for result in results))
+        self.assertEqual(group.coalesced, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import json
+import unittest
+
+import requests
+
+from pyavrio_scheduler.codec import available_codecs, get_codec
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.scheduler import Scheduler
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer, make_jobs
+from pyavrio_scheduler.transport import Transport
+
+# Documents on which JSON libraries are known to disagree
+DOCUMENTS = [
+    json.dumps({"content": make_jobs(50)}),
+    '{"big": 123456789012345678901234567890, "neg": -9223372036854775809}',
+    '{"nan": NaN, "inf": Infinity, "float": 0.1, "exp": 1e308, "tiny": 5e-324}',
+    '{"text": "caf\\u00e9 \\ud83d\\ude00 \\u0000", "raw": "café"}',
+    '{"dup": 1, "dup": 2, "nested": [[], {}, [null, true, false]]}',
+    '  [1, 2.50, -0.0, "x"]  ',
+]
+
+
+class TestCodecs(unittest.TestCase):
+    def test_stdlib_is_always_available(self):
+        """
+        Test that the standard library codec is the last resort and unknown codecs are refused.
+        """
+        self.assertEqual(available_codecs()[-1], "json")
+        self.assertEqual(get_codec().name, available_codecs()[0])
+        with self.assertRaises(ValueError):
+            get_codec("simdjson")
+
+    def test_decoding_is_identical_across_codecs(self):
+        """
+        Test that every installed codec decodes bytes and text exactly like json.
+        """
+        for name in available_codecs():
+            codec = get_codec(name)
+            for document in DOCUMENTS:
+                expected = json.loads(document)
+                for data in (document, document.encode("utf-8")):
+                    with self.subTest(codec=name, document=document[:30]):
+                        self.assertEqual(repr(codec.loads(data)), repr(expected))
+
+    def test_invalid_documents_raise_value_error(self):
+        """
+        Test that every codec rejects invalid JSON with a ValueError.
+        """
+        for name in available_codecs():
+            for document in ("", "{", "[1,]", "{'a': 1}"):
+                with self.subTest(codec=name, document=document), self.assertRaises(ValueError):
+                    get_codec(name).loads(document)
+
+    def test_encoding_round_trips_and_refuses_nan(self):
+        """
+        Test that encoded payloads decode to the original value and NaN is refused.
+        """
+        payload = {"userId": 2 ** 70, "topic": "NOTEBOOK", "name": "café", "filters": [1.5, None, True]}
+        for name in available_codecs():
+            codec = get_codec(name)
+            with self.subTest(codec=name):
+                encoded = codec.dumps(payload)
+                self.assertIsInstance(encoded, bytes)
+                self.assertEqual(json.loads(encoded), payload)
+                with self.assertRaises(ValueError):
+                    codec.dumps({"nested": [float("nan")]})
+
+
+class TestCompressedTransfer(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAvrioServer(jobs={"PYTHON_NOTEBOOK": make_jobs(200)}).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def list_jobs(self, **transport_options):
+        transport = Transport(**transport_options)
+        with Session(self.server.url, SessionState(access_token="token", user_id=1), transport) as session:
+            jobs = Scheduler(session).list_all("python_notebook")
+        sent, self.server.bytes_sent = self.server.bytes_sent, 0
+        return jobs, sent
+
+    def test_compressed_listing_is_identical_and_smaller(self):
+        """
+        Test that a gzipped listing decodes to the same jobs with a fraction of the bytes.
+        """
+        plain, plain_bytes = self.list_jobs(compression=False, codec=get_codec("json"))
+        for name in available_codecs():
+            with self.subTest(codec=name):
+                jobs, compressed_bytes = self.list_jobs(codec=get_codec(name))
+                self.assertEqual(jobs, plain)
+                self.assertLess(compressed_bytes * 4, plain_bytes)
+
+    def test_request_headers_and_body(self):
+        """
+        Test that compressed responses are requested and JSON bodies are encoded by the codec.
+        """
+        with Transport() as transport:
+            response = transport.post(self.server.url + SchedulerEndpoints.LIST_API, json={"topic": "DSDQ"})
+            self.assertIn("gzip", response.request.headers["Accept-Encoding"])
+            self.assertEqual(response.request.headers["Content-Type"], "application/json")
+            self.assertEqual(json.loads(response.request.body), {"topic": "DSDQ"})
+        with Transport(compression=False) as transport:
+            response = transport.post(self.server.url + SchedulerEndpoints.LIST_API, json={})
+            self.assertEqual(response.request.headers["Accept-Encoding"], "identity")
+
+    def test_decode_errors_match_response_json(self):
+        """
+        Test that an invalid body raises the same exception type as Response.json.
+        """
+        response = requests.Response()
+        response._content = b"<html>"
+        with self.assertRaises(ValueError) as expected:
+            response.json()
+        with Transport() as transport, self.assertRaises(type(expected.exception)):
+            transport.decode(response)
+
+
+if __name__ == "__main__":
+    unittest.main()
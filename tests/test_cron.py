@@ -0,0 +1,275 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from pyavrio_scheduler.cron import CronDispatcher, CronError, CronExpression, parse_cron
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.scheduler import Scheduler
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer
+
+
+def ts(text: str) -> float:
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp()
+
+
+def iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingScheduler:
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _trigger(self, name, job_id, topic):
+        with self._lock:
+            self.calls.append(job_id)
+        return {"jobId": job_id, "status": "TRIGGERED"}
+
+
+class TestCronExpression(unittest.TestCase):
+    def test_next_run(self):
+        """
+        Test steps, ranges, names, macros, seconds and the day of month or day of week rule.
+        """
+        cases = [
+            ("*/15 * * * *", "2024-01-01 00:07:30", "2024-01-01 00:15:00"),
+            ("0 9 * * MON-FRI", "2024-06-07 10:00:00", "2024-06-10 09:00:00"),
+            ("0 0 13 * FRI", "2024-01-01 00:00:00", "2024-01-05 00:00:00"),
+            ("0 0 29 2 *", "2024-03-01 00:00:00", "2028-02-29 00:00:00"),
+            ("30 23 31 * *", "2024-04-01 00:00:00", "2024-05-31 23:30:00"),
+            ("0 0 * * 7", "2024-01-01 00:00:00", "2024-01-07 00:00:00"),
+            ("5/20 * * * * *", "2024-01-01 00:00:45", "2024-01-01 00:01:05"),
+            ("@monthly", "2024-12-15 00:00:00", "2025-01-01 00:00:00"),
+            ("0 12 1 JAN,jul *", "2024-02-01 00:00:00", "2024-07-01 12:00:00"),
+        ]
+        for expression, after, expected in cases:
+            with self.subTest(expression=expression):
+                self.assertEqual(iso(CronExpression(expression).next_after(ts(after))), expected)
+
+    def test_runs_are_strictly_after(self):
+        """
+        Test that the next run of a run time is the following one.
+        """
+        cron = CronExpression("0 * * * *")
+        self.assertEqual(iso(cron.next_after(ts("2024-01-01 05:00:00"))), "2024-01-01 06:00:00")
+
+    def test_time_zone(self):
+        """
+        Test that expressions are evaluated in their time zone.
+        """
+        cron = CronExpression("0 9 * * *", tz=timezone(timedelta(hours=2)))
+        self.assertEqual(iso(cron.next_after(ts("2024-01-01 00:00:00"))), "2024-01-01 07:00:00")
+
+    def test_invalid_expressions(self):
+        """
+        Test that malformed expressions and impossible dates raise CronError.
+        """
+        for expression in ("* * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "5-1 * * * *", "0 0 * FOO *"):
+            with self.subTest(expression=expression), self.assertRaises(CronError):
+                CronExpression(expression)
+        with self.assertRaises(CronError):
+            CronExpression("0 0 30 2 *").next_after(0)
+
+    def test_parse_cron_shares_instances(self):
+        """
+        Test that identical expressions are parsed once.
+        """
+        self.assertIs(parse_cron("0 1 * * *"), parse_cron("0 1 * * *"))
+
+
+class TestCronDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(ts("2024-01-01 00:00:30"))
+        self.scheduler = RecordingScheduler()
+
+    def dispatcher(self, **options) -> CronDispatcher:
+        dispatcher = CronDispatcher(self.scheduler, clock=self.clock, seed=1, **options)
+        self.addCleanup(dispatcher.close)
+        return dispatcher
+
+    def run_at(self, dispatcher: CronDispatcher, text: str) -> int:
+        self.clock.now = ts(text)
+        fired = dispatcher.run_pending()
+        dispatcher.join()
+        return fired
+
+    def test_fires_when_due(self):
+        """
+        Test that a schedule fires at its run time and is queued for the next one.
+        """
+        dispatcher = self.dispatcher()
+        schedule_id = dispatcher.add("*/5 * * * *", ("job", 1, "python_notebook"))
+        self.assertEqual(iso(dispatcher.get(schedule_id).next_run), "2024-01-01 00:05:00")
+
+        self.assertEqual(self.run_at(dispatcher, "2024-01-01 00:04:59"), 0)
+        self.assertEqual(self.run_at(dispatcher, "2024-01-01 00:05:00"), 1)
+        self.assertEqual(self.scheduler.calls, [1])
+        self.assertEqual(iso(dispatcher.next_due()), "2024-01-01 00:10:00")
+        self.assertEqual(dispatcher.stats().succeeded, 1)
+
+    def test_misfires_and_coalescing(self):
+        """
+        Test that missed runs fire once when coalesced, and runs beyond the grace time are skipped.
+        """
+        coalescing = self.dispatcher(misfire_grace=30)
+        coalescing.add("* * * * *", {"jobName": "job", "jobId": 1, "topic": "dsdq"})
+        catching_up = self.dispatcher(misfire_grace=None, coalesce=False)
+        catching_up.add("* * * * *", ("job", 2, "dsdq"))
+        strict = self.dispatcher(misfire_grace=30, coalesce=False)
+        strict.add("* * * * *", ("job", 3, "dsdq"))
+
+        for dispatcher in (coalescing, catching_up, strict):
+            self.run_at(dispatcher, "2024-01-01 00:10:10")
+        self.assertEqual(self.scheduler.calls.count(1), 1)
+        self.assertEqual(coalescing.stats().coalesced, 9)
+        self.assertEqual(self.scheduler.calls.count(2), 10)
+        self.assertEqual(self.scheduler.calls.count(3), 1)
+        self.assertEqual(strict.stats().misfired, 9)
+
+        for dispatcher in (coalescing, catching_up, strict):
+            self.assertEqual(iso(dispatcher.next_due()), "2024-01-01 00:11:00")
+
+    def test_jitter(self):
+        """
+        Test that jitter delays every run by up to the given number of seconds.
+        """
+        dispatcher = self.dispatcher(jitter=20)
+        ids = [dispatcher.add("0 * * * *", ("job", n, "dsdq")) for n in range(50)]
+        offsets = [dispatcher.get(schedule_id).due - dispatcher.get(schedule_id).next_run for schedule_id in ids]
+        self.assertTrue(all(0 <= offset <= 20 for offset in offsets))
+        self.assertGreater(max(offsets) - min(offsets), 10)
+
+        early = self.run_at(dispatcher, "2024-01-01 01:00:10")
+        self.assertLess(early, 50)
+        self.assertEqual(self.run_at(dispatcher, "2024-01-01 01:00:20"), 50 - early)
+
+    def test_remove(self):
+        """
+        Test that a removed schedule does not fire.
+        """
+        dispatcher = self.dispatcher()
+        first = dispatcher.add("* * * * *", ("job", 1, "dsdq"))
+        dispatcher.add("* * * * *", ("job", 2, "dsdq"))
+        self.assertTrue(dispatcher.remove(first))
+        self.assertFalse(dispatcher.remove(first))
+        self.run_at(dispatcher, "2024-01-01 00:01:00")
+        self.assertEqual(self.scheduler.calls, [2])
+        self.assertEqual(len(dispatcher), 1)
+
+    def test_invalid_schedules(self):
+        """
+        Test that invalid expressions and job descriptions are refused when added.
+        """
+        dispatcher = self.dispatcher()
+        with self.assertRaises(CronError):
+            dispatcher.add("* *", ("job", 1, "dsdq"))
+        with self.assertRaises(ValueError):
+            dispatcher.add("* * * * *", {"jobName": "job"})
+
+    def test_trigger_errors_are_reported(self):
+        """
+        Test that trigger errors go to the error callback, or to the module logger without one.
+        """
+        def fail(name, job_id, topic):
+            raise KeyError(job_id)
+
+        self.scheduler._trigger = fail
+        errors = []
+        dispatcher = self.dispatcher(on_error=lambda job, error: errors.append((job, error)))
+        dispatcher.add("* * * * *", ("job", 1, "dsdq"))
+        self.run_at(dispatcher, "2024-01-01 00:01:00")
+        self.assertEqual([(job, type(error)) for job, error in errors], [(("job", 1, "dsdq"), KeyError)])
+        self.assertEqual(dispatcher.stats().failed, 1)
+
+        dispatcher = self.dispatcher()
+        dispatcher.add("* * * * *", ("job", 2, "dsdq"))
+        with self.assertLogs("pyavrio_scheduler.cron", "ERROR") as logs:
+            self.run_at(dispatcher, "2024-01-01 00:02:00")
+        self.assertIn("Error while triggering scheduler job", logs.output[0])
+
+    def test_ten_thousand_schedules(self):
+        """
+        Test that a day of 10,000 daily schedules fires each once with one heap entry per schedule.
+        """
+        dispatcher = self.dispatcher()
+        for n in range(10000):
+            dispatcher.add(f"{n % 60} {n // 60 % 24} * * *", ("job", n, "dsdq"))
+
+        started = time.perf_counter()
+        now = ts("2024-01-01 00:00:00")
+        for minute in range(1, 24 * 60 + 1):
+            self.clock.now = now + minute * 60
+            dispatcher.run_pending()
+        dispatcher.join()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(sorted(self.scheduler.calls), list(range(10000)))
+        self.assertEqual(len(dispatcher._heap), 10000)
+        self.assertLess(elapsed, 10)
+
+
+class TestCronDispatcherThread(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAvrioServer().start()
+        self.session = Session(self.server.url, SessionState(access_token="token", user_id=1))
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def test_triggers_on_time_over_the_session(self):
+        """
+        Test that the dispatcher thread triggers every-second schedules with sub-second accuracy.
+        """
+        with CronDispatcher(Scheduler(self.session)) as dispatcher:
+            for n in range(3):
+                dispatcher.add("* * * * * *", ("job", n, "python_notebook"))
+            time.sleep(1.6)
+        stats = dispatcher.stats()
+
+        triggers = [payload for path, payload in self.server.requests if path == SchedulerEndpoints.TRIGGER_API]
+        self.assertGreaterEqual(len(triggers), 3)
+        self.assertEqual(stats.succeeded, len(triggers))
+        self.assertLess(stats.max_lateness, 0.5)
+        self.assertLessEqual(self.server.connection_count, dispatcher.workers)
+
+    def test_http_errors_are_reported(self):
+        """
+        Test that failed and refused triggers reach the error callback with the request exception.
+        """
+        errors = []
+        self.server.inject_error(SchedulerEndpoints.TRIGGER_API, 503)
+        dispatcher = CronDispatcher(Scheduler(self.session), on_error=lambda job, error: errors.append(error))
+        self.addCleanup(dispatcher.close)
+        dispatcher._fire(("job", 1, "python_notebook"))
+        self.assertIsInstance(errors[0], requests.exceptions.HTTPError)
+        self.assertEqual(errors[0].response.status_code, 503)
+
+        url = self.server.url
+        self.server.stop()
+        session = Session(url, SessionState(access_token="token", user_id=1))
+        self.addCleanup(session.close)
+        with self.assertLogs("pyavrio_scheduler.cron", "ERROR") as logs:
+            refused = CronDispatcher(Scheduler(session))
+            self.addCleanup(refused.close)
+            refused._fire(("job", 2, "python_notebook"))
+        self.assertIn("Error while triggering scheduler job", logs.output[0])
+        self.assertEqual((dispatcher.stats().failed, refused.stats().failed), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from pyavrio_scheduler.dispatch import _SCHEMA, DONE, FAILED, IN_FLIGHT, PENDING, DispatchQueue
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.jobs import Job, JobType
+from pyavrio_scheduler.ratelimit import RateLimiter
+from pyavrio_scheduler.scheduler import Scheduler
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer
+from pyavrio_scheduler.transport import JSONDecodeError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _jobs(count: int, start: int = 0):
+    return [{"jobName": f"job_{i}", "jobId": i, "topic": "python_notebook"} for i in range(start, start + count)]
+
+
+class TestDispatchQueue(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAvrioServer().start()
+        self.session = Session(self.server.url, SessionState(access_token="token", user_id=1))
+        self.scheduler = Scheduler(self.session)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "dispatch.db")
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+        self.directory.cleanup()
+
+    def triggered(self):
+        return [payload["jobId"] for path, payload in self.server.requests if path == SchedulerEndpoints.TRIGGER_API]
+
+    def test_drains_the_queue_in_priority_order(self):
+        """
+        Test that one worker sends higher priorities first and equal priorities in queue order.
+        """
+        with DispatchQueue(self.scheduler, self.path, workers=1) as queue:
+            queue.put_many(_jobs(3))
+            queue.put({"jobName": "urgent", "jobId": 99, "topic": "sql_notebook"}, priority=10)
+            queue.put(Job(50, "record", JobType.DATA_QUALITY), priority=5)
+            stats = queue.run()
+
+            self.assertEqual(stats.sent, 5)
+            self.assertEqual(self.triggered(), [99, 50, 0, 1, 2])
+            self.assertEqual(queue.counts(), {PENDING: 0, IN_FLIGHT: 0, DONE: 5, FAILED: 0})
+            done = queue.items(DONE)
+            self.assertEqual(done[0].response["status"], "TRIGGERED")
+            self.assertEqual(done[4].topic, "dsdq")
+
+    def test_worker_pool_sends_every_item_once(self):
+        """
+        Test that concurrent workers do not claim the same item.
+        """
+        with DispatchQueue(self.scheduler, self.path, workers=8) as queue:
+            queue.put_many(_jobs(100))
+            self.assertEqual(queue.run().sent, 100)
+        self.assertEqual(sorted(self.triggered()), list(range(100)))
+
+    def test_rate_limit(self):
+        """
+        Test that the rate limiter is consulted before every trigger.
+        """
+        limiter = RateLimiter(1000, capacity=1)
+        taken = []
+        acquire = limiter.acquire
+        limiter.acquire = lambda tokens=1.0: (taken.append(tokens), acquire(tokens))
+        with DispatchQueue(self.scheduler, rate_limit=limiter, workers=2) as queue:
+            queue.put_many(_jobs(5))
+            queue.run()
+        self.assertEqual(len(taken), 5)
+
+    def test_transient_failures_are_retried(self):
+        """
+        Test that a 503 puts the item back and it is sent again after the delay.
+        """
+        self.server.inject_error(SchedulerEndpoints.TRIGGER_API, 503, times=2)
+        with DispatchQueue(self.scheduler, workers=1, retry_delay=0.01) as queue:
+            item_id = queue.put(_jobs(1)[0])
+            stats = queue.run(poll_interval=0.01)
+            item = queue.get(item_id)
+
+        self.assertEqual((stats.sent, stats.retried, stats.failed), (1, 2, 0))
+        self.assertEqual((item.state, item.attempts), (DONE, 3))
+
+    def test_client_errors_and_exhausted_attempts_fail(self):
+        """
+        Test that a 400 is not retried and a persistent 503 gives up after max_attempts.
+        """
+        with DispatchQueue(self.scheduler, workers=1, max_attempts=2, retry_delay=0.01) as queue:
+            self.server.inject_error(SchedulerEndpoints.TRIGGER_API, 400)
+            bad = queue.put(_jobs(1)[0])
+            queue.run(poll_interval=0.01)
+            self.assertEqual(queue.get(bad).state, FAILED)
+            self.assertEqual(queue.get(bad).attempts, 1)
+
+            self.server.inject_error(SchedulerEndpoints.TRIGGER_API, 503, times=2)
+            flaky = queue.put(_jobs(1, start=1)[0])
+            stats = queue.run(poll_interval=0.01)
+            self.assertEqual((stats.retried, stats.failed), (1, 1))
+            self.assertIn("503", queue.get(flaky).error)
+
+    def test_restart_resumes_unacknowledged_items(self):
+        """
+        Test that items claimed by a process that died are sent again once their lease expires.
+        """
+        clock = FakeClock()
+        queue = DispatchQueue(self.scheduler, self.path, workers=1, lease=60, clock=clock)
+        queue.put_many(_jobs(4))
+        claimed = queue._claim()
+        queue._ack(claimed, {"status": "TRIGGERED"})
+        queue._claim()  # The process dies before the response arrives
+        queue.close()
+
+        clock.now = 61
+        with DispatchQueue(self.scheduler, self.path, workers=2, lease=60, clock=clock) as queue:
+            self.assertEqual(queue.recovered, 1)
+            self.assertEqual(queue.run().sent, 3)
+            self.assertEqual(queue.counts()[DONE], 4)
+        self.assertEqual(sorted(self.triggered()), [1, 2, 3])
+
+    def test_leases_are_kept_while_another_queue_opens(self):
+        """
+        Test that opening a queue leaves items claimed by another connection alone until their lease expires.
+        """
+        clock = FakeClock()
+        first = DispatchQueue(self.scheduler, self.path, lease=60, clock=clock)
+        self.addCleanup(first.close)
+        item_id = first.put(_jobs(1)[0])
+        claimed = first._claim()
+
+        clock.now = 30
+        second = DispatchQueue(self.scheduler, self.path, lease=60, clock=clock)
+        self.addCleanup(second.close)
+        self.assertEqual(second.recovered, 0)
+        self.assertIsNone(second._claim())
+        self.assertEqual(second.counts()[IN_FLIGHT], 1)
+
+        clock.now = 61
+        taken_over = second._claim()
+        self.assertEqual((taken_over.item_id, taken_over.attempts), (item_id, 2))
+        first._ack(claimed, {"status": "LATE"})
+        self.assertEqual(second.get(item_id).state, IN_FLIGHT)
+        second._ack(taken_over, {"status": "TRIGGERED"})
+        self.assertEqual(first.get(item_id).response, {"status": "TRIGGERED"})
+
+    def test_databases_without_leases_are_upgraded(self):
+        """
+        Test that a database created before leases gains the column and requeues its items in flight.
+        """
+        connection = sqlite3.connect(self.path)
+        connection.executescript(_SCHEMA.replace("    claimed_at REAL,\n", ""))
+        connection.execute("INSERT INTO dispatch (host, job_name, job_id, topic, priority, state, available_at, "
+                           "enqueued_at) VALUES (?, 'old', '7', 'dsdq', 0, ?, 0, 0)", (self.server.url, IN_FLIGHT))
+        connection.commit()
+        connection.close()
+
+        with DispatchQueue(self.scheduler, self.path) as queue:
+            self.assertEqual(queue.recovered, 1)
+            self.assertEqual(queue.run().sent, 1)
+        self.assertEqual(self.triggered(), [7])
+
+    def test_connections_do_not_claim_the_same_item(self):
+        """
+        Test that claims made through separate connections to one database never overlap.
+        """
+        queues = [DispatchQueue(self.scheduler, self.path, workers=4) for _ in range(2)]
+        queues[0].put_many(_jobs(100))
+        runners = [threading.Thread(target=queue.run) for queue in queues]
+        for runner in runners:
+            runner.start()
+        for runner in runners:
+            runner.join()
+        self.assertEqual(queues[0].counts()[DONE], 100)
+        for queue in queues:
+            queue.close()
+        self.assertEqual(sorted(self.triggered()), list(range(100)))
+
+    def test_unreadable_response_is_acknowledged(self):
+        """
+        Test that a trigger accepted with a body that cannot be decoded is not marked failed.
+        """
+        trigger = self.scheduler._trigger
+
+        def accepted_without_json(*args):
+            trigger(*args)
+            raise JSONDecodeError("Expecting value", "<html>", 0)
+
+        self.scheduler._trigger = accepted_without_json
+        with DispatchQueue(self.scheduler, workers=1) as queue:
+            item_id = queue.put(_jobs(1)[0])
+            stats = queue.run()
+            item = queue.get(item_id)
+
+        self.assertEqual((stats.sent, stats.failed), (1, 0))
+        self.assertEqual((item.state, item.attempts, item.response), (DONE, 1, None))
+        self.assertIn("Expecting value", item.error)
+        self.assertEqual(self.triggered(), [0])
+
+    def test_stop_event(self):
+        """
+        Test that with a stop event the workers wait for new items until stopped.
+        """
+        stop = threading.Event()
+        with DispatchQueue(self.scheduler, workers=2) as queue:
+            runner = threading.Thread(target=queue.run, kwargs={"stop": stop, "poll_interval": 0.01})
+            runner.start()
+            queue.put_many(_jobs(3))
+            while queue.counts()[DONE] < 3:
+                stop.wait(0.01)
+            stop.set()
+            runner.join(5)
+            self.assertFalse(runner.is_alive())
+
+    def test_purge(self):
+        """
+        Test that acknowledged items can be deleted.
+        """
+        with DispatchQueue(self.scheduler) as queue:
+            queue.put_many(_jobs(2))
+            queue.run()
+            self.assertEqual(queue.purge(), 2)
+            self.assertEqual(queue.items(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
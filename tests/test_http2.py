@@ -0,0 +1,158 @@
+import socket
+import time
+import unittest
+
+import requests
+
+from pyavrio_scheduler.auth import Authentication
+from pyavrio_scheduler.cache import ListingCache
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.http2 import HTTP2Transport, httpx
+from pyavrio_scheduler.instrumentation import Instrumentation
+from pyavrio_scheduler.resilience import RetryPolicy
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioH2Server, MockAvrioServer, h2, make_jobs
+from pyavrio_scheduler.transport import Transport, create_transport
+
+JOBS = [{"jobName": f"job_{i}", "jobId": i, "topic": "python_notebook"} for i in range(48)]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@unittest.skipIf(httpx is None or h2 is None, "httpx and h2 are not installed")
+class TestHTTP2Transport(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAvrioH2Server(jobs={"PYTHON_NOTEBOOK": make_jobs(2500)}).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def session(self, **options) -> Session:
+        transport = HTTP2Transport(http1=False, **options)
+        return Session(self.server.url, SessionState(access_token="token", user_id=1), transport)
+
+    def test_list_and_trigger(self):
+        """
+        Test that listings, streamed listings and triggers work unchanged over HTTP/2.
+        """
+        with self.session() as session:
+            scheduler = session.get_scheduler()
+            self.assertEqual(scheduler.list_all("python_notebook"), make_jobs(1000))
+            self.assertEqual(list(scheduler.iter_jobs("python_notebook")), make_jobs(2500))
+            response = scheduler.trigger_scheduler("job", 7, "python_notebook")
+        self.assertEqual(response["status"], "TRIGGERED")
+        self.assertEqual(self.server.connection_count, 1)
+
+    def test_sign_in(self):
+        """
+        Test that Authentication signs in over the transport and hands it to the session.
+        """
+        transport = HTTP2Transport(http1=False)
+        session = Authentication(transport=transport).authenticate({
+            "host": self.server.url, "method": "password", "username": "user@example.com", "password": "pw",
+        })
+        with session:
+            self.assertIs(session.transport, transport)
+            self.assertEqual(session.user_state.user_id, 1)
+
+    def test_not_modified_listing(self):
+        """
+        Test that conditional listings are answered from the cache on 304.
+        """
+        with self.session() as session:
+            scheduler = session.get_scheduler(cache=ListingCache(ttl=0))
+            first = scheduler.list_all("python_notebook")
+            self.assertEqual(scheduler.list_all("python_notebook"), first)
+
+    def test_gzip_and_request_body(self):
+        """
+        Test that compressed responses are decoded and the request is exposed like requests does.
+        """
+        instrumentation = Instrumentation()
+        with self.session(instrumentation=instrumentation) as session:
+            response = session.transport.post(self.server.url + SchedulerEndpoints.LIST_API,
+                                               json={"topic": "PYTHON_NOTEBOOK"})
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertEqual(len(session.transport.decode(response)["content"]), 1000)
+            self.assertEqual(response.request.headers["Content-Type"], "application/json")
+            self.assertEqual(response.request.body, b'{"topic":"PYTHON_NOTEBOOK"}')
+        self.assertEqual(sum(instrumentation.bytes_received.values()), self.server.bytes_sent)
+
+    def test_errors_are_requests_exceptions(self):
+        """
+        Test that HTTP errors and refused connections raise requests exceptions, and are retried.
+        """
+        self.server.inject_error(SchedulerEndpoints.LIST_API, 503)
+        with self.session(retry_policy=RetryPolicy(sleep=lambda delay: None)) as session:
+            self.assertEqual(len(session.get_scheduler().list_all("python_notebook")), 1000)
+            self.assertEqual(session.transport.retry_count, 1)
+
+        self.server.inject_error(SchedulerEndpoints.TRIGGER_API, 400)
+        with self.session() as session:
+            response = session.transport.post(self.server.url + SchedulerEndpoints.TRIGGER_API, json={})
+            with self.assertRaises(requests.exceptions.HTTPError):
+                response.raise_for_status()
+
+        with HTTP2Transport(http1=False, timeout=1.0) as transport:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                transport.post(f"http://127.0.0.1:{free_port()}/", json={})
+
+
+@unittest.skipIf(httpx is None or h2 is None, "httpx and h2 are not installed")
+class TestMultiplexing(unittest.TestCase):
+    LATENCY = 0.05
+
+    def trigger_all(self, server, transport):
+        with Session(server.url, SessionState(access_token="token", user_id=1), transport) as session:
+            started = time.perf_counter()
+            results = list(session.get_scheduler().trigger_many(JOBS, max_workers=16))
+            elapsed = time.perf_counter() - started
+        self.assertTrue(all(result.ok for result in results))
+        return server.connection_count, elapsed
+
+    def test_concurrent_triggers_share_one_connection(self):
+        """
+        Test that HTTP/2 sends concurrent triggers over one socket where HTTP/1.1 opens one
+        per worker, with the same wall-clock time.
+        """
+        with MockAvrioServer(latency=self.LATENCY) as server:
+            http1_sockets, http1_elapsed = self.trigger_all(server, Transport(pool_maxsize=16))
+        with MockAvrioH2Server(latency=self.LATENCY) as server:
+            http2_sockets, http2_elapsed = self.trigger_all(server, HTTP2Transport(http1=False))
+
+        self.assertEqual(http2_sockets, 1)
+        self.assertGreaterEqual(http1_sockets, 8)
+        serial = len(JOBS) * self.LATENCY
+        self.assertLess(http2_elapsed, serial / 4)
+        self.assertLess(http2_elapsed, http1_elapsed * 3)
+
+
+class TestBackendSelection(unittest.TestCase):
+    def test_backend_names(self):
+        """
+        Test that Session and Authentication create their transport from a backend name.
+        """
+        session = Session("http://localhost", SessionState())
+        self.assertIsInstance(session.transport, Transport)
+        self.assertIsInstance(Authentication(transport="requests").transport, Transport)
+        with self.assertRaises(ValueError):
+            create_transport("spdy")
+
+    @unittest.skipIf(httpx is None or h2 is None, "httpx and h2 are not installed")
+    def test_http2_backend(self):
+        """
+        Test that the http2 backend name creates an HTTP2Transport with the given options.
+        """
+        with Session("http://localhost", SessionState(), "http2") as session:
+            self.assertIsInstance(session.transport, HTTP2Transport)
+        with create_transport("http2", max_concurrency=64) as transport:
+            self.assertEqual(transport.pool_maxsize, 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from pyavrio_scheduler.auth import Authentication
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.instrumentation import Histogram, Instrumentation, PrometheusExporter
+from pyavrio_scheduler.resilience import RetryPolicy
+from pyavrio_scheduler.testing import MockAvrioServer
+from pyavrio_scheduler.transport import Transport
+
+
+class TestHistogram(unittest.TestCase):
+    def test_cumulative_buckets(self):
+        """
+        Test that observations land in cumulative buckets.
+        """
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(), [(0.1, 2), (1.0, 3), (float("inf"), 4)])
+        self.assertAlmostEqual(histogram.sum, 3.65)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAvrioServer(jobs={"SQL_NOTEBOOK": [{"jobId": 1}]}).start()
+        self.instrumentation = Instrumentation()
+        self.transport = Transport(instrumentation=self.instrumentation,
+                                   retry_policy=RetryPolicy(sleep=lambda delay: None))
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def run_flow(self):
+        session = Authentication(transport=self.transport).authenticate({
+            "host": self.server.url, "method": "password",
+            "username": "user@example.com", "password": "secret"})
+        scheduler = session.get_scheduler()
+        scheduler.list_all("sql_notebook")
+        scheduler.trigger_scheduler("job", 1, "sql_notebook")
+
+    def test_hooks_and_metrics(self):
+        """
+        Test that auth, list and trigger calls are measured and passed to hooks.
+        """
+        started, finished = [], []
+        self.instrumentation.add_pre_request_hook(lambda event: started.append(event.endpoint))
+        self.instrumentation.add_post_request_hook(finished.append)
+        self.server.inject_error(SchedulerEndpoints.LIST_API, 503)
+
+        self.run_flow()
+
+        endpoints = [SchedulerEndpoints.TOKEN_ENDPOINT, SchedulerEndpoints.USER_DETAILS,
+                     SchedulerEndpoints.LIST_API, SchedulerEndpoints.LIST_API, SchedulerEndpoints.TRIGGER_API]
+        self.assertEqual(started, endpoints)
+        self.assertEqual([event.status for event in finished], ["200", "200", "503", "200", "200"])
+        self.assertEqual(finished[3].attempt, 2)
+        self.assertEqual(self.instrumentation.latency[(SchedulerEndpoints.LIST_API, "200")].count, 1)
+        self.assertEqual(self.instrumentation.retries, {SchedulerEndpoints.LIST_API: 1})
+        self.assertGreater(self.instrumentation.bytes_sent[SchedulerEndpoints.TRIGGER_API], 0)
+        self.assertGreater(self.instrumentation.bytes_received[SchedulerEndpoints.LIST_API], 0)
+
+    def test_connection_error_recorded(self):
+        """
+        Test that requests without a response are labelled as errors.
+        """
+        self.transport.retry_policy = None
+        with self.assertRaises(Exception):
+            self.transport.post("http://127.0.0.1:1/core/scheduler/job/list", json={})
+        self.assertEqual(self.instrumentation.latency[("/core/scheduler/job/list", "error")].count, 1)
+
+    def test_prometheus_export(self):
+        """
+        Test the Prometheus text rendering.
+        """
+        self.run_flow()
+        text = PrometheusExporter(self.instrumentation).render()
+
+        self.assertIn("# TYPE pyavrio_request_duration_seconds histogram", text)
+        self.assertIn('pyavrio_request_duration_seconds_bucket{endpoint="/core/scheduler/job/list",'
+                      'status="200",le="+Inf"} 1', text)
+        self.assertIn('pyavrio_request_duration_seconds_count{endpoint="/iam/security/signin",status="200"} 1', text)
+        self.assertIn("# TYPE pyavrio_response_bytes_received_total counter", text)
+        self.assertTrue(text.endswith("\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
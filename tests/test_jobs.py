@@ -0,0 +1,123 @@
+import pickle
+import unittest
+from pyavrio_scheduler.catalog import JobCatalog
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.jobs import Job, JobType, job_id, job_name, job_status, to_job_type
+from pyavrio_scheduler.scheduler import JobType as SchedulerJobType, Scheduler
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer, make_jobs
+
+
+class TestJob(unittest.TestCase):
+
+    def setUp(self):
+        self.data = make_jobs(1, "DSDQ", start=7)[0]
+        self.job = Job.from_dict(self.data)
+
+    def test_from_dict_maps_fields(self):
+        """
+        Test that the indexed fields are stored in slots and the topic becomes a JobType.
+        """
+        self.assertEqual(self.job.id, 7)
+        self.assertEqual(self.job.name, "dsdq_job_7")
+        self.assertIs(self.job.topic, JobType.DATA_QUALITY)
+        self.assertEqual(self.job.status, self.data["status"])
+        self.assertEqual(self.job.frequency, self.data["scheduledFrequency"])
+        self.assertFalse(hasattr(self.job, "__dict__"))
+        self.assertIs(SchedulerJobType, JobType)
+
+    def test_extras_are_decoded_on_access(self):
+        """
+        Test that rarely used fields are available through item access and `get`.
+        """
+        self.assertEqual(self.job["cronExpression"], self.data["cronExpression"])
+        self.assertEqual(self.job.get("description"), self.data["description"])
+        self.assertIsNone(self.job.get("missing"))
+        with self.assertRaises(KeyError):
+            self.job["missing"]
+
+    def test_field_helpers_and_round_trip(self):
+        """
+        Test that the job field helpers accept records and that `to_dict` restores the listing.
+        """
+        self.assertEqual((job_id(self.job), job_name(self.job), job_status(self.job)),
+                         (7, "dsdq_job_7", self.data["status"]))
+        self.assertEqual(Job.from_dict({"id": 1, "name": "a"}).get("jobId"), 1)
+        restored = self.job.to_dict()
+        self.assertEqual(restored["topic"], "dsdq")
+        self.assertEqual({k: v for k, v in restored.items() if k != "topic"},
+                         {k: v for k, v in self.data.items() if k != "topic"})
+        self.assertEqual(pickle.loads(pickle.dumps(self.job)), self.job)
+
+    def test_duplicate_aliases_round_trip(self):
+        """
+        Test that aliases not used for a slot keep their own values.
+        """
+        data = {"jobId": 1, "id": "job-1", "jobName": "a", "name": "b", "status": "SUCCESS",
+                "lastRunStatus": "FAILED", "scheduledFrequency": "DAILY", "frequency": "HOURLY", "topic": "dsdq"}
+        job = Job.from_dict(data)
+
+        self.assertEqual((job.id, job.name, job.status, job.frequency), (1, "a", "SUCCESS", "DAILY"))
+        self.assertEqual((job["id"], job["name"], job["lastRunStatus"]), ("job-1", "b", "FAILED"))
+        self.assertEqual((job["jobStatus"], job["frequency"]), ("SUCCESS", "HOURLY"))
+        self.assertEqual(job.to_dict(), data)
+        self.assertEqual(Job.from_dict({"status": None, "lastRunStatus": "RUNNING"}).to_dict()["status"], "RUNNING")
+
+    def test_unknown_topic_is_kept(self):
+        """
+        Test that topics without a JobType are kept as given.
+        """
+        self.assertIsNone(to_job_type("NOTEBOOK"))
+        self.assertEqual(Job(1, "a", "NOTEBOOK").topic, "NOTEBOOK")
+        self.assertIs(to_job_type("data_quality"), JobType.DATA_QUALITY)
+
+    def test_catalog_accepts_records(self):
+        """
+        Test that the catalog indexes Job records like dictionaries.
+        """
+        catalog = JobCatalog()
+        catalog.update("DSDQ", [self.job])
+        self.assertEqual(catalog.resolve("dsdq_job_7"), ("DSDQ", self.job))
+        self.assertEqual(catalog.update("DSDQ", [Job.from_dict(self.data)]),
+                         {"added": 0, "changed": 0, "removed": 0})
+
+
+class TestSchedulerRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockAvrioServer(jobs={"SQL_NOTEBOOK": make_jobs(12, "SQL_NOTEBOOK")}).start()
+        self.session = Session(self.server.url, SessionState(access_token="token", user_id=1))
+        self.scheduler = Scheduler(self.session)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def test_list_all_and_iter_jobs_return_records(self):
+        """
+        Test that listings can be returned as Job records.
+        """
+        jobs = self.scheduler.list_all("sql_notebook", records=True)
+        self.assertEqual(len(jobs), 12)
+        self.assertTrue(all(job.topic is JobType.SQL_NOTEBOOK for job in jobs))
+        walked = list(self.scheduler.iter_jobs(JobType.SQL_NOTEBOOK, page_size=5, records=True))
+        self.assertEqual([job.id for job in walked], list(range(1, 13)))
+
+    def test_trigger_with_records(self):
+        """
+        Test that records are drop-in arguments of `trigger_scheduler` and `trigger_many`.
+        """
+        jobs = self.scheduler.list_all("sql_notebook", records=True)
+        self.assertEqual(self.scheduler.trigger_scheduler(jobs[0])["status"], "TRIGGERED")
+        self.scheduler.trigger_scheduler(jobs[1].name, jobs[1].id, jobs[1].topic)
+        results = list(self.scheduler.trigger_many(jobs[2:4]))
+        self.assertTrue(all(result.ok for result in results))
+
+        triggers = [payload for path, payload in self.server.requests if path == SchedulerEndpoints.TRIGGER_API]
+        self.assertEqual(sorted(p["jobId"] for p in triggers), [1, 2, 3, 4])
+        self.assertTrue(all(p["topic"] == "NOTEBOOK" for p in triggers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import os
+import tempfile
+import unittest
+
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.ledger import TriggerLedger
+from pyavrio_scheduler.scheduler import JobType, Scheduler
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTriggerLedger(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sent = []
+
+    def trigger(self, value):
+        def send():
+            self.sent.append(value)
+            return {"status": "TRIGGERED", "run": value}
+        return send
+
+    def test_duplicates_inside_the_window_are_skipped(self):
+        """
+        Test that a repeated trigger returns the original response without being sent.
+        """
+        ledger = TriggerLedger(window=60, clock=self.clock)
+        first = ledger.run("https://host/", 7, "NOTEBOOK", self.trigger(1))
+        again = ledger.run("https://host", 7, "NOTEBOOK", self.trigger(2))
+
+        self.assertEqual(first, {"status": "TRIGGERED", "run": 1})
+        self.assertEqual(again, first)
+        self.assertEqual(self.sent, [1])
+        self.assertEqual(ledger.stats(), {"recorded": 1, "duplicates": 1, "size": 1})
+
+    def test_key_includes_host_and_topic(self):
+        """
+        Test that the same job ID on another host or topic is triggered.
+        """
+        ledger = TriggerLedger(window=60, clock=self.clock)
+        ledger.run("https://a", 7, "NOTEBOOK", self.trigger(1))
+        ledger.run("https://b", 7, "NOTEBOOK", self.trigger(2))
+        ledger.run("https://a", 7, "DSDQ", self.trigger(3))
+        self.assertEqual(self.sent, [1, 2, 3])
+
+    def test_window_expiry(self):
+        """
+        Test that a trigger is sent again once the window has passed, and old entries are dropped.
+        """
+        ledger = TriggerLedger(window=60, clock=self.clock)
+        ledger.run("https://host", 1, "NOTEBOOK", self.trigger(1))
+        self.clock.now += 30
+        ledger.run("https://host", 2, "NOTEBOOK", self.trigger(2))
+        self.clock.now += 31
+
+        self.assertIsNone(ledger.lookup("https://host", 1, "NOTEBOOK"))
+        self.assertEqual(len(ledger), 1)
+        ledger.run("https://host", 1, "NOTEBOOK", self.trigger(3))
+        self.assertEqual(self.sent, [1, 2, 3])
+
+    def test_failures_are_not_recorded(self):
+        """
+        Test that a failed trigger is sent again by the next call.
+        """
+        ledger = TriggerLedger(window=60, clock=self.clock)
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            ledger.run("https://host", 1, "NOTEBOOK", fail)
+        self.assertEqual(ledger.run("https://host", 1, "NOTEBOOK", self.trigger(1))["run"], 1)
+
+    def test_null_responses_are_recorded(self):
+        """
+        Test that a trigger answered with a JSON null is recorded and not sent again.
+        """
+        ledger = TriggerLedger(window=60, clock=self.clock)
+
+        def send():
+            self.sent.append(1)
+
+        self.assertIsNone(ledger.run("https://host", 1, "NOTEBOOK", send))
+        self.assertIsNone(ledger.run("https://host", 1, "NOTEBOOK", send))
+        self.assertEqual(self.sent, [1])
+        self.assertEqual(ledger.stats(), {"recorded": 1, "duplicates": 1, "size": 1})
+
+    def test_forget(self):
+        """
+        Test that a forgotten trigger can be sent again at once.
+        """
+        ledger = TriggerLedger(window=60, clock=self.clock)
+        ledger.run("https://host", 1, "NOTEBOOK", self.trigger(1))
+        self.assertTrue(ledger.forget("https://host", 1, "NOTEBOOK"))
+        ledger.run("https://host", 1, "NOTEBOOK", self.trigger(2))
+        self.assertEqual(self.sent, [1, 2])
+
+    def test_sqlite_survives_restart(self):
+        """
+        Test that recorded triggers are reloaded from the database, and expired ones are dropped.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ledger.db")
+            with TriggerLedger(window=60, path=path, clock=self.clock) as ledger:
+                ledger.run("https://host", 1, "NOTEBOOK", self.trigger(1))
+                self.clock.now += 50
+                ledger.run("https://host", 2, "NOTEBOOK", self.trigger(2))
+
+            self.clock.now += 20
+            with TriggerLedger(window=60, path=path, clock=self.clock) as ledger:
+                self.assertEqual(len(ledger), 1)
+                self.assertEqual(ledger.run("https://host", 2, "NOTEBOOK", self.trigger(3))["run"], 2)
+                ledger.run("https://host", 1, "NOTEBOOK", self.trigger(4))
+        self.assertEqual(self.sent, [1, 2, 4])
+
+    def test_many_entries(self):
+        """
+        Test that tens of thousands of entries are recorded and found.
+        """
+        ledger = TriggerLedger(window=60, clock=self.clock)
+        for job in range(20000):
+            ledger.record("https://host", job, "NOTEBOOK", {"jobId": job})
+        self.assertEqual(len(ledger), 20000)
+        self.assertEqual(ledger.lookup("https://host", 19999, "NOTEBOOK"), {"jobId": 19999})
+
+
+class TestSchedulerLedger(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAvrioServer().start()
+        self.session = Session(self.server.url, SessionState(access_token="token", user_id=1))
+        self.scheduler = Scheduler(self.session, ledger=TriggerLedger(window=60))
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def trigger_calls(self):
+        return [payload for path, payload in self.server.requests if path == SchedulerEndpoints.TRIGGER_API]
+
+    def test_retried_batch_skips_triggered_jobs(self):
+        """
+        Test that re-running a partially failed batch only sends the jobs that failed.
+        """
+        jobs = [{"jobName": f"job_{i}", "jobId": i, "topic": "python_notebook"} for i in range(4)]
+        self.server.inject_error(SchedulerEndpoints.TRIGGER_API, 500)
+        first = list(self.scheduler.trigger_many(jobs, max_workers=1))
+        self.assertEqual(sum(not result.ok for result in first), 1)
+
+        second = list(self.scheduler.trigger_many(jobs, max_workers=1))
+        self.assertTrue(all(result.ok for result in second))
+        self.assertEqual(len(self.trigger_calls()), 5)
+        self.assertEqual(self.scheduler.ledger.duplicates, 3)
+
+    def test_notebook_topics_share_a_key(self):
+        """
+        Test that python and SQL notebooks, both sent as NOTEBOOK, are deduplicated together.
+        """
+        self.scheduler.trigger_scheduler("job", 1, JobType.PYTHON_NOTEBOOK)
+        response = self.scheduler.trigger_scheduler("job", 1, "sql_notebook")
+        self.assertEqual(response["status"], "TRIGGERED")
+        self.assertEqual(len(self.trigger_calls()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
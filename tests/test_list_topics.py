@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.jobs import Job
+from pyavrio_scheduler.scheduler import JobType, Scheduler, SchedulerError
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer, make_jobs
+
+
+class TestListTopics(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs = {
+            "PYTHON_NOTEBOOK": make_jobs(7, "PYTHON_NOTEBOOK"),
+            "SQL_NOTEBOOK": make_jobs(5, "SQL_NOTEBOOK"),
+            "DSDQ": make_jobs(3, "DSDQ"),
+        }
+        self.server = MockAvrioServer(jobs=self.jobs).start()
+        self.session = Session(self.server.url, SessionState(access_token="token", user_id=1))
+        self.scheduler = Scheduler(self.session)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def test_all_topics_are_merged_and_tagged(self):
+        """
+        Test that every topic is listed and each job carries its JobType.
+        """
+        jobs = self.scheduler.list_topics(page_size=4)
+
+        self.assertEqual(len(jobs), 15)
+        self.assertTrue(all(isinstance(job, Job) for job in jobs))
+        self.assertEqual([job.topic for job in jobs[:3]], [JobType.DATA_QUALITY] * 3)
+        self.assertEqual({job.topic for job in jobs}, set(JobType))
+
+    def test_topics_are_fetched_concurrently(self):
+        """
+        Test that topics are listed in parallel rather than one after the other.
+        """
+        self.server.latency = 0.2
+        started = time.perf_counter()
+        self.scheduler.list_topics("all")
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_dictionaries_are_tagged_and_deduplicated(self):
+        """
+        Test that duplicated jobs and topics are returned once.
+        """
+        self.server.jobs["SQL_NOTEBOOK"].append(dict(self.jobs["SQL_NOTEBOOK"][0]))
+        jobs = self.scheduler.list_topics([JobType.SQL_NOTEBOOK, "sql_notebook"], records=False)
+
+        self.assertEqual([job["jobId"] for job in jobs], [1, 2, 3, 4, 5])
+        self.assertTrue(all(job["jobType"] is JobType.SQL_NOTEBOOK for job in jobs))
+
+    def test_in_completion_order_yields_fastest_topic_first(self):
+        """
+        Test that the iterator form yields each topic as soon as it is listed.
+        """
+        release = threading.Event()
+        handle = self.server.handle
+
+        def slow_python(path, payload, headers):
+            if path == SchedulerEndpoints.LIST_API and payload["topic"] == "PYTHON_NOTEBOOK":
+                release.wait(5)
+            return handle(path, payload, headers)
+
+        self.server.handle = slow_python
+        results = self.scheduler.list_topics(["python_notebook", "data_quality"], in_completion_order=True)
+        job_type, jobs = next(results)
+        self.assertIs(job_type, JobType.DATA_QUALITY)
+        self.assertEqual(len(jobs), 3)
+
+        release.set()
+        job_type, jobs = next(results)
+        self.assertIs(job_type, JobType.PYTHON_NOTEBOOK)
+        self.assertEqual(len(jobs), 7)
+
+    def test_filters_and_errors(self):
+        """
+        Test that filters apply to every topic and failures raise SchedulerError.
+        """
+        jobs = self.scheduler.list_topics(status="FAILED")
+        self.assertTrue(jobs)
+        self.assertTrue(all(job.status == "FAILED" for job in jobs))
+
+        with self.assertRaises(SchedulerError):
+            self.scheduler.list_topics(["unknown"])
+        self.server.inject_error(SchedulerEndpoints.LIST_API, 500)
+        with self.assertRaises(SchedulerError):
+            self.scheduler.list_topics()
+
+
+if __name__ == '__main__':
+    unittest.main()
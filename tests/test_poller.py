@@ -0,0 +1,209 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import TimeoutError
+from pyavrio_scheduler.auth import Authentication, UserDetailsError
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.poller import StatusPoller
+from pyavrio_scheduler.scheduler import JobType, Scheduler, SchedulerError
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer
+
+
+class TestStatusPoller(unittest.TestCase):
+
+    def setUp(self):
+        jobs = [{"jobId": i, "jobName": f"job_{i}", "status": "RUNNING"} for i in range(1, 6)]
+        self.server = MockAvrioServer(jobs={"PYTHON_NOTEBOOK": jobs,
+                                            "DSDQ": [{"jobId": 9, "jobName": "dq", "status": "RUNNING"}]}).start()
+        self.session = Session(self.server.url, SessionState(access_token="token", user_id=1))
+        self.scheduler = Scheduler(self.session)
+        self.poller = StatusPoller(self.scheduler, interval=0.02, max_interval=0.05)
+
+    def tearDown(self):
+        self.poller.close()
+        self.session.close()
+        self.server.stop()
+
+    def list_payloads(self):
+        return [payload for path, payload in self.server.requests if path == SchedulerEndpoints.LIST_API]
+
+    def finish_later(self, delay, *statuses):
+        def finish():
+            time.sleep(delay)
+            for job_id, topic, status in statuses:
+                self.server.set_status(job_id, status, topic)
+        thread = threading.Thread(target=finish)
+        thread.start()
+        self.addCleanup(thread.join)
+
+    def test_wait_for_shares_one_listing_per_topic_per_tick(self):
+        """
+        Test that many waiters are served by one request for the latest finished jobs per topic per tick.
+        """
+        self.finish_later(0.1, (1, "PYTHON_NOTEBOOK", "SUCCESS"), (2, "PYTHON_NOTEBOOK", "FAILED"),
+                          (9, "DSDQ", "SUCCESS"))
+        futures = [self.poller.watch(9, JobType.DATA_QUALITY)]
+        jobs = self.poller.wait_for([1, 2], "python_notebook", timeout=5)
+        futures[0].result(timeout=5)
+
+        self.assertEqual(jobs[1]["status"], "SUCCESS")
+        self.assertEqual(jobs[2]["status"], "FAILED")
+        payloads = self.list_payloads()
+        self.assertTrue(all(p["statusFilter"] == ["SUCCESS", "FAILED", "CANCELLED"] for p in payloads))
+        self.assertTrue(all((p["page"], p["sortBy"], p["ascending"]) == (0, "lastRunTime", False) for p in payloads))
+        # Two topics per tick at most, whatever the number of waiters, and one baseline per call
+        self.assertLessEqual(len(payloads), 2 * self.poller.tick_count + 2)
+        self.assertEqual(self.poller.request_count, len(payloads))
+
+    def test_wait_for_timeout_cancels_waiters(self):
+        """
+        Test that a timeout raises and stops waiting for the remaining jobs.
+        """
+        self.finish_later(0.1, (1, "PYTHON_NOTEBOOK", "SUCCESS"))
+        with self.assertRaises(TimeoutError) as context:
+            self.poller.wait_for([1, 3], "python_notebook", timeout=0.3)
+        self.assertIn("[3]", str(context.exception))
+
+        time.sleep(0.15)
+        self.assertEqual(self.poller.pending_count, 0)
+
+    def test_watch_callbacks_and_backoff(self):
+        """
+        Test that futures run callbacks and that the interval backs off while nothing finishes.
+        """
+        done = threading.Event()
+        future = self.poller.watch(4, "python_notebook")
+        future.add_done_callback(lambda f: done.set())
+
+        time.sleep(0.3)
+        self.assertFalse(done.is_set())
+        self.assertEqual(self.poller._current_interval, self.poller.max_interval)
+
+        self.server.set_status(4, "CANCELLED")
+        self.assertTrue(done.wait(2))
+        self.assertEqual(future.result()["jobName"], "job_4")
+
+    def test_wait_for_async(self):
+        """
+        Test that jobs can be awaited from asyncio.
+        """
+        self.finish_later(0.05, (5, "PYTHON_NOTEBOOK", "SUCCESS"))
+        jobs = asyncio.run(self.poller.wait_for_async([5], "python_notebook", timeout=5))
+        self.assertEqual(jobs[5]["status"], "SUCCESS")
+
+    def test_listing_failures_fail_waiters(self):
+        """
+        Test that waiters fail once their topic cannot be listed `max_errors` times in a row.
+        """
+        poller = StatusPoller(self.scheduler, interval=0.01, max_interval=0.01, max_errors=2)
+        self.addCleanup(poller.close)
+        self.server.inject_error(SchedulerEndpoints.LIST_API, 500, times=2)
+
+        with self.assertRaises(SchedulerError):
+            poller.wait_for([1], "python_notebook", timeout=5, since=None)
+        self.assertEqual(poller.request_count, 2)
+
+        self.server.inject_error(SchedulerEndpoints.LIST_API, 500)
+        with self.assertRaises(SchedulerError):
+            poller.watch(1, "python_notebook")
+        self.assertEqual(poller.pending_count, 0)
+
+    def test_invalid_topic(self):
+        """
+        Test that an unknown topic is rejected immediately.
+        """
+        with self.assertRaises(SchedulerError):
+            self.poller.watch(1, "unknown")
+
+    def test_scheduler_wait_for_reuses_one_poller(self):
+        """
+        Test that `Scheduler.wait_for` shares one poller across calls.
+        """
+        self.server.set_status(3, "SUCCESS")
+        jobs = self.scheduler.wait_for([3], "python_notebook", timeout=5, include_finished=True)
+        self.assertEqual(jobs[3]["status"], "SUCCESS")
+        self.assertIs(self.scheduler.status_poller, self.scheduler.status_poller)
+
+    def test_waits_for_the_next_run(self):
+        """
+        Test that a job already listed as finished resolves with its next run, not the previous one.
+        """
+        self.server.set_status(1, "SUCCESS")
+        self.server.set_status(2, "SUCCESS")
+        self.server.jobs["PYTHON_NOTEBOOK"][1]["lastRunTime"] = "2024-06-01T00:00:00Z"
+        rerun = self.poller.watch(1, "python_notebook")
+        new_time = self.poller.watch(2, "python_notebook")
+        listed = self.poller.watch(3, "python_notebook", since={"jobId": 3, "status": "SUCCESS"})
+
+        time.sleep(0.15)
+        self.assertFalse(rerun.done() or new_time.done() or listed.done())
+
+        self.server.set_status(1, "RUNNING")
+        time.sleep(0.1)
+        self.server.set_status(1, "SUCCESS")
+        with self.server._lock:
+            self.server.jobs["PYTHON_NOTEBOOK"][1]["lastRunTime"] = "2024-06-02T00:00:00Z"
+        self.server.set_status(3, "FAILED")
+        self.assertEqual(rerun.result(timeout=5)["status"], "SUCCESS")
+        self.assertEqual(new_time.result(timeout=5)["lastRunTime"], "2024-06-02T00:00:00Z")
+        self.assertEqual(listed.result(timeout=5)["status"], "FAILED")
+
+    def test_baseline_is_listed_before_watch_returns(self):
+        """
+        Test that a job finishing right after it is watched resolves, even before the first tick.
+        """
+        self.server.set_status(1, "SUCCESS")
+        self.server.jobs["PYTHON_NOTEBOOK"][0]["lastRunTime"] = "2024-06-01T00:00:00Z"
+        first_tick = threading.Event()
+        fetch_page = self.scheduler._fetch_page
+
+        def hold_poller_thread(*args, **kwargs):
+            if threading.current_thread() is not threading.main_thread():
+                first_tick.wait(5)
+            return fetch_page(*args, **kwargs)
+
+        self.scheduler._fetch_page = hold_poller_thread
+        future = self.poller.watch(1, "python_notebook")
+        with self.server._lock:
+            self.server.jobs["PYTHON_NOTEBOOK"][0]["lastRunTime"] = "2024-06-02T00:00:00Z"
+        first_tick.set()
+        self.assertEqual(future.result(timeout=5)["lastRunTime"], "2024-06-02T00:00:00Z")
+
+    def test_one_request_per_tick_with_many_finished_jobs(self):
+        """
+        Test that a tick sends one request even when the finished jobs fill many pages.
+        """
+        finished = [{"jobId": i, "jobName": f"old_{i}", "status": "SUCCESS",
+                     "lastRunTime": f"2024-01-01T00:00:{i % 60:02d}Z"} for i in range(100, 130)]
+        self.server.jobs["PYTHON_NOTEBOOK"].extend(finished)
+        poller = StatusPoller(self.scheduler, interval=0.01, max_interval=0.01, page_size=5)
+        self.addCleanup(poller.close)
+
+        self.finish_later(0.1, (1, "PYTHON_NOTEBOOK", "SUCCESS"))
+        with self.server._lock:
+            self.server.jobs["PYTHON_NOTEBOOK"][0]["lastRunTime"] = "2024-06-01T00:00:00Z"
+        self.assertEqual(poller.wait_for([1], "python_notebook", timeout=5)[1]["jobName"], "job_1")
+        self.assertEqual(poller.request_count, poller.tick_count + 1)
+        self.assertTrue(all(p["page"] == 0 for p in self.list_payloads()))
+
+    def test_unexpected_errors_fail_waiters_and_keep_polling(self):
+        """
+        Test that an error other than a listing failure fails the waiters without stopping the poller.
+        """
+        self.server.inject_error(SchedulerEndpoints.USER_DETAILS, 500)
+        session = Authentication().authenticate({"host": self.server.url, "method": "password",
+                                                 "username": "user@example.com", "password": "secret"})
+        self.addCleanup(session.close)
+        poller = StatusPoller(session.get_scheduler(), interval=0.01, max_interval=0.01)
+        self.addCleanup(poller.close)
+
+        with self.assertRaises(UserDetailsError):
+            poller.wait_for([1], "python_notebook", timeout=5)
+        self.finish_later(0.1, (1, "PYTHON_NOTEBOOK", "SUCCESS"))
+        self.assertEqual(poller.wait_for([1], "python_notebook", timeout=5)[1]["status"], "SUCCESS")
+
+if __name__ == '__main__':
+    unittest.main()
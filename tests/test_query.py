@@ -0,0 +1,128 @@
+import unittest
+from pyavrio_scheduler.cache import ListingCache
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.query import ListQuery
+from pyavrio_scheduler.scheduler import JobType, Scheduler, SchedulerError
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer, make_jobs
+
+
+class TestListQuery(unittest.TestCase):
+
+    def test_builder_returns_new_queries(self):
+        """
+        Test that builder methods leave the original query untouched.
+        """
+        base = ListQuery("sql_notebook")
+        refined = base.with_status("failed").with_frequency("DAILY", "weekly").search("sales").order_by("jobName", False)
+
+        self.assertEqual(base, ListQuery("sql_notebook"))
+        self.assertEqual(refined.statuses, ("FAILED",))
+        self.assertEqual(refined.frequencies, ("DAILY", "WEEKLY"))
+        self.assertEqual(refined.list_params(), {
+            "search_by": "sales", "sort_by": "jobName", "ascending": False,
+            "status_filter": ["FAILED"], "frequency_filter": ["DAILY", "WEEKLY"],
+        })
+        self.assertEqual(refined.paginate(2).size, refined.size)
+        self.assertEqual(refined.paginate(2, 50).filters()["size"], 50)
+
+    def test_filters_ignore_selection_order(self):
+        """
+        Test that equivalent queries produce the same cache filters.
+        """
+        query_1 = ListQuery("dsdq", statuses=["FAILED", "SUCCESS"])
+        query_2 = ListQuery("dsdq").with_status("SUCCESS").with_status("FAILED")
+        self.assertEqual(query_1.filters(), query_2.filters())
+
+    def test_invalid_page_window(self):
+        """
+        Test that invalid pages are rejected.
+        """
+        with self.assertRaises(ValueError):
+            ListQuery("dsdq", page=-1)
+        with self.assertRaises(ValueError):
+            ListQuery("dsdq").paginate(0, 0)
+
+
+class TestSchedulerQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs = make_jobs(40, "SQL_NOTEBOOK")
+        self.server = MockAvrioServer(jobs={"SQL_NOTEBOOK": self.jobs}).start()
+        self.session = Session(self.server.url, SessionState(access_token="token", user_id=1))
+        self.scheduler = Scheduler(self.session)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def list_payloads(self):
+        return [payload for path, payload in self.server.requests if path == SchedulerEndpoints.LIST_API]
+
+    def expected(self, status, frequency):
+        return [job for job in self.jobs if job["status"] == status and job["scheduledFrequency"] == frequency]
+
+    def test_keyword_filters_are_sent_to_the_server(self):
+        """
+        Test that only matching jobs are downloaded for keyword filters.
+        """
+        jobs = self.scheduler.list_all("sql_notebook", status="FAILED", frequency="WEEKLY")
+
+        self.assertEqual(jobs, self.expected("FAILED", "WEEKLY"))
+        payload = self.list_payloads()[0]
+        self.assertEqual(payload["statusFilter"], ["FAILED"])
+        self.assertEqual(payload["scheduledFrequencyFilter"], ["WEEKLY"])
+
+    def test_query_with_sort_and_search(self):
+        """
+        Test that a ListQuery selects the topic, search, sort order and page.
+        """
+        query = ListQuery(JobType.SQL_NOTEBOOK).search("job_1").order_by("jobName", ascending=False)
+        jobs = self.scheduler.list_all(query.paginate(0, 5))
+
+        self.assertEqual([job["jobName"] for job in jobs],
+                         sorted((j["jobName"] for j in self.jobs if "job_1" in j["jobName"]), reverse=True)[:5])
+        payload = self.list_payloads()[0]
+        self.assertEqual((payload["searchBy"], payload["sortBy"], payload["ascending"], payload["size"]),
+                         ("job_1", "jobName", False, 5))
+
+    def test_iter_jobs_applies_filters_to_every_page(self):
+        """
+        Test that pagination keeps the filters on every page.
+        """
+        query = ListQuery("sql_notebook").with_status("SUCCESS", "FAILED")
+        jobs = list(self.scheduler.iter_jobs(query, page_size=4))
+        streamed = list(self.scheduler.iter_jobs("sql_notebook", page_size=4, status=["SUCCESS", "FAILED"],
+                                                 stream=True))
+
+        expected = [job for job in self.jobs if job["status"] in ("SUCCESS", "FAILED")]
+        self.assertEqual(jobs, expected)
+        self.assertEqual(streamed, expected)
+        self.assertTrue(all(p["statusFilter"] == ["SUCCESS", "FAILED"] for p in self.list_payloads()))
+        self.assertEqual(len(self.list_payloads()), 2 * ((len(expected) + 3) // 4))
+
+    def test_filters_are_part_of_the_cache_key(self):
+        """
+        Test that listings with different filters are cached separately.
+        """
+        self.scheduler.cache = ListingCache(ttl=60)
+        failed = self.scheduler.list_all("sql_notebook", status="FAILED")
+        everything = self.scheduler.list_all("sql_notebook")
+        self.assertEqual(self.scheduler.list_all("sql_notebook", status="FAILED"), failed)
+
+        self.assertEqual(len(everything), 40)
+        self.assertEqual(len(self.list_payloads()), 2)
+        self.assertEqual(self.scheduler.invalidate_cache("sql_notebook"), 2)
+
+    def test_invalid_topic_in_query(self):
+        """
+        Test that queries for unknown topics are rejected like topic names.
+        """
+        self.assertIsNone(self.scheduler.list_all(ListQuery("unknown")))
+        with self.assertRaises(SchedulerError):
+            list(self.scheduler.iter_jobs(ListQuery("unknown")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from pyavrio_scheduler.ratelimit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_burst_up_to_capacity(self):
+        """
+        Test that a full bucket allows a burst of `capacity` requests.
+        """
+        limiter = RateLimiter(5, capacity=3, clock=self.clock, sleep=self.clock.sleep)
+        self.assertTrue(all(limiter.try_acquire() for _ in range(3)))
+        self.assertFalse(limiter.try_acquire())
+
+    def test_acquire_waits_for_refill(self):
+        """
+        Test that `acquire` sleeps until a token has been refilled.
+        """
+        limiter = RateLimiter(10, capacity=1, clock=self.clock, sleep=self.clock.sleep)
+        limiter.acquire()
+        limiter.acquire()
+        self.assertAlmostEqual(self.clock.now, 0.1)
+
+    def test_invalid_rate(self):
+        """
+        Test that a non-positive rate is rejected.
+        """
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
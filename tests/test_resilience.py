@@ -0,0 +1,161 @@
+import unittest
+import requests
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+from pyavrio_scheduler.scheduler import Scheduler
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer
+from pyavrio_scheduler.transport import Transport
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_is_exponential_and_capped(self):
+        """
+        Test the backoff delays without jitter.
+        """
+        policy = RetryPolicy(backoff_base=1, backoff_max=5, jitter=False)
+        self.assertEqual([policy.backoff(n) for n in range(1, 5)], [1, 2, 4, 5])
+
+    def test_jitter_stays_within_backoff(self):
+        """
+        Test that jittered delays never exceed the backoff.
+        """
+        policy = RetryPolicy(backoff_base=1, backoff_max=5)
+        self.assertTrue(all(0 <= policy.backoff(3) <= 4 for _ in range(100)))
+
+    def test_non_idempotent_requires_opt_in(self):
+        """
+        Test that triggers are only retried when allowed.
+        """
+        self.assertTrue(RetryPolicy().allows(1, idempotent=True))
+        self.assertFalse(RetryPolicy().allows(1, idempotent=False))
+        self.assertTrue(RetryPolicy(retry_non_idempotent=True).allows(1, idempotent=False))
+        self.assertFalse(RetryPolicy(max_attempts=2).allows(2, idempotent=True))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_open_half_open_closed(self):
+        """
+        Test the breaker state transitions of a host.
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure("h")
+        breaker.before_request("h")
+        breaker.record_failure("h")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request("h")
+        breaker.before_request("other")
+
+        clock.now = 10
+        breaker.before_request("h")  # The probe
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request("h")
+        breaker.record_success("h")
+        self.assertEqual(breaker.state("h"), CircuitBreaker.CLOSED)
+
+
+class TestTransportResilience(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAvrioServer(jobs={"DSDQ": [{"jobId": 1}]}).start()
+        self.delays = []
+        self.policy = RetryPolicy(max_attempts=3, sleep=self.delays.append)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def scheduler(self, transport):
+        state = SessionState(access_token="token", user_id=1)
+        return Scheduler(Session(self.server.url, state, transport))
+
+    def test_list_retried_on_503(self):
+        """
+        Test that a listing survives transient 503 responses.
+        """
+        transport = Transport(retry_policy=self.policy)
+        self.server.inject_error(SchedulerEndpoints.LIST_API, 503, times=2)
+
+        self.assertEqual(self.scheduler(transport).list_all("dsdq"), [{"jobId": 1}])
+        self.assertEqual(transport.retry_count, 2)
+        self.assertEqual(len(self.delays), 2)
+
+    def test_retry_after_honoured(self):
+        """
+        Test that a 429 waits for the `Retry-After` delay.
+        """
+        transport = Transport(retry_policy=self.policy)
+        self.server.inject_error(SchedulerEndpoints.LIST_API, 429, headers={"Retry-After": "7"})
+
+        self.assertEqual(self.scheduler(transport).list_all("dsdq"), [{"jobId": 1}])
+        self.assertEqual(self.delays, [7.0])
+
+    def test_trigger_not_retried_without_opt_in(self):
+        """
+        Test that a failed trigger is not sent twice unless allowed.
+        """
+        self.server.inject_error(SchedulerEndpoints.TRIGGER_API, 503)
+        self.assertIsNone(self.scheduler(Transport(retry_policy=self.policy)).trigger_scheduler("job", 1, "dsdq"))
+
+        self.server.inject_error(SchedulerEndpoints.TRIGGER_API, 503)
+        policy = RetryPolicy(retry_non_idempotent=True, sleep=self.delays.append)
+        response = self.scheduler(Transport(retry_policy=policy)).trigger_scheduler("job", 1, "dsdq")
+        self.assertEqual(response["jobId"], 1)
+
+        triggers = [path for path, _ in self.server.requests if path == SchedulerEndpoints.TRIGGER_API]
+        self.assertEqual(len(triggers), 3)
+
+    def test_circuit_breaker_fails_fast(self):
+        """
+        Test that an open circuit stops requests from reaching the server.
+        """
+        transport = Transport(circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        self.server.inject_error(SchedulerEndpoints.LIST_API, 502, times=2)
+        scheduler = self.scheduler(transport)
+
+        for _ in range(2):
+            self.assertIsNone(scheduler.list_all("dsdq"))
+        with self.assertRaises(CircuitOpenError):
+            transport.post(self.server.url + SchedulerEndpoints.LIST_API, json={})
+        self.assertIsNone(scheduler.list_all("dsdq"))
+        self.assertEqual(self.server.request_count, 2)
+        self.assertIsInstance(CircuitOpenError("x"), requests.exceptions.RequestException)
+
+    def test_failed_probe_reopens_circuit(self):
+        """
+        Test that a half-open probe failing with any error reopens the circuit instead of blocking the host.
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        transport = Transport(retry_policy=self.policy, circuit_breaker=breaker)
+        url = self.server.url + SchedulerEndpoints.LIST_API
+        host = url.split("/")[2]
+        breaker.record_failure(host)
+
+        clock.now = 10
+
+        def broken_body(method, url, kwargs):
+            raise requests.exceptions.ChunkedEncodingError("Connection broken")
+
+        send, transport._send_request = transport._send_request, broken_body
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            transport.post(url, json={})
+        self.assertEqual(breaker.state(host), CircuitBreaker.OPEN)
+        self.assertEqual(transport.retry_count, 0)
+
+        clock.now = 20
+        transport._send_request = send
+        self.assertEqual(transport.post(url, json={"topic": "DSDQ"}).status_code, 200)
+        self.assertEqual(breaker.state(host), CircuitBreaker.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
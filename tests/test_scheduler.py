@@ -1,8 +1,12 @@
+import time
 import unittest
+import requests
 from unittest.mock import patch, MagicMock
-from pyavrio_scheduler.scheduler import Scheduler
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.scheduler import Scheduler, SchedulerError
 from pyavrio_scheduler.session import Session
 from pyavrio_scheduler.state import UserState
+from pyavrio_scheduler.testing import MockAvrioServer
 
 
 
@@ -29,4 +33,107 @@ class TestScheduler(unittest.TestCase):
         result = self.scheduler.list_all("invalid_topic")
 
         self.assertIsNone(result)
-        mock_post.assert_not_called()
\ No newline at end of file
+        mock_post.assert_not_called()
+
+class TestSchedulerIterJobs(unittest.TestCase):
+
+    def setUp(self):
+        UserState._instance = None
+        self.jobs = [{"jobId": i, "jobName": f"job_{i}"} for i in range(25)]
+        self.server = MockAvrioServer(jobs={"SQL_NOTEBOOK": self.jobs}).start()
+        user_state = UserState()
+        user_state.access_token = "mock_access_token"
+        user_state.user_id = 1
+        self.session = Session(self.server.url, user_state)
+        self.scheduler = Scheduler(self.session)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def list_pages(self):
+        return [payload["page"] for path, payload in self.server.requests
+                if path == SchedulerEndpoints.LIST_API]
+
+    def test_iter_jobs_walks_every_page(self):
+        """Test that `iter_jobs` yields every job across pages in order."""
+        result = list(self.scheduler.iter_jobs("sql_notebook", page_size=10))
+
+        self.assertEqual(result, self.jobs)
+        self.assertEqual(self.list_pages(), [0, 1, 2])
+
+    def test_iter_jobs_without_prefetch(self):
+        """Test that `iter_jobs` works without background prefetching."""
+        result = list(self.scheduler.iter_jobs("sql_notebook", page_size=5, prefetch=False))
+
+        self.assertEqual(result, self.jobs)
+        self.assertEqual(self.list_pages(), [0, 1, 2, 3, 4])
+
+    def test_iter_jobs_is_lazy(self):
+        """Test that the first job is available before later pages are requested."""
+        iterator = self.scheduler.iter_jobs("sql_notebook", page_size=10, prefetch=False)
+
+        self.assertEqual(next(iterator), self.jobs[0])
+        self.assertEqual(self.list_pages(), [0])
+        iterator.close()
+
+    def test_iter_jobs_invalid_topic(self):
+        """Test that `iter_jobs` rejects an invalid topic name."""
+        with self.assertRaises(SchedulerError):
+            next(self.scheduler.iter_jobs("invalid_topic"))
+        self.assertEqual(self.server.request_count, 0)
+
+
+class TestSchedulerTriggerMany(unittest.TestCase):
+
+    def setUp(self):
+        UserState._instance = None
+        self.server = MockAvrioServer(latency=0.05).start()
+        user_state = UserState()
+        user_state.access_token = "mock_access_token"
+        user_state.user_id = 1
+        self.session = Session(self.server.url, user_state)
+        self.scheduler = Scheduler(self.session)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def test_trigger_many_runs_concurrently(self):
+        """Test that `trigger_many` triggers every job concurrently and normalizes topics."""
+        jobs = [(f"job_{i}", i, "python_notebook") for i in range(10)]
+        jobs.append({"jobName": "dq", "jobId": 99, "topic": "data_quality"})
+
+        started = time.perf_counter()
+        results = list(self.scheduler.trigger_many(jobs, max_workers=11))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(results), 11)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertLess(elapsed, 0.05 * 11)
+        topics = {payload["jobId"]: payload["topic"] for path, payload in self.server.requests}
+        self.assertEqual(topics[0], "NOTEBOOK")
+        self.assertEqual(topics[99], "DSDQ")
+
+    def test_trigger_many_reports_errors(self):
+        """Test that failures are returned as results instead of being printed."""
+        self.server.stop()
+        results = list(self.scheduler.trigger_many([("job", 1, "sql_notebook")]))
+
+        self.assertEqual(len(results), 1)
+        self.assertFalse(results[0].ok)
+        self.assertIsNone(results[0].response)
+        self.assertIsInstance(results[0].error, requests.exceptions.RequestException)
+        self.server.start()
+
+    def test_trigger_many_rate_limit(self):
+        """Test that `rate_limit` bounds how fast triggers are started."""
+        self.server.latency = 0
+        jobs = [(f"job_{i}", i, "dsdq") for i in range(6)]
+
+        started = time.perf_counter()
+        results = list(self.scheduler.trigger_many(jobs, max_workers=6, rate_limit=20))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(results), 6)
+        self.assertGreaterEqual(elapsed, 0.2)
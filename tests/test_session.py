@@ -1,7 +1,11 @@
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
+from pyavrio_scheduler.auth import Authentication
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
 from pyavrio_scheduler.session import Session
-from pyavrio_scheduler.state import UserState
+from pyavrio_scheduler.state import SessionState, UserState
+from pyavrio_scheduler.testing import MockAvrioServer
 
 
 class TestSession(unittest.TestCase):
@@ -42,5 +46,76 @@ class TestSession(unittest.TestCase):
         self.assertEqual(scheduler_instance, mock_scheduler_instance)
 
 
+class TestConcurrentSessions(unittest.TestCase):
+    def setUp(self):
+        UserState._instance = None
+        self.servers = [MockAvrioServer(email=f"user{n}@example.com", user_id=n,
+                                        jobs={"DSDQ": [{"jobId": n}]}).start() for n in (1, 2)]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+
+    def authenticate(self, auth, server):
+        return auth.authenticate({"host": server.url, "method": "password",
+                                  "username": server.email, "password": "secret"})
+
+    def test_sessions_do_not_interfere(self):
+        """
+        Test that sessions for different users and hosts keep their own state.
+        """
+        auth = Authentication()
+        sessions = [self.authenticate(auth, server) for server in self.servers]
+
+        self.assertIsNot(sessions[0].user_state, sessions[1].user_state)
+        self.assertEqual([s.user_state.user_id for s in sessions], [1, 2])
+        self.assertEqual([s.user_state.email for s in sessions], ["user1@example.com", "user2@example.com"])
+
+        results = {}
+
+        def list_jobs(session):
+            scheduler = session.get_scheduler()
+            results[session.user_state.user_id] = [scheduler.list_all("dsdq") for _ in range(20)]
+
+        threads = [threading.Thread(target=list_jobs, args=(session,)) for session in sessions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results[1], [[{"jobId": 1}]] * 20)
+        self.assertEqual(results[2], [[{"jobId": 2}]] * 20)
+        for n, server in zip((1, 2), self.servers):
+            users = {payload["userId"] for path, payload in server.requests
+                     if path == SchedulerEndpoints.LIST_API}
+            self.assertEqual(users, {n})
+
+    def test_shared_state_compatibility(self):
+        """
+        Test that `shared_state=True` keeps the process-global singleton behaviour.
+        """
+        session = self.authenticate(Authentication(shared_state=True), self.servers[0])
+
+        self.assertIs(session.user_state, UserState())
+        self.assertEqual(UserState().user_id, 1)
+        self.assertIsInstance(self.authenticate(Authentication(), self.servers[1]).user_state, SessionState)
+        self.assertEqual(UserState().user_id, 1)
+
+    def test_shared_state_reauthentication(self):
+        """
+        Test that signing in as another user with `shared_state=True` resolves the new user's ID.
+        """
+        auth = Authentication(shared_state=True)
+        first = self.authenticate(auth, self.servers[0])
+        self.assertEqual(first.get_scheduler().list_all("dsdq"), [{"jobId": 1}])
+
+        second = self.authenticate(auth, self.servers[1])
+        self.assertEqual(second.get_scheduler().list_all("dsdq"), [{"jobId": 2}])
+        users = {payload["userId"] for path, payload in self.servers[1].requests
+                 if path == SchedulerEndpoints.LIST_API}
+        self.assertEqual(users, {2})
+        self.assertEqual(UserState().user_id, 2)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.scheduler import Scheduler
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.snapshot import JobSnapshot
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.testing import MockAvrioServer, make_jobs
+
+
+class TestJobSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.snapshot = JobSnapshot(clock=lambda: 1000.0)
+        self.jobs = make_jobs(4, "DSDQ")
+
+    def tearDown(self):
+        self.snapshot.close()
+
+    def test_first_sync_adds_every_job(self):
+        """
+        Test that the first sync records every job as added.
+        """
+        result = self.snapshot.sync("DSDQ", self.jobs)
+
+        self.assertEqual((result.added, result.changed, result.removed), (4, 0, 0))
+        self.assertEqual(self.snapshot.jobs("DSDQ"), self.jobs)
+        self.assertEqual([c.kind for c in self.snapshot.changes()], ["added"] * 4)
+        self.assertEqual(self.snapshot.get("DSDQ", 2), self.jobs[1])
+
+    def test_delta_sync(self):
+        """
+        Test that only changed, added and removed jobs are recorded.
+        """
+        self.snapshot.sync("DSDQ", self.jobs)
+        last = self.snapshot.last_sequence()
+
+        updated = [dict(job) for job in self.jobs[1:]]
+        updated[0]["status"] = "CANCELLED"
+        updated[1]["description"] = "Only an untracked field"
+        updated.append(make_jobs(1, "DSDQ", start=9)[0])
+        result = self.snapshot.sync("DSDQ", updated)
+
+        self.assertEqual((result.added, result.changed, result.removed), (1, 1, 1))
+        feed = self.snapshot.changes(since=last)
+        self.assertEqual([(c.kind, c.job_id, c.fields) for c in feed],
+                         [("changed", 2, ("status",)), ("added", 9, ()), ("removed", 1, ())])
+        self.assertEqual(feed[0].old["status"], self.jobs[1]["status"])
+        self.assertEqual(feed[0].new["status"], "CANCELLED")
+        self.assertIsNone(feed[2].new)
+        self.assertEqual(self.snapshot.get("DSDQ", 3)["description"], "Only an untracked field")
+
+        self.assertEqual(self.snapshot.sync("DSDQ", updated)[2:], (0, 0, 0))
+        self.assertEqual(self.snapshot.last_sequence(), feed[-1].seq)
+
+    def test_queries_feed_filters_and_catalog(self):
+        """
+        Test reading jobs by status, paging the feed and loading a catalog.
+        """
+        self.snapshot.sync("DSDQ", self.jobs)
+        self.snapshot.sync("SQL_NOTEBOOK", make_jobs(2, "SQL_NOTEBOOK"))
+
+        status = self.jobs[0]["status"]
+        self.assertEqual(self.snapshot.jobs(topic="DSDQ", status=status),
+                         [job for job in self.jobs if job["status"] == status])
+        self.assertEqual(self.snapshot.count(), 6)
+        self.assertEqual(len(self.snapshot.changes(topic="SQL_NOTEBOOK")), 2)
+        self.assertEqual([c.seq for c in self.snapshot.changes(since=2, limit=2)], [3, 4])
+
+        catalog = self.snapshot.to_catalog()
+        self.assertEqual(catalog.resolve("sql_notebook_job_1")[0], "SQL_NOTEBOOK")
+
+        self.assertEqual(self.snapshot.prune_changes(4), 4)
+        self.assertEqual(len(self.snapshot.changes()), 2)
+
+    def test_snapshot_persists_on_disk(self):
+        """
+        Test that a file snapshot survives reopening.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "jobs.db")
+            with JobSnapshot(path) as snapshot:
+                snapshot.sync("DSDQ", self.jobs)
+            with JobSnapshot(path) as snapshot:
+                self.assertEqual(snapshot.count("DSDQ"), 4)
+                self.assertEqual(snapshot.sync("DSDQ", self.jobs)[2:], (0, 0, 0))
+
+    def test_refresh_from_the_server(self):
+        """
+        Test that a refresh lists every topic and syncs it.
+        """
+        jobs = {"PYTHON_NOTEBOOK": make_jobs(3), "SQL_NOTEBOOK": make_jobs(2, "SQL_NOTEBOOK"), "DSDQ": self.jobs}
+        with MockAvrioServer(jobs=jobs) as server, \
+                Session(server.url, SessionState(access_token="token", user_id=1)) as session:
+            scheduler = Scheduler(session)
+            results = self.snapshot.refresh(scheduler)
+            self.assertEqual({topic: result.added for topic, result in results.items()},
+                             {"PYTHON_NOTEBOOK": 3, "SQL_NOTEBOOK": 2, "DSDQ": 4})
+            self.assertNotIn("jobType", self.snapshot.jobs("DSDQ")[0])
+
+            server.set_status(1, "CANCELLED", "PYTHON_NOTEBOOK")
+            results = self.snapshot.refresh(scheduler, ["python_notebook"])
+            self.assertEqual(results["PYTHON_NOTEBOOK"].changed, 1)
+            lists = [p for path, p in server.requests if path == SchedulerEndpoints.LIST_API]
+            self.assertEqual(len(lists), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
+import threading
 import unittest
-from pyavrio_scheduler.state import UserState
+from pyavrio_scheduler.state import SessionState, UserState
 
 
 class TestUserState(unittest.TestCase):
@@ -67,5 +68,56 @@ class TestUserState(unittest.TestCase):
         self.assertIsNone(user_state.user_id)
 
 
+class TestSessionState(unittest.TestCase):
+    def test_instances_are_independent(self):
+        """
+        Test that every SessionState holds its own data, apart from the singleton.
+        """
+        state_1 = SessionState(access_token="token_1", user_id=1)
+        state_2 = SessionState(access_token="token_2", user_id=2)
+        UserState().access_token = "global"
+
+        self.assertEqual(state_1.access_token, "token_1")
+        self.assertEqual(state_2.user_id, 2)
+        self.assertIsInstance(UserState(), SessionState)
+
+    def test_update_and_snapshot(self):
+        """
+        Test that `update` sets several fields and `snapshot` reads them together.
+        """
+        state = SessionState()
+        state.update(access_token="token", email="a@b.c", user_id=3)
+        self.assertEqual(state.snapshot(), {"access_token": "token", "username": None,
+                                            "email": "a@b.c", "user_id": 3})
+        with self.assertRaises(AttributeError):
+            state.update(password="secret")
+
+    def test_concurrent_updates_stay_consistent(self):
+        """
+        Test that readers never see a token paired with another thread's user ID.
+        """
+        state = SessionState(access_token="token_0", user_id=0)
+        mismatches = []
+
+        def writer(n):
+            for _ in range(2000):
+                state.update(access_token=f"token_{n}", user_id=n)
+
+        def reader():
+            for _ in range(2000):
+                snapshot = state.snapshot()
+                if snapshot["access_token"] != f"token_{snapshot['user_id']}":
+                    mismatches.append(snapshot)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(1, 4)]
+        threads.append(threading.Thread(target=reader))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(mismatches, [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,116 @@
+import json
+import unittest
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.jobs import Job
+from pyavrio_scheduler.scheduler import Scheduler, SchedulerError
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import SessionState
+from pyavrio_scheduler.streaming import iter_listing
+from pyavrio_scheduler.testing import MockAvrioServer, make_jobs
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestIterListing(unittest.TestCase):
+
+    def setUp(self):
+        self.body = {"totalPages": 3, "content": [{"jobId": 1, "jobName": "café ☃"}, 12345, "x", None,
+                                                  [1, {"a": []}], -1.5e3, True], "last": False}
+        self.raw = json.dumps(self.body, ensure_ascii=False, indent=1).encode("utf-8")
+
+    def test_every_chunk_size(self):
+        """
+        Test that items and metadata decode identically whatever the chunk boundaries.
+        """
+        for size in (1, 2, 3, 7, 64, len(self.raw)):
+            meta = {}
+            items = list(iter_listing(chunked(self.raw, size), meta=meta))
+            self.assertEqual(items, self.body["content"], size)
+            self.assertEqual(meta, {"totalPages": 3, "last": False}, size)
+
+    def test_items_are_yielded_before_the_body_is_read(self):
+        """
+        Test that the first job is available before the rest of the body arrives.
+        """
+        raw = json.dumps({"content": make_jobs(100)}).encode("utf-8")
+        consumed = []
+
+        def chunks():
+            for chunk in chunked(raw, 1024):
+                consumed.append(chunk)
+                yield chunk
+
+        first = next(iter_listing(chunks()))
+        self.assertEqual(first["jobId"], 1)
+        self.assertEqual(len(consumed), 1)
+
+    def test_empty_and_missing_content(self):
+        """
+        Test objects without items.
+        """
+        self.assertEqual(list(iter_listing([b"{}"])), [])
+        self.assertEqual(list(iter_listing([b'{"content": [] }'])), [])
+        meta = {}
+        self.assertEqual(list(iter_listing([b'{"content": null, "size": 5}'], meta=meta)), [])
+        self.assertEqual(meta, {"content": None, "size": 5})
+
+    def test_malformed_and_truncated_bodies(self):
+        """
+        Test that invalid bodies raise ValueError.
+        """
+        for raw in (b"[1, 2]", b'{"content": [1 2]}', b'{"content": [1, 2', b'{"content": [{"a": 1}',
+                    b'{"a" 1}', b""):
+            with self.assertRaises(ValueError, msg=raw):
+                list(iter_listing(chunked(raw, 3)))
+
+
+class TestSchedulerStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs = make_jobs(23, "PYTHON_NOTEBOOK")
+        self.server = MockAvrioServer(jobs={"PYTHON_NOTEBOOK": self.jobs}).start()
+        self.session = Session(self.server.url, SessionState(access_token="token", user_id=1))
+        self.scheduler = Scheduler(self.session)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def test_iter_jobs_streams_every_page(self):
+        """
+        Test that streamed pages yield the same jobs as buffered ones.
+        """
+        streamed = list(self.scheduler.iter_jobs("python_notebook", page_size=10, stream=True))
+        self.assertEqual(streamed, self.jobs)
+        pages = [p["page"] for path, p in self.server.requests if path == SchedulerEndpoints.LIST_API]
+        self.assertEqual(pages, [0, 1, 2])
+
+        records = list(self.scheduler.iter_jobs("python_notebook", page_size=10, stream=True, records=True))
+        self.assertTrue(all(isinstance(job, Job) for job in records))
+
+    def test_list_all_stream_returns_an_iterator(self):
+        """
+        Test that `list_all(stream=True)` yields the first page lazily and reuses the connection.
+        """
+        jobs = self.scheduler.list_all("python_notebook", stream=True)
+        self.assertNotIsInstance(jobs, list)
+        self.assertEqual(list(jobs), self.jobs)
+        self.assertEqual(self.scheduler.list_all("python_notebook"), self.jobs)
+        self.assertEqual(self.server.connection_count, 1)
+
+    def test_stream_errors(self):
+        """
+        Test that request failures keep the existing behaviour and page failures raise SchedulerError.
+        """
+        self.server.inject_error(SchedulerEndpoints.LIST_API, 500)
+        self.assertIsNone(self.scheduler.list_all("python_notebook", stream=True))
+
+        self.server.inject_error(SchedulerEndpoints.LIST_API, 500)
+        with self.assertRaises(SchedulerError):
+            list(self.scheduler.iter_jobs("python_notebook", stream=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from pyavrio_scheduler.auth import Authentication
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.state import UserState
+from pyavrio_scheduler.testing import MockAvrioServer, make_token
+from pyavrio_scheduler.tokens import TokenFileCache, TokenManager, token_expiry
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenManager(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.issued = []
+
+    def fetch(self):
+        token = make_token("user@example.com", exp=self.clock.now + 300, n=len(self.issued))
+        self.issued.append(token)
+        return token
+
+    def test_token_expiry(self):
+        """
+        Test reading the `exp` claim.
+        """
+        self.assertEqual(token_expiry(make_token("a@b.c", exp=1234)), 1234.0)
+        self.assertIsNone(token_expiry(make_token("a@b.c")))
+        self.assertIsNone(token_expiry("not-a-jwt"))
+
+    def test_refresh_before_expiry(self):
+        """
+        Test that the token is reused until it enters the refresh margin.
+        """
+        manager = TokenManager(self.fetch, refresh_margin=60, clock=self.clock)
+        first = manager.get_token()
+        self.clock.now += 200
+        self.assertEqual(manager.get_token(), first)
+
+        self.clock.now += 50
+        second = manager.get_token()
+        self.assertNotEqual(second, first)
+        self.assertEqual(manager.refresh_count, 2)
+        self.assertEqual(manager.expires_at, self.clock.now + 300)
+
+    def test_single_flight_refresh(self):
+        """
+        Test that concurrent callers of an expired token share one sign-in.
+        """
+        def slow_fetch():
+            time.sleep(0.1)
+            return self.fetch()
+
+        manager = TokenManager(slow_fetch, clock=self.clock)
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(manager.get_token())) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.issued), 1)
+        self.assertEqual(set(tokens), {self.issued[0]})
+
+    def test_invalidate(self):
+        """
+        Test that an invalidated token is fetched again.
+        """
+        manager = TokenManager(self.fetch, clock=self.clock)
+        manager.get_token()
+        manager.invalidate()
+        manager.get_token()
+        self.assertEqual(len(self.issued), 2)
+
+
+class TestTokenFileCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tokens.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_file_created_owner_only(self):
+        """
+        Test that the cache file is written with mode 0600.
+        """
+        cache = TokenFileCache(self.path)
+        cache.save("key", "token")
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        self.assertEqual(cache.load("key"), "token")
+        cache.delete("key")
+        self.assertIsNone(cache.load("key"))
+
+    @unittest.skipIf(os.name != "posix", "POSIX permissions only")
+    def test_readable_by_others_is_ignored(self):
+        """
+        Test that a cache file readable by other users is not trusted.
+        """
+        cache = TokenFileCache(self.path)
+        cache.save("key", "token")
+        os.chmod(self.path, 0o644)
+        self.assertIsNone(cache.load("key"))
+
+    def test_authentication_reuses_cached_token(self):
+        """
+        Test that a second process-like Authentication skips the sign-in round trip.
+        """
+        with MockAvrioServer() as server:
+            params = {"host": server.url, "method": "password",
+                      "username": "user@example.com", "password": "secret"}
+            for _ in range(2):
+                UserState._instance = None
+                session = Authentication(token_cache=self.path).authenticate(params)
+                session.close()
+
+            sign_ins = [path for path, _ in server.requests if path == SchedulerEndpoints.TOKEN_ENDPOINT]
+            self.assertEqual(len(sign_ins), 1)
+            self.assertIsNotNone(session.token_manager)
+            self.assertEqual(session.get_access_token(), session.user_state.access_token)
+
+
+if __name__ == "__main__":
+    unittest.main()
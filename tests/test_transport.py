@@ -0,0 +1,70 @@
+import unittest
+from pyavrio_scheduler.auth import Authentication
+from pyavrio_scheduler.session import Session
+from pyavrio_scheduler.state import UserState
+from pyavrio_scheduler.testing import MockAvrioServer, make_token
+from pyavrio_scheduler.transport import Transport
+
+
+JOBS = {"PYTHON_NOTEBOOK": [{"jobId": 1, "jobName": "daily_report"}]}
+
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        """
+        Start a local stand-in server for every test.
+        """
+        UserState._instance = None
+        self.server = MockAvrioServer(jobs=JOBS).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_connection_reused_across_auth_and_scheduler(self):
+        """
+        Test that sign-in, user details, list and trigger calls share one connection.
+        """
+        auth = Authentication()
+        session = auth.authenticate({
+            "host": self.server.url,
+            "method": "password",
+            "username": "user@example.com",
+            "password": "secret",
+        })
+        scheduler = session.get_scheduler()
+        for _ in range(5):
+            self.assertEqual(scheduler.list_all("python_notebook"), JOBS["PYTHON_NOTEBOOK"])
+        self.assertIsNotNone(scheduler.trigger_scheduler("daily_report", 1, "python_notebook"))
+
+        self.assertIs(session.transport, auth.transport)
+        self.assertEqual(self.server.request_count, 8)
+        self.assertEqual(self.server.connection_count, 1)
+        session.close()
+
+    def test_keep_alive_disabled_opens_new_connections(self):
+        """
+        Test that disabling keep-alive opens one connection per request.
+        """
+        user_state = UserState()
+        user_state.access_token = make_token("user@example.com")
+        user_state.user_id = 1
+        with Session(self.server.url, user_state, Transport(keep_alive=False)) as session:
+            scheduler = session.get_scheduler()
+            for _ in range(3):
+                scheduler.list_all("python_notebook")
+
+        self.assertEqual(self.server.connection_count, 3)
+
+    def test_default_timeout_applied(self):
+        """
+        Test that the transport default timeout is used when none is given.
+        """
+        transport = Transport(timeout=1.5)
+        self.assertEqual(transport.timeout, 1.5)
+        response = transport.post(self.server.url + "/core/v2/userdetails/user", json={})
+        self.assertEqual(response.json(), {"userId": 1})
+        transport.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import threading
+import time
+import unittest
+
+from pyavrio_scheduler.auth import Authentication, UserDetailsError
+from pyavrio_scheduler.endpoints import SchedulerEndpoints
+from pyavrio_scheduler.testing import MockAvrioServer
+from pyavrio_scheduler.userdetails import UserDetailsCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestUserDetailsCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = UserDetailsCache(ttl=60, max_entries=2, clock=self.clock)
+
+    def test_resolve_memoizes_per_host(self):
+        """
+        Test that a user ID is looked up once per host and email, ignoring case and trailing slashes.
+        """
+        lookups = []
+
+        def lookup(user_id):
+            def run():
+                lookups.append(user_id)
+                return user_id
+            return run
+
+        self.assertEqual(self.cache.resolve("https://a/", "User@example.com", lookup(1)), 1)
+        self.assertEqual(self.cache.resolve("https://a", "user@example.com", lookup(2)), 1)
+        self.assertEqual(self.cache.resolve("https://b", "user@example.com", lookup(3)), 3)
+        self.assertEqual(lookups, [1, 3])
+        self.assertEqual(self.cache.stats(), {"hits": 1, "lookups": 2, "size": 2})
+
+    def test_ttl_and_lru_limit(self):
+        """
+        Test that entries expire after the TTL and the least recently used one is evicted.
+        """
+        self.cache.store("https://a", "x@example.com", 1)
+        self.cache.store("https://b", "x@example.com", 2)
+        self.cache.get("https://a", "x@example.com")
+        self.cache.store("https://c", "x@example.com", 3)
+        self.assertIsNone(self.cache.get("https://b", "x@example.com"))
+        self.assertEqual(self.cache.get("https://a", "x@example.com"), 1)
+
+        self.clock.now += 60
+        self.assertIsNone(self.cache.get("https://a", "x@example.com"))
+        self.assertEqual(self.cache.invalidate(host="https://c"), 1)
+
+    def test_failures_are_not_cached(self):
+        """
+        Test that a failed lookup raises and the next resolution looks the user up again.
+        """
+        def fail():
+            raise UserDetailsError("boom")
+
+        with self.assertRaises(UserDetailsError):
+            self.cache.resolve("https://a", "x@example.com", fail)
+        self.assertEqual(self.cache.resolve("https://a", "x@example.com", lambda: 5), 5)
+
+    def test_concurrent_resolutions_share_one_lookup(self):
+        """
+        Test that threads resolving the same user wait for a single lookup.
+        """
+        calls = []
+
+        def lookup():
+            calls.append(1)
+            time.sleep(0.05)
+            return 9
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.resolve("h", "e", lookup)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [9] * 8)
+        self.assertEqual(len(calls), 1)
+
+
+class TestLazyUserDetails(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAvrioServer(jobs={"DSDQ": [{"jobId": 1}]}, user_id=7).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def authenticate(self, auth):
+        return auth.authenticate({"host": self.server.url, "method": "password",
+                                  "username": "user@example.com", "password": "secret"})
+
+    def calls(self, path):
+        return sum(1 for request_path, payload in self.server.requests if request_path == path)
+
+    def test_lookup_is_deferred_and_memoized(self):
+        """
+        Test that signing in makes one request, and the user ID is looked up once on first use.
+        """
+        auth = Authentication()
+        session = self.authenticate(auth)
+        self.assertEqual(self.calls(SchedulerEndpoints.USER_DETAILS), 0)
+
+        jobs = session.get_scheduler().list_all("dsdq")
+        self.assertEqual(jobs, [{"jobId": 1}])
+        self.assertEqual(self.server.requests[-1][1]["userId"], 7)
+
+        again = self.authenticate(auth)
+        self.assertEqual(again.user_state.user_id, 7)
+        self.assertEqual(self.calls(SchedulerEndpoints.USER_DETAILS), 1)
+
+    def test_concurrent_first_calls_share_one_lookup(self):
+        """
+        Test that concurrent triggers on a new session look the user up once.
+        """
+        self.server.latency = 0.02
+        session = self.authenticate(Authentication())
+        jobs = [("job", n, "data_quality") for n in range(16)]
+        results = list(session.get_scheduler().trigger_many(jobs, max_workers=8))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(self.calls(SchedulerEndpoints.USER_DETAILS), 1)
+
+    def test_failure_raises_instead_of_none(self):
+        """
+        Test that a failed lookup raises UserDetailsError on use, and is retried by the next call.
+        """
+        self.server.inject_error(SchedulerEndpoints.USER_DETAILS, 500)
+        session = self.authenticate(Authentication())
+        with self.assertRaises(UserDetailsError):
+            session.get_scheduler().list_all("dsdq")
+        self.assertEqual(self.calls(SchedulerEndpoints.LIST_API), 0)
+
+        self.assertEqual(session.user_state.user_id, 7)
+        with self.assertRaises(UserDetailsError):
+            Authentication().update_user_details(self.server.url + "/missing", session.user_state.access_token,
+                                                 session.user_state)
+
+    def test_prefetch(self):
+        """
+        Test that the user ID is fetched in the background when prefetching is enabled.
+        """
+        session = self.authenticate(Authentication(prefetch_user_details=True))
+        deadline = time.monotonic() + 5
+        while self.calls(SchedulerEndpoints.USER_DETAILS) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(session.user_state.user_id, 7)
+        self.assertEqual(self.calls(SchedulerEndpoints.USER_DETAILS), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()